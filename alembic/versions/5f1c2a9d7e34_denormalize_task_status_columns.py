@@ -0,0 +1,69 @@
+"""denormalize task status, dataset ids and result location
+
+Promote `nm_status`, the GT/NM dataset ids and the matching result location
+from `abcxyz_tasks.ext_info` to indexed columns, and backfill them.
+
+The tree doesn't track the earlier revisions, so the statements are idempotent
+(IF NOT EXISTS) and work on a schema created by `init_table.sql` or by an
+autogenerated base revision. Set `down_revision` to the deployed head if needed.
+
+Revision ID: 5f1c2a9d7e34
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5f1c2a9d7e34"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        ALTER TABLE abcxyz_tasks
+            ADD COLUMN IF NOT EXISTS nm_status varchar(20),
+            ADD COLUMN IF NOT EXISTS gt_dataset_id bigint,
+            ADD COLUMN IF NOT EXISTS nm_dataset_id bigint,
+            ADD COLUMN IF NOT EXISTS result_location text
+        """
+    )
+
+    op.execute(
+        """
+        UPDATE abcxyz_tasks SET
+            nm_status = ext_info::jsonb ->> 'nm_status',
+            gt_dataset_id = (ext_info::jsonb #>> '{gt_dataset_config,dataset_id}')::bigint,
+            nm_dataset_id = (ext_info::jsonb #>> '{nm_dataset_config,dataset_id}')::bigint,
+            result_location = ext_info::jsonb #>> '{matching_result,location}'
+        WHERE ext_info IS NOT NULL AND ext_info <> ''
+        """
+    )
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_abcxyz_tasks_owner_id_nm_status ON abcxyz_tasks (owner_id, nm_status)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_abcxyz_tasks_gt_dataset_id ON abcxyz_tasks (gt_dataset_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_abcxyz_tasks_nm_dataset_id ON abcxyz_tasks (nm_dataset_id)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_abcxyz_tasks_nm_dataset_id")
+    op.execute("DROP INDEX IF EXISTS ix_abcxyz_tasks_gt_dataset_id")
+    op.execute("DROP INDEX IF EXISTS ix_abcxyz_tasks_owner_id_nm_status")
+    op.execute(
+        """
+        ALTER TABLE abcxyz_tasks
+            DROP COLUMN IF EXISTS result_location,
+            DROP COLUMN IF EXISTS nm_dataset_id,
+            DROP COLUMN IF EXISTS gt_dataset_id,
+            DROP COLUMN IF EXISTS nm_status
+        """
+    )
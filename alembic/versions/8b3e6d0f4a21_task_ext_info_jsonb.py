@@ -0,0 +1,37 @@
+"""task ext_info to jsonb
+
+`abcxyz_tasks.ext_info` becomes JSONB, so that a status transition or a matching
+result is written by `jsonb_set` in a single UPDATE instead of rewriting the
+whole serialized config. Empty strings become NULL.
+
+Revision ID: 8b3e6d0f4a21
+Revises: 5f1c2a9d7e34
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8b3e6d0f4a21"
+down_revision = "5f1c2a9d7e34"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # casting through text keeps it a no-op on a schema already created with jsonb
+    op.execute(
+        """
+        ALTER TABLE abcxyz_tasks
+            ALTER COLUMN ext_info TYPE jsonb USING NULLIF(ext_info::text, '')::jsonb
+        """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        ALTER TABLE abcxyz_tasks
+            ALTER COLUMN ext_info TYPE text USING ext_info::text
+        """
+    )
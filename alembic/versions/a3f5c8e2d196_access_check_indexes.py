@@ -0,0 +1,52 @@
+"""indexes for dataset access checks
+
+Support the EXISTS query of the dataset access check and the visible dataset
+listing: dataset shares by dataset and by user or group, and group members by
+group and by member.
+
+Revision ID: a3f5c8e2d196
+Revises: e1d9b4c6a273
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a3f5c8e2d196"
+down_revision = "e1d9b4c6a273"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_group_members_group_id_member_id ON group_members (group_id, member_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_group_members_member_id ON group_members (member_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_dataset_shared_users_dataset_id_user_id ON dataset_shared_users (dataset_id, user_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_dataset_shared_users_user_id ON dataset_shared_users (user_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_dataset_shared_groups_dataset_id_group_id ON dataset_shared_groups (dataset_id, group_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_dataset_shared_groups_group_id ON dataset_shared_groups (group_id)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_dataset_shared_groups_group_id")
+    op.execute(
+        "DROP INDEX IF EXISTS ix_dataset_shared_groups_dataset_id_group_id"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_dataset_shared_users_user_id")
+    op.execute(
+        "DROP INDEX IF EXISTS ix_dataset_shared_users_dataset_id_user_id"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_group_members_member_id")
+    op.execute("DROP INDEX IF EXISTS ix_group_members_group_id_member_id")
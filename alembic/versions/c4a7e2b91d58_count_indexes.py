@@ -0,0 +1,33 @@
+"""indexes for stats and quota counts
+
+Support the COUNT queries of `/stats` and the task start quota checks:
+datasets by owner, and run history by owner since a date.
+
+Revision ID: c4a7e2b91d58
+Revises: 8b3e6d0f4a21
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4a7e2b91d58"
+down_revision = "8b3e6d0f4a21"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_datasets_owner_id ON datasets (owner_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_abcxyz_tasks_run_history_owner_id_started_at ON abcxyz_tasks_run_history (owner_id, started_at)"
+    )
+
+
+def downgrade():
+    op.execute(
+        "DROP INDEX IF EXISTS ix_abcxyz_tasks_run_history_owner_id_started_at"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_datasets_owner_id")
@@ -0,0 +1,78 @@
+"""task dataset refs
+
+Move the datasets used by a task from the `gt_dataset_id` / `nm_dataset_id`
+columns of `abcxyz_tasks` to the `task_dataset_refs` table, indexed by the
+dataset id.
+
+Revision ID: e1d9b4c6a273
+Revises: c4a7e2b91d58
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e1d9b4c6a273"
+down_revision = "c4a7e2b91d58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS task_dataset_refs (
+            task_id bigint REFERENCES abcxyz_tasks(id) ON DELETE CASCADE,
+            role varchar(10),
+            dataset_id bigint NOT NULL,
+            PRIMARY KEY (task_id, role)
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_task_dataset_refs_dataset_id_role ON task_dataset_refs (dataset_id, role)"
+    )
+
+    op.execute(
+        """
+        INSERT INTO task_dataset_refs (task_id, role, dataset_id)
+        SELECT id, 'gt', gt_dataset_id FROM abcxyz_tasks WHERE gt_dataset_id IS NOT NULL
+        UNION ALL
+        SELECT id, 'nm', nm_dataset_id FROM abcxyz_tasks WHERE nm_dataset_id IS NOT NULL
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+    op.execute("DROP INDEX IF EXISTS ix_abcxyz_tasks_nm_dataset_id")
+    op.execute("DROP INDEX IF EXISTS ix_abcxyz_tasks_gt_dataset_id")
+    op.execute(
+        """
+        ALTER TABLE abcxyz_tasks
+            DROP COLUMN IF EXISTS nm_dataset_id,
+            DROP COLUMN IF EXISTS gt_dataset_id
+        """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        ALTER TABLE abcxyz_tasks
+            ADD COLUMN IF NOT EXISTS gt_dataset_id bigint,
+            ADD COLUMN IF NOT EXISTS nm_dataset_id bigint
+        """
+    )
+    op.execute(
+        """
+        UPDATE abcxyz_tasks t SET
+            gt_dataset_id = (SELECT dataset_id FROM task_dataset_refs r WHERE r.task_id = t.id AND r.role = 'gt'),
+            nm_dataset_id = (SELECT dataset_id FROM task_dataset_refs r WHERE r.task_id = t.id AND r.role = 'nm')
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_abcxyz_tasks_gt_dataset_id ON abcxyz_tasks (gt_dataset_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_abcxyz_tasks_nm_dataset_id ON abcxyz_tasks (nm_dataset_id)"
+    )
+    op.execute("DROP TABLE IF EXISTS task_dataset_refs")
@@ -4,7 +4,7 @@ from fastapi.testclient import TestClient
 
 from server.apps.nm_task.schemas import NmTaskCreateDTO
 from server.settings import API_SETTING
-from server.utils.parser import load_yaml
+from server.utils.parser import load_json, load_yaml
 
 
 def test_get_nm_batch_task_defaults(
@@ -37,3 +37,23 @@ def test_get_nm_rt_task_defaults(
     resp = response.json()
     assert response.status_code == 200
     assert NmTaskCreateDTO(**resp) == nm_cfg_defaults
+
+
+def test_get_help_guide_not_modified(
+    api_client: TestClient,
+    dummy_user_token_header: Dict[str, str],
+) -> None:
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/config/help-guide",
+        headers=dummy_user_token_header,
+    )
+    assert response.status_code == 200
+    assert response.json() == load_json("./conf/help-guide.json")
+
+    etag = response.headers["ETag"]
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/config/help-guide",
+        headers={**dummy_user_token_header, "If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
@@ -1,12 +1,19 @@
-from typing import List
+from typing import Any, List
 
 import pytest
+from sqlalchemy import event
 
+from api_tests.pytest_utils import ReadCRUD
 from server.apps.dataset import schemas
+from server.apps.dataset import utils as dataset_utils
+from server.apps.dataset.async_crud import DATASET_ASYNC_CRUD
+from server.apps.dataset.cache import DATASET_ACCESS_CACHE
 from server.apps.dataset.crud import DATASET_CRUD
 from server.apps.group import schemas as group_schemas
+from server.apps.group.crud import GROUP_CRUD
 from server.apps.media import schemas as media_schemas
 from server.apps.user import schemas as user_schemas
+from server.libs.db.sqlalchemy import engine
 
 
 def test_get_dataset(
@@ -380,3 +387,130 @@ def test_delete_public_dataset_by_ids(
 
     do_public_datasets = DATASET_CRUD.get_public_datasets()
     assert len(do_public_datasets) == 0
+
+
+@pytest.mark.parametrize(
+    "do_dummy_user_list, do_dummy_group_list",
+    [(2, 2)],
+    indirect=["do_dummy_user_list", "do_dummy_group_list"],
+)
+def test_get_visible_datasets(
+    do_dummy_user: user_schemas.UserDO,
+    do_dummy_dataset: schemas.DatasetDO,
+    do_dummy_media: media_schemas.MediaDO,
+    do_dummy_user_list: List[user_schemas.UserDO],
+    do_dummy_group_list: List[group_schemas.GroupDO],
+    db_path: str,
+) -> None:
+    dataset_read_crud = ReadCRUD(DATASET_ASYNC_CRUD, db_path)
+    viewer, member = do_dummy_user_list
+    DATASET_CRUD.share_dataset_with_users(do_dummy_dataset.id, [viewer.id])
+    DATASET_CRUD.share_dataset_with_groups(
+        do_dummy_dataset.id, [do_dummy_group_list[0].id]
+    )
+    GROUP_CRUD.add_group_member(do_dummy_group_list[0].id, member.id)
+
+    statements: List[str] = []
+
+    def before_cursor_execute(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    dto_owned = DATASET_CRUD.get_visible_datasets(do_dummy_user.id)
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    # datasets, media and the ownership in one query
+    assert len(statements) == 1
+    assert [d.id for d in dto_owned] == [do_dummy_dataset.id]
+    assert dto_owned[0].ownership_type == schemas.OWNERSHIP_TYPE.PRIVATE
+    assert dto_owned[0].media.id == do_dummy_media.id
+
+    for user in [viewer, member]:
+        dto_shared = dataset_read_crud.get_visible_datasets(user.id)
+        assert [d.id for d in dto_shared] == [do_dummy_dataset.id]
+        assert dto_shared[0].ownership_type == schemas.OWNERSHIP_TYPE.SHARED
+
+    # public wins over shared, private wins over public
+    DATASET_CRUD.create_public_dataset(
+        schemas.PublicDatasetCreateDO(dataset_id=do_dummy_dataset.id)
+    )
+    dto_public = dataset_read_crud.get_visible_datasets(viewer.id)
+    assert dto_public[0].ownership_type == schemas.OWNERSHIP_TYPE.PUBLIC
+    assert dataset_read_crud.get_visible_dataset_fields(
+        viewer.id, ["id", "ownership_type"]
+    ) == [{"id": do_dummy_dataset.id, "ownership_type": "public"}]
+    dto_owned = dataset_read_crud.get_visible_datasets(do_dummy_user.id)
+    assert dto_owned[0].ownership_type == schemas.OWNERSHIP_TYPE.PRIVATE
+
+    DATASET_CRUD.delete_public_dataset(do_dummy_dataset.id)
+    GROUP_CRUD.delete_group_member(do_dummy_group_list[0].id, member.id)
+    DATASET_CRUD.remove_shared_groups(
+        do_dummy_dataset.id, [do_dummy_group_list[0].id]
+    )
+    DATASET_CRUD.remove_shared_users(do_dummy_dataset.id, [viewer.id])
+    assert dataset_read_crud.get_visible_datasets(viewer.id) == []
+
+    return
+
+
+@pytest.mark.parametrize(
+    "do_dummy_user_list, do_dummy_group_list",
+    [(2, 2)],
+    indirect=["do_dummy_user_list", "do_dummy_group_list"],
+)
+def test_check_access(
+    do_dummy_dataset: schemas.DatasetDO,
+    do_dummy_user_list: List[user_schemas.UserDO],
+    do_dummy_group_list: List[group_schemas.GroupDO],
+) -> None:
+    viewer, member = do_dummy_user_list
+    assert dataset_utils.check_access(do_dummy_dataset, viewer) == (False, None)
+
+    # the decision is cached until the share changes
+    DATASET_CRUD.share_dataset_with_users(do_dummy_dataset.id, [viewer.id])
+    assert dataset_utils.check_access(do_dummy_dataset, viewer) == (
+        True,
+        schemas.OWNERSHIP_TYPE.SHARED,
+    )
+    assert DATASET_ACCESS_CACHE.get((viewer.id, do_dummy_dataset.id)) == (
+        True,
+        schemas.OWNERSHIP_TYPE.SHARED,
+    )
+
+    DATASET_CRUD.share_dataset_with_groups(
+        do_dummy_dataset.id, [do_dummy_group_list[0].id]
+    )
+    assert (
+        DATASET_CRUD.get_shared_ownership_type(do_dummy_dataset.id, member.id)
+        is None
+    )
+    GROUP_CRUD.add_group_member(do_dummy_group_list[0].id, member.id)
+    assert (
+        DATASET_CRUD.get_shared_ownership_type(do_dummy_dataset.id, member.id)
+        == schemas.OWNERSHIP_TYPE.SHARED
+    )
+
+    DATASET_CRUD.create_public_dataset(
+        schemas.PublicDatasetCreateDO(dataset_id=do_dummy_dataset.id)
+    )
+    GROUP_CRUD.delete_group_member(do_dummy_group_list[0].id, member.id)
+    assert dataset_utils.check_access(do_dummy_dataset, member) == (
+        True,
+        schemas.OWNERSHIP_TYPE.PUBLIC,
+    )
+
+    DATASET_CRUD.delete_public_dataset(do_dummy_dataset.id)
+    DATASET_CRUD.remove_shared_groups(
+        do_dummy_dataset.id, [do_dummy_group_list[0].id]
+    )
+    DATASET_CRUD.remove_shared_users(do_dummy_dataset.id, [viewer.id])
+    assert dataset_utils.check_access(do_dummy_dataset, viewer) == (False, None)
+
+    return
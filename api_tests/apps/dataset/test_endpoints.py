@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Any, Dict, List
 
 import pytest
 from fastapi.testclient import TestClient
@@ -13,6 +13,7 @@ from server.apps.nm_task.crud import NM_TASK_CRUD
 from server.apps.user import schemas as user_schemas
 from server.core.exception import EXCEPTION_LIB
 from server.settings import API_SETTING
+from server.utils.pagination import NEXT_CURSOR_HEADER
 
 
 def test_create_dataset(
@@ -145,6 +146,28 @@ def test_retrieve_dataset(
     dto_dataset = dataset_schemas.DatasetDTO(**response.json())
     assert dto_dataset.name == do_dummy_dataset.name
 
+    # not modified since the last poll
+    etag = response.headers["ETag"]
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/datasets/{do_dummy_dataset.id}",
+        headers={**dummy_user_token_header, "If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    # a new version after an update
+    DATASET_CRUD.update_dataset(
+        do_dummy_dataset.id,
+        dataset_schemas.DatasetUpdateDO(description="new description"),
+    )
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/datasets/{do_dummy_dataset.id}",
+        headers={**dummy_user_token_header, "If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["description"] == "new description"
+
     return
 
 
@@ -423,6 +446,58 @@ def test_list_dataset(
     return
 
 
+@pytest.mark.parametrize(
+    "do_dummy_dataset_list", [3], indirect=["do_dummy_dataset_list"]
+)
+def test_list_dataset_by_page(
+    api_client: TestClient,
+    dummy_user_token_header: Dict[str, str],
+    do_dummy_dataset_list: List[dataset_schemas.DatasetDO],
+) -> None:
+    dataset_ids = []
+    params: Dict[str, Any] = {"limit": 2}
+    while True:
+        response = api_client.get(
+            f"{API_SETTING.API_V1_STR}/datasets",
+            headers=dummy_user_token_header,
+            params=params,
+        )
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        dataset_ids += [d["id"] for d in response.json()]
+
+        if NEXT_CURSOR_HEADER not in response.headers:
+            break
+        params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+
+    # newest first, and no dataset is missed or repeated
+    assert len(dataset_ids) == len(set(dataset_ids))
+    listed_ids = [d.id for d in reversed(do_dummy_dataset_list)]
+    assert [i for i in dataset_ids if i in listed_ids] == listed_ids
+
+    # sparse fields skip the media
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/datasets",
+        headers=dummy_user_token_header,
+        params={"fields": "name,ownership_type"},
+    )
+    assert response.status_code == 200
+    for dataset in response.json():
+        assert set(dataset) == {"name", "ownership_type", "id", "created_at"}
+
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/datasets",
+        headers=dummy_user_token_header,
+        params={"fields": "name,password"},
+    )
+    pytest_utils.assert_endpoint_response(
+        response,
+        EXCEPTION_LIB.API__INVALID_PAGE_PARAM.value(
+            "must have this placeholder string!"
+        ),
+    )
+
+
 def test_get_dataset_stats(
     api_client: TestClient,
     dummy_user_token_header: Dict[str, str],
@@ -9,6 +9,7 @@ from server.apps.group.crud import GROUP_CRUD
 from server.apps.user import schemas as user_schemas
 from server.core.exception import EXCEPTION_LIB
 from server.settings import API_SETTING
+from server.utils.pagination import NEXT_CURSOR_HEADER
 
 
 def test_create_group(
@@ -97,6 +98,26 @@ def test_get_all_groups(
     assert response.status_code == 200
     assert len(response.json()) == 4
 
+    # the same groups by pages, with the sparse fields
+    group_ids = []
+    params = {"limit": 3, "fields": "name"}
+    while True:
+        response = api_client.get(
+            f"{API_SETTING.API_V1_STR}/groups",
+            headers=dummy_user_token_header,
+            params=params,
+        )
+        assert response.status_code == 200
+        for group in response.json():
+            assert set(group) == {"name", "id", "created_at"}
+        group_ids += [g["id"] for g in response.json()]
+
+        if NEXT_CURSOR_HEADER not in response.headers:
+            break
+        params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+    assert len(set(group_ids)) == 4
+    assert do_new_group.id in group_ids
+
     # release resources
     GROUP_CRUD.delete_group_member(do_new_group.id, do_dummy_user.id)
     GROUP_CRUD.delete_group(do_new_group.id)
@@ -1,9 +1,16 @@
+import datetime
+
 import pytest
 
-from server.apps.nm_task import schemas
+from api_tests.pytest_utils import ReadCRUD
+from server.apps.dataset import schemas as dataset_schemas
+from server.apps.media.schemas import MEDIA_CONTENT_TYPE, MediaExtInfo
+from server.apps.nm_task import models, schemas
+from server.apps.nm_task.async_crud import NM_TASK_ASYNC_CRUD
 from server.apps.nm_task.crud import NM_TASK_CRUD
 from server.apps.user import schemas as user_schemas
 from server.core.exception import EXCEPTION_LIB
+from server.libs.db.sqlalchemy import db
 
 
 def test_delete_task_by_owner(
@@ -89,8 +96,11 @@ def test_get_task(
     do_dummy_user: user_schemas.UserDO,
     do_nm_batch_task_cfg_dict: dict,
     do_nm_rt_task_cfg_dict: dict,
+    db_path: str,
 ) -> None:
-    assert NM_TASK_CRUD.get_task(9999999) is None
+    task_read_crud = ReadCRUD(NM_TASK_ASYNC_CRUD, db_path)
+
+    assert task_read_crud.get_task(9999999) is None
 
     task_create = schemas.NmTaskCreateDO(
         type=schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH,
@@ -103,7 +113,7 @@ def test_get_task(
     # create a group, and check if we can get it
     do_task = NM_TASK_CRUD.create_task(task_create, user_id=do_dummy_user.id)
 
-    do_task_get = NM_TASK_CRUD.get_task(do_task.id)
+    do_task_get = task_read_crud.get_task(do_task.id)
     assert do_task_get == do_task
 
     # release the resource
@@ -121,7 +131,7 @@ def test_get_task(
     # create a group, and check if we can get it
     do_task = NM_TASK_CRUD.create_task(task_create, user_id=do_dummy_user.id)
 
-    do_task_get = NM_TASK_CRUD.get_task(do_task.id)
+    do_task_get = task_read_crud.get_task(do_task.id)
     assert do_task_get == do_task
 
     # release the resource
@@ -134,16 +144,19 @@ def test_get_all_tasks_owned_by_user(
     do_nm_rt_task_small_set: schemas.NmTaskDO,
     do_nm_batch_task_cfg_dict: dict,
     do_nm_rt_task_cfg_dict: dict,
+    db_path: str,
 ) -> None:
+    task_read_crud = ReadCRUD(NM_TASK_ASYNC_CRUD, db_path)
+
     # if the user_id doesn't exist, it should return None
     assert (
-        NM_TASK_CRUD.get_tasks_by_owner(
+        task_read_crud.get_tasks_by_owner(
             999999999, schemas.AbcXyz_TYPE.NAME_MATCHING_REALTIME
         )
         == []
     )
     assert (
-        NM_TASK_CRUD.get_tasks_by_owner(
+        task_read_crud.get_tasks_by_owner(
             999999999, schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH
         )
         == []
@@ -151,11 +164,11 @@ def test_get_all_tasks_owned_by_user(
 
     # get tasks of dummy user
     # since we have created two dummy tasks in conftest.py, we should get one group
-    do_tasks = NM_TASK_CRUD.get_tasks_by_owner(
+    do_tasks = task_read_crud.get_tasks_by_owner(
         do_dummy_user.id, schemas.AbcXyz_TYPE.NAME_MATCHING_REALTIME
     )
     assert len(do_tasks) == 1
-    do_tasks = NM_TASK_CRUD.get_tasks_by_owner(
+    do_tasks = task_read_crud.get_tasks_by_owner(
         do_dummy_user.id, schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH
     )
     assert len(do_tasks) == 1
@@ -184,14 +197,20 @@ def test_get_all_tasks_owned_by_user(
         task_create_dummy_4, user_id=do_dummy_user.id
     )
 
-    do_tasks = NM_TASK_CRUD.get_tasks_by_owner(
+    do_tasks = task_read_crud.get_tasks_by_owner(
         do_dummy_user.id, schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH
     )
     assert len(do_tasks) == 2
-    do_tasks = NM_TASK_CRUD.get_tasks_by_owner(
+    do_tasks = task_read_crud.get_tasks_by_owner(
         do_dummy_user.id, schemas.AbcXyz_TYPE.NAME_MATCHING_REALTIME
     )
     assert len(do_tasks) == 2
+    task_fields = task_read_crud.get_task_fields_by_owner(
+        do_dummy_user.id, schemas.AbcXyz_TYPE.NAME_MATCHING_REALTIME, ["name"]
+    )
+    assert sorted(t["name"] for t in task_fields) == sorted(
+        t.name for t in do_tasks
+    )
 
     # release resources
     NM_TASK_CRUD.delete_task(do_task_dummy_3.id)
@@ -298,3 +317,237 @@ def test_get_owner_id_by_task_id(
     assert NM_TASK_CRUD.get_owner_id_by_task_id(task_id) == do_dummy_user.id
 
     NM_TASK_CRUD.delete_task(do_task.id)
+
+
+def test_task_status_and_dataset_columns(
+    do_dummy_user: user_schemas.UserDO,
+    do_dataset_gt_small: dataset_schemas.DatasetDO,
+    do_dataset_nm_small: dataset_schemas.DatasetDO,
+    do_nm_batch_task_cfg_dict: dict,
+) -> None:
+    task_create = schemas.NmTaskCreateDO(
+        type=schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH,
+        name="dummy_batch_task_columns",
+        description="dummy description",
+        is_public=False,
+        ext_info=schemas.NmCfgBatchSchema(**do_nm_batch_task_cfg_dict),
+    )
+    init_l = [schemas.NM_STATUS.INIT]
+    launching_l = [schemas.NM_STATUS.LAUNCHING]
+    nr_init = NM_TASK_CRUD.count_tasks_by_owner_status(do_dummy_user.id, init_l)
+    nr_launching = NM_TASK_CRUD.count_tasks_by_owner_status(
+        do_dummy_user.id, launching_l
+    )
+    task_counts = NM_TASK_CRUD.count_tasks_by_owner(do_dummy_user.id)
+    nr_batch_init = task_counts[schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH].get(
+        schemas.NM_STATUS.INIT, 0
+    )
+
+    do_task = NM_TASK_CRUD.create_task(task_create, user_id=do_dummy_user.id)
+
+    assert (
+        NM_TASK_CRUD.count_tasks_by_owner_status(do_dummy_user.id, init_l)
+        == nr_init + 1
+    )
+    assert (
+        NM_TASK_CRUD.count_tasks_by_owner_status(do_dummy_user.id, launching_l)
+        == nr_launching
+    )
+    task_counts = NM_TASK_CRUD.count_tasks_by_owner(do_dummy_user.id)
+    assert (
+        task_counts[schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH][
+            schemas.NM_STATUS.INIT
+        ]
+        == nr_batch_init + 1
+    )
+    for dataset_id in [do_dataset_gt_small.id, do_dataset_nm_small.id]:
+        do_tasks = NM_TASK_CRUD.get_tasks_by_dataset(dataset_id, init_l)
+        assert do_task.id in [t.id for t in do_tasks]
+
+    # the columns follow the ext_info on update
+    do_task.ext_info.nm_status = schemas.NM_STATUS.LAUNCHING
+    NM_TASK_CRUD.update_task(do_task.id, do_task)
+    assert (
+        NM_TASK_CRUD.count_tasks_by_owner_status(do_dummy_user.id, launching_l)
+        == nr_launching + 1
+    )
+    do_tasks = NM_TASK_CRUD.get_tasks_by_dataset(do_dataset_gt_small.id, init_l)
+    assert do_task.id not in [t.id for t in do_tasks]
+
+    # a task without status, e.g., not backfilled, is not counted
+    task_counts = NM_TASK_CRUD.count_tasks_by_owner(do_dummy_user.id)
+    batch_counts = task_counts[schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH]
+    nr_batch_launching = batch_counts[schemas.NM_STATUS.LAUNCHING]
+    db.session.query(models.AbcXyzTask).filter(
+        models.AbcXyzTask.id == do_task.id
+    ).update({"nm_status": None})
+    db.session.commit()
+    task_counts = NM_TASK_CRUD.count_tasks_by_owner(do_dummy_user.id)
+    batch_counts = task_counts[schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH]
+    assert (
+        batch_counts.get(schemas.NM_STATUS.LAUNCHING, 0)
+        == nr_batch_launching - 1
+    )
+
+    NM_TASK_CRUD.delete_task(do_task.id)
+
+
+def test_update_task_status(
+    do_dummy_user: user_schemas.UserDO,
+    do_nm_batch_task_cfg_dict: dict,
+) -> None:
+    task_create = schemas.NmTaskCreateDO(
+        type=schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH,
+        name="dummy_batch_task_status",
+        description="dummy description",
+        is_public=False,
+        ext_info=schemas.NmCfgBatchSchema(**do_nm_batch_task_cfg_dict),
+    )
+    do_task = NM_TASK_CRUD.create_task(task_create, user_id=do_dummy_user.id)
+
+    assert NM_TASK_CRUD.update_task_status(
+        do_task.id,
+        schemas.NM_STATUS.PREPARING,
+        from_statuses=schemas.NM_STATUS_STARTABLE_L,
+        started_at=datetime.datetime.utcnow(),
+    )
+    # the task has been started, a second start is rejected
+    assert not NM_TASK_CRUD.update_task_status(
+        do_task.id,
+        schemas.NM_STATUS.PREPARING,
+        from_statuses=schemas.NM_STATUS_STARTABLE_L,
+    )
+
+    do_task_get = NM_TASK_CRUD.get_task(do_task.id)
+    assert do_task_get.ext_info.nm_status == schemas.NM_STATUS.PREPARING
+    assert do_task_get.started_at is not None
+    # the rest of ext_info is untouched
+    assert (
+        do_task_get.ext_info.copy(update={"nm_status": schemas.NM_STATUS.INIT})
+        == do_task.ext_info.copy()
+    )
+    assert (
+        NM_TASK_CRUD.count_tasks_by_owner_status(
+            do_dummy_user.id, [schemas.NM_STATUS.PREPARING]
+        )
+        >= 1
+    )
+
+    # without from_statuses, the status is always changed
+    assert NM_TASK_CRUD.update_task_status(do_task.id, schemas.NM_STATUS.FAILED)
+    assert not NM_TASK_CRUD.update_task_status(
+        999999999, schemas.NM_STATUS.FAILED
+    )
+
+    NM_TASK_CRUD.delete_task(do_task.id)
+
+
+def test_update_task_matching_result(
+    do_dummy_user: user_schemas.UserDO,
+    do_nm_batch_task_cfg_dict: dict,
+) -> None:
+    task_create = schemas.NmTaskCreateDO(
+        type=schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH,
+        name="dummy_batch_task_result",
+        description="dummy description",
+        is_public=False,
+        ext_info=schemas.NmCfgBatchSchema(**do_nm_batch_task_cfg_dict),
+    )
+    do_task = NM_TASK_CRUD.create_task(task_create, user_id=do_dummy_user.id)
+
+    matching_result = schemas.BatchMatchingResult(
+        location="localfs/dummy/result.csv",
+        ext_info=MediaExtInfo(
+            header=["a", "b"],
+            first_n_rows="[]",
+            file_name="result.csv",
+            media_type=MEDIA_CONTENT_TYPE.CSV,
+        ),
+    )
+    NM_TASK_CRUD.update_task_matching_result(do_task.id, matching_result)
+
+    do_task_get = NM_TASK_CRUD.get_task(do_task.id)
+    assert do_task_get.ext_info.matching_result == matching_result
+    assert do_task_get.ext_info.nm_status == schemas.NM_STATUS.INIT
+
+    with pytest.raises(Exception) as exc_info:
+        NM_TASK_CRUD.update_task_matching_result(999999999, matching_result)
+    assert exc_info.type == EXCEPTION_LIB.Task__Task_ID_NOT_EXIST.value
+
+    NM_TASK_CRUD.delete_task(do_task.id)
+
+
+def test_count_records_by_started_at(
+    do_dummy_user: user_schemas.UserDO,
+    do_nm_batch_task_small_set: schemas.NmTaskDO,
+) -> None:
+    last_month = datetime.datetime.utcnow() - datetime.timedelta(days=30)
+    nr_run = NM_TASK_CRUD.count_records_by_started_at(
+        do_dummy_user.id, oldest_started_at=last_month
+    )
+
+    NM_TASK_CRUD.add_task_run_record(
+        do_dummy_user.id, do_nm_batch_task_small_set.id, "dummy-pod-count"
+    )
+
+    assert (
+        NM_TASK_CRUD.count_records_by_started_at(
+            do_dummy_user.id, oldest_started_at=last_month
+        )
+        == nr_run + 1
+    )
+    assert (
+        NM_TASK_CRUD.count_records_by_started_at(
+            do_dummy_user.id, oldest_started_at=datetime.datetime.utcnow()
+        )
+        == 0
+    )
+
+    db.session.query(models.AbcXyzTaskRunHistory).filter(
+        models.AbcXyzTaskRunHistory.pod_name == "dummy-pod-count"
+    ).delete()
+    db.session.commit()
+
+
+def test_task_dataset_refs(
+    do_dummy_user: user_schemas.UserDO,
+    do_dataset_gt_small: dataset_schemas.DatasetDO,
+    do_dataset_nm_small: dataset_schemas.DatasetDO,
+    do_nm_batch_task_cfg_dict: dict,
+) -> None:
+    task_create = schemas.NmTaskCreateDO(
+        type=schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH,
+        name="dummy_batch_task_refs",
+        description="dummy description",
+        is_public=False,
+        ext_info=schemas.NmCfgBatchSchema(**do_nm_batch_task_cfg_dict),
+    )
+    do_task = NM_TASK_CRUD.create_task(task_create, user_id=do_dummy_user.id)
+    NM_TASK_CRUD.update_task_status(do_task.id, schemas.NM_STATUS.READY)
+    ready_l = [schemas.NM_STATUS.READY]
+    gt_id, nm_id = do_dataset_gt_small.id, do_dataset_nm_small.id
+
+    do_tasks = NM_TASK_CRUD.get_tasks_by_dataset(gt_id, ready_l)
+    assert [t.id for t in do_tasks] == [do_task.id]
+    assert not NM_TASK_CRUD.get_tasks_by_dataset(
+        gt_id, ready_l, owner_id=999999999
+    )
+
+    role = schemas.TASK_DATASET_ROLE
+    assert NM_TASK_CRUD.is_dataset_in_use(gt_id, ready_l, role=role.GT)
+    assert NM_TASK_CRUD.is_dataset_in_use(nm_id, ready_l, role=role.NM)
+    assert not NM_TASK_CRUD.is_dataset_in_use(nm_id, ready_l, role=role.GT)
+
+    # the refs follow the config on update
+    do_task = NM_TASK_CRUD.get_task(do_task.id)
+    do_task.ext_info.nm_dataset_config.dataset_id = gt_id
+    NM_TASK_CRUD.update_task(do_task.id, do_task)
+    assert not NM_TASK_CRUD.is_dataset_in_use(nm_id, ready_l)
+    assert NM_TASK_CRUD.is_dataset_in_use(gt_id, ready_l, role=role.NM)
+    # used as gt and nm, the task is returned once
+    do_tasks = NM_TASK_CRUD.get_tasks_by_dataset(gt_id, ready_l)
+    assert [t.id for t in do_tasks] == [do_task.id]
+
+    # the refs are deleted with the task
+    NM_TASK_CRUD.delete_task(do_task.id)
+    assert not NM_TASK_CRUD.is_dataset_in_use(gt_id, ready_l)
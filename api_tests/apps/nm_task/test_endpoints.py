@@ -1,10 +1,16 @@
-from typing import Dict
+import asyncio
+import datetime
+from typing import Any, Dict, List
 
 from fastapi.testclient import TestClient
 
-from server.apps.nm_task import schemas
+from server.apps.nm_task import endpoints, schemas
+from server.apps.nm_task.cache import RT_TASK_ROUTE_CACHE
 from server.apps.nm_task.crud import NM_TASK_CRUD
+from server.core.exception import EXCEPTION_LIB
+from server.libs.db.sqlalchemy import db
 from server.settings import API_SETTING
+from server.utils.pagination import NEXT_CURSOR_HEADER
 
 
 def test_create_nm_task(
@@ -82,3 +88,165 @@ def test_create_nm_task_invalid_input(
     #     json=nm_task_create.dict(),  # Important!!! json expect a dictionary
     # )
     # assert response.status_code == 422
+
+
+def test_list_nm_task_by_page(
+    api_client: TestClient,
+    dummy_user_token_header: Dict[str, str],
+    do_nm_rt_task_cfg_dict: dict,
+) -> None:
+    task_ids = []
+    for idx in range(3):
+        nm_task_create = schemas.NmTaskCreateDTO(
+            type=schemas.AbcXyz_TYPE.NAME_MATCHING_REALTIME,
+            name=f"dummy-page-{idx}",
+            description="dummy description",
+            is_public=False,
+            ext_info=schemas.NmCfgRtSchema(**do_nm_rt_task_cfg_dict),
+        )
+        response = api_client.post(
+            f"{API_SETTING.API_V1_STR}/tasks/nm",
+            headers=dummy_user_token_header,
+            json=nm_task_create.dict(),
+        )
+        assert response.status_code == 200
+        task_ids.append(response.json()["id"])
+
+    params = {
+        "nm_type": schemas.AbcXyz_TYPE.NAME_MATCHING_REALTIME.value,
+        "limit": 2,
+        "fields": "name,nm_status",
+    }
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/tasks/nm",
+        headers=dummy_user_token_header,
+        params=params,
+    )
+    assert response.status_code == 200
+    first_page = response.json()
+    assert [t["id"] for t in first_page] == task_ids[:0:-1]
+    assert set(first_page[0]) == {"name", "nm_status", "id", "created_at"}
+    assert first_page[0]["name"] == "dummy-page-2"
+
+    params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+    del params["fields"]
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/tasks/nm",
+        headers=dummy_user_token_header,
+        params=params,
+    )
+    assert response.status_code == 200
+    assert [t["id"] for t in response.json()] == task_ids[:1]
+    assert "search_option" in response.json()[0]["ext_info"]
+
+    for task_id in task_ids:
+        NM_TASK_CRUD.delete_task(task_id)
+
+
+def test_get_nm_task_not_modified(
+    api_client: TestClient,
+    dummy_user_token_header: Dict[str, str],
+    do_nm_rt_task_cfg_dict: dict,
+) -> None:
+    nm_task_create = schemas.NmTaskCreateDTO(
+        type=schemas.AbcXyz_TYPE.NAME_MATCHING_REALTIME,
+        name="dummy-etag",
+        description="dummy description",
+        is_public=False,
+        ext_info=schemas.NmCfgRtSchema(**do_nm_rt_task_cfg_dict),
+    )
+    response = api_client.post(
+        f"{API_SETTING.API_V1_STR}/tasks/nm",
+        headers=dummy_user_token_header,
+        json=nm_task_create.dict(),
+    )
+    task_id = response.json()["id"]
+
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/tasks/nm/{task_id}",
+        headers=dummy_user_token_header,
+    )
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/tasks/nm/{task_id}",
+        headers={**dummy_user_token_header, "If-None-Match": etag},
+    )
+    assert response.status_code == 304
+
+    # a status change is a new version of the task
+    assert NM_TASK_CRUD.update_task_status(task_id, schemas.NM_STATUS.FAILED)
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/tasks/nm/{task_id}",
+        headers={**dummy_user_token_header, "If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["ext_info"]["nm_status"] == "failed"
+
+    NM_TASK_CRUD.delete_task(task_id)
+
+
+def test_get_rt_task_base_url(
+    monkeypatch: Any, do_nm_rt_task_small_set: schemas.NmTaskDO
+) -> None:
+    lookups: List[int] = []
+
+    def gen_rt_task_base_url(task_id: int, owner_id: int) -> str:
+        lookups.append(task_id)
+        return f"http://127.0.0.1:{8002 + len(lookups)}"
+
+    monkeypatch.setattr(
+        endpoints.TASK_EXECUTOR, "gen_rt_task_base_url", gen_rt_task_base_url
+    )
+    RT_TASK_ROUTE_CACHE.clear()
+    do_task = do_nm_rt_task_small_set.copy()
+    loop = asyncio.get_event_loop()
+
+    # the route is looked up once for a run of the task
+    base_url = loop.run_until_complete(endpoints.get_rt_task_base_url(do_task))
+    assert base_url == "http://127.0.0.1:8003"
+    assert (
+        loop.run_until_complete(endpoints.get_rt_task_base_url(do_task))
+        == base_url
+    )
+    assert lookups == [do_task.id]
+
+    # a restarted task may listen to another port
+    do_task.started_at = datetime.datetime.utcnow()
+    assert (
+        loop.run_until_complete(endpoints.get_rt_task_base_url(do_task))
+        == "http://127.0.0.1:8004"
+    )
+
+    # the route is dropped when the pod doesn't answer
+    RT_TASK_ROUTE_CACHE.delete(do_task.id)
+    loop.run_until_complete(endpoints.get_rt_task_base_url(do_task))
+    assert lookups == [do_task.id] * 3
+    RT_TASK_ROUTE_CACHE.clear()
+
+
+def test_start_task_executor_failed(
+    api_client: TestClient,
+    dummy_user_token_header: Dict[str, str],
+    monkeypatch: Any,
+    do_nm_batch_task_small_set: schemas.NmTaskDO,
+) -> None:
+    task_id = do_nm_batch_task_small_set.id
+    nm_status = NM_TASK_CRUD.get_task(task_id).ext_info.nm_status
+
+    def start_task(do_task: schemas.NmTaskDO, user_id: int) -> None:
+        raise EXCEPTION_LIB.TASK__STATUS_DISORDER.value("no free slot")
+
+    monkeypatch.setattr(endpoints.TASK_EXECUTOR, "start_task", start_task)
+
+    # the task is not launched, so its status is switched back to start it again
+    for _ in range(2):
+        response = api_client.post(
+            f"{API_SETTING.API_V1_STR}/tasks/nm/{task_id}/start",
+            headers=dummy_user_token_header,
+        )
+        assert response.json()["error_domain"] == "TASK__STATUS_DISORDER"
+        db.session.expire_all()
+        assert NM_TASK_CRUD.get_task(task_id).ext_info.nm_status == nm_status
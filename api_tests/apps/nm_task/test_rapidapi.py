@@ -0,0 +1,57 @@
+from fastapi import Response
+
+from server.apps.nm_task.rapidapi import RapidAPISanctionLane
+
+
+def test_RapidAPISanctionLane_route() -> None:
+    lane = RapidAPISanctionLane(result_cache_size=10, result_cache_ttl=60)
+    nr_resolve = [0]
+
+    def resolve() -> tuple:
+        nr_resolve[0] += 1
+        return (nr_resolve[0], f"http://nm-1-{nr_resolve[0]}.nm.svc")
+
+    assert lane.load_route(resolve) == (1, "http://nm-1-1.nm.svc")
+    assert lane.load_route(resolve) == (1, "http://nm-1-1.nm.svc")
+    assert nr_resolve[0] == 1
+
+    # the housekeeper pushes a new task id
+    lane.on_task_id_change("2")
+    assert lane.route is None
+    assert lane.load_route(resolve) == (2, "http://nm-1-2.nm.svc")
+    assert nr_resolve[0] == 2
+
+    # a route resolved before an invalidation is not cached
+    def resolve_and_invalidate() -> tuple:
+        lane.invalidate()
+        return (3, "http://nm-1-3.nm.svc")
+
+    lane.invalidate()
+    assert lane.load_route(resolve_and_invalidate) == (
+        3,
+        "http://nm-1-3.nm.svc",
+    )
+    assert lane.route is None
+
+
+def test_RapidAPISanctionLane_result() -> None:
+    lane = RapidAPISanctionLane(result_cache_size=10, result_cache_ttl=60)
+    key = lane.gen_result_key(1, "application/json", ["Zhe Sun"])
+    assert lane.get_result(key) is None
+
+    lane.set_result(
+        key,
+        Response(content=b'{"query_result":[]}', media_type="application/json"),
+    )
+    resp = lane.get_result(key)
+    assert resp is not None
+    assert resp.body == b'{"query_result":[]}'
+    assert resp.media_type == "application/json"
+
+    # only successful results are cached
+    error_key = lane.gen_result_key(1, "application/json", ["Zimmer Hao"])
+    lane.set_result(error_key, Response(content=b"{}", status_code=500))
+    assert lane.get_result(error_key) is None
+
+    lane.invalidate()
+    assert lane.get_result(key) is None
@@ -0,0 +1,41 @@
+import pytest
+
+from server.apps.nm_task.schemas import NM_STATUS, NmTaskDO, RTQueryRequst
+from server.apps.nm_task.utils import rt_nm_match_validate
+from server.apps.user.schemas import UserDO
+from server.core.exception import EXCEPTION_LIB
+from server.settings import USER_BASE_LIMIT_CONFIG
+
+
+def test_rt_nm_match_validate_bulk(
+    do_dummy_user: UserDO, do_nm_rt_task_small_set: NmTaskDO
+) -> None:
+    do_task = do_nm_rt_task_small_set.copy(deep=True)
+    do_task.ext_info.nm_status = NM_STATUS.READY
+
+    limit_compute = USER_BASE_LIMIT_CONFIG["free-user"].compute
+    query_request = RTQueryRequst(
+        query_keys=["Zhe Sun"] * (limit_compute.max_rt_nr_queries + 1),
+        search_option=do_task.ext_info.search_option,
+    )
+
+    # a normal query is limited by max_rt_nr_queries
+    with pytest.raises(
+        EXCEPTION_LIB.NM_RT__EXCEED_MAX_RT_NR_QUERIES_LIMIT.value
+    ):
+        rt_nm_match_validate(do_task, do_task.id, do_dummy_user, query_request)
+
+    # a bulk query is limited by max_rt_nr_bulk_queries
+    rt_nm_match_validate(
+        do_task, do_task.id, do_dummy_user, query_request, bulk=True
+    )
+
+    query_request.query_keys = ["Zhe Sun"] * (
+        limit_compute.max_rt_nr_bulk_queries + 1
+    )
+    with pytest.raises(
+        EXCEPTION_LIB.NM_RT__EXCEED_MAX_RT_NR_QUERIES_LIMIT.value
+    ):
+        rt_nm_match_validate(
+            do_task, do_task.id, do_dummy_user, query_request, bulk=True
+        )
@@ -0,0 +1,37 @@
+from typing import Dict
+
+from fastapi.testclient import TestClient
+
+from server.apps.nm_task import schemas as task_schemas
+from server.apps.nm_task.crud import NM_TASK_CRUD
+from server.apps.stat.schemas import StatDTO
+from server.settings import API_SETTING
+
+
+def test_retrieve_stats(
+    api_client: TestClient,
+    dummy_user_token_header: Dict[str, str],
+    do_nm_batch_task_small_set: task_schemas.NmTaskDO,
+    do_nm_rt_task_small_set: task_schemas.NmTaskDO,
+) -> None:
+    NM_TASK_CRUD.update_task_status(
+        do_nm_batch_task_small_set.id, task_schemas.NM_STATUS.COMPLETE
+    )
+    NM_TASK_CRUD.update_task_status(
+        do_nm_rt_task_small_set.id, task_schemas.NM_STATUS.READY
+    )
+
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/stats", headers=dummy_user_token_header
+    )
+    assert response.status_code == 200
+    stat = StatDTO(**response.json())
+
+    # the gt and nm datasets of the tasks
+    assert stat.created_dataset.uploaded_count == 2
+    assert stat.batch_task.created_count == 1
+    assert stat.batch_task.complete_count == 1
+    assert stat.batch_task.running_count == 0
+    assert stat.realtime_task.created_count == 1
+    assert stat.realtime_task.running_count == 1
+    assert stat.realtime_task.failed_count == 0
@@ -0,0 +1,58 @@
+from fastapi.testclient import TestClient
+
+from server.apps.user import schemas as user_schemas
+from server.apps.user.cache import USER_CACHE
+from server.apps.user.crud import USER_CRUD
+from server.core import security
+from server.settings import API_SETTING
+
+
+def test_user_cache(
+    api_client: TestClient,
+    dummy_user_token_header: dict,
+    do_dummy_user: user_schemas.UserDO,
+) -> None:
+    USER_CACHE.invalidate(do_dummy_user.id)
+    assert USER_CACHE.get(do_dummy_user.id) is None
+
+    # an authenticated request fills the cache
+    response = api_client.post(
+        f"{API_SETTING.API_V1_STR}/test-token", headers=dummy_user_token_header
+    )
+    assert response.status_code == 200
+    do_user_cached = USER_CACHE.get(do_dummy_user.id)
+    assert do_user_cached is not None
+    assert do_user_cached.full_name == do_dummy_user.full_name
+
+    # update user invalidates the cache
+    USER_CRUD.update_user(
+        do_dummy_user.id, user_schemas.UserUpdateDO(full_name="Dummy Panda")
+    )
+    assert USER_CACHE.get(do_dummy_user.id) is None
+
+    response = api_client.post(
+        f"{API_SETTING.API_V1_STR}/test-token", headers=dummy_user_token_header
+    )
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Dummy Panda"
+
+    USER_CRUD.update_user(
+        do_dummy_user.id,
+        user_schemas.UserUpdateDO(full_name=do_dummy_user.full_name),
+    )
+
+
+def test_user_cache_delete_user() -> None:
+    do_user = USER_CRUD.create_user(
+        user_schemas.UserCreateDO(
+            email="dummy.cache@gmail.com",
+            hashed_password=security.get_password_hash("dummy123456"),
+            full_name="DummyCache",
+            login_type=user_schemas.LOGIN_TYPE.EMAIL,
+        )
+    )
+    USER_CACHE.set(do_user)
+    assert USER_CACHE.get(do_user.id) == do_user
+
+    USER_CRUD.delete_user(do_user.id)
+    assert USER_CACHE.get(do_user.id) is None
@@ -2,7 +2,9 @@ from typing import List
 
 import pytest
 
+from api_tests.pytest_utils import ReadCRUD
 from server.apps.user import schemas as user_schemas
+from server.apps.user.async_crud import USER_ASYNC_CRUD
 from server.apps.user.crud import USER_CRUD
 from server.core import security
 
@@ -25,11 +27,13 @@ def test_create_user() -> None:
     return
 
 
-def test_get_user(do_dummy_user: user_schemas.UserDO) -> None:
+def test_get_user(do_dummy_user: user_schemas.UserDO, db_path: str) -> None:
+    user_read_crud = ReadCRUD(USER_ASYNC_CRUD, db_path)
+
     # get a random user_id
-    assert USER_CRUD.get_user(666666) is None
+    assert user_read_crud.get_user(666666) is None
 
-    do_user = USER_CRUD.get_user(do_dummy_user.id)
+    do_user = user_read_crud.get_user(do_dummy_user.id)
 
     assert do_user is not None
     assert do_user.email == do_dummy_user.email
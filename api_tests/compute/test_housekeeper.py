@@ -0,0 +1,196 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from kubernetes.client import models as k8s
+from kubernetes.client.rest import ApiException
+
+from server.apps.nm_task import models, schemas
+from server.apps.nm_task.crud import NM_TASK_CRUD
+from server.apps.user import schemas as user_schemas
+from server.compute.housekeeper import TaskPodWatcher, get_pod_termination
+from server.kubernetes.pod_watch import PodWatchSource
+from server.libs.db.sqlalchemy import db
+from server.settings import API_SETTING
+
+
+def gen_pod(
+    name: str, resource_version: str, reason: Optional[str] = None
+) -> k8s.V1Pod:
+    state = k8s.V1ContainerState(
+        running=None
+        if reason
+        else k8s.V1ContainerStateRunning(started_at=None),
+        terminated=k8s.V1ContainerStateTerminated(exit_code=0, reason=reason)
+        if reason
+        else None,
+    )
+    return k8s.V1Pod(
+        metadata=k8s.V1ObjectMeta(name=name, resource_version=resource_version),
+        status=k8s.V1PodStatus(
+            container_statuses=[
+                k8s.V1ContainerStatus(
+                    name="base",
+                    image="nm",
+                    image_id="nm",
+                    ready=not reason,
+                    restart_count=0,
+                    state=state,
+                )
+            ]
+        ),
+    )
+
+
+class FakePodWatchSource(PodWatchSource):
+    """Replay the listed pods and the watch rounds of events"""
+
+    def __init__(self, pods: List[k8s.V1Pod], watch_rounds: List[Any]) -> None:
+        self.pods = pods
+        self.watch_rounds = watch_rounds
+        self.nr_list = 0
+        self.watched_resource_versions: List[str] = []
+
+    def list_pods(self) -> Tuple[List[k8s.V1Pod], str]:
+        self.nr_list += 1
+        return self.pods, "1"
+
+    def watch_pods(
+        self, resource_version: str, timeout_seconds: int
+    ) -> Iterator[Dict[str, Any]]:
+        self.watched_resource_versions.append(resource_version)
+        watch_round = self.watch_rounds.pop(0)
+        if isinstance(watch_round, Exception):
+            raise watch_round
+        yield from watch_round
+
+    def read_pod(self, pod_name: str) -> Optional[k8s.V1Pod]:
+        return None
+
+
+def test_get_pod_termination() -> None:
+    assert get_pod_termination(k8s.V1Pod(status=k8s.V1PodStatus())) is None
+    assert get_pod_termination(gen_pod("pod", "1")) is None
+    assert (
+        get_pod_termination(gen_pod("pod", "1", "OOMKilled"))
+        == schemas.POD_STATUS.OOMKILLED
+    )
+    assert (
+        get_pod_termination(gen_pod("pod", "1", "Completed"))
+        == schemas.POD_STATUS.COMPLETED
+    )
+
+
+def test_task_pod_watcher(
+    do_dummy_user: user_schemas.UserDO,
+    do_nm_batch_task_small_set: schemas.NmTaskDO,
+) -> None:
+    task_id = do_nm_batch_task_small_set.id
+    pod_names = ["pod-oom", "pod-done", "pod-gone", "pod-running"]
+    for pod_name in pod_names:
+        NM_TASK_CRUD.add_task_run_record(do_dummy_user.id, task_id, pod_name)
+    NM_TASK_CRUD.update_task_status(task_id, schemas.NM_STATUS.LAUNCHING)
+
+    source = FakePodWatchSource(
+        pods=[
+            gen_pod("pod-oom", "1"),
+            gen_pod("pod-done", "1", "Completed"),
+            gen_pod("pod-running", "1"),
+        ],
+        watch_rounds=[
+            [
+                {"type": "MODIFIED", "object": gen_pod("pod-running", "2")},
+                {
+                    "type": "MODIFIED",
+                    "object": gen_pod("pod-oom", "3", "OOMKilled"),
+                },
+            ],
+            ApiException(status=410),
+            [],
+        ],
+    )
+    watcher = TaskPodWatcher(source)
+
+    # list, then watch from the resourceVersion of the list
+    watcher.watch()
+    assert source.nr_list == 1
+    assert source.watched_resource_versions == ["1"]
+    assert watcher.resource_version == "3"
+
+    db.session.expire_all()
+    pod_statuses = {
+        r.pod_name: r.pod_status
+        for r in NM_TASK_CRUD.get_task_run_history_list(
+            do_dummy_user.id, task_id
+        )
+        if r.pod_name in pod_names
+    }
+    assert pod_statuses == {
+        "pod-oom": schemas.POD_STATUS.OOMKILLED,
+        "pod-done": schemas.POD_STATUS.COMPLETED,
+        "pod-gone": schemas.POD_STATUS.COMPLETED,
+        "pod-running": schemas.POD_STATUS.RUNNING,
+    }
+    do_task = NM_TASK_CRUD.get_task(task_id)
+    assert do_task.ext_info.nm_status == schemas.NM_STATUS.OOMKILLED
+
+    # resume from the last event, and relist when it's too old
+    watcher.watch()
+    assert source.watched_resource_versions == ["1", "3"]
+    assert watcher.resource_version is None
+    watcher.watch()
+    assert source.nr_list == 2
+    assert source.watched_resource_versions == ["1", "3", "1"]
+
+    db.session.query(models.AbcXyzTaskRunHistory).filter(
+        models.AbcXyzTaskRunHistory.pod_name.in_(pod_names)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def test_fail_stale_preparing_tasks(
+    do_dummy_user: user_schemas.UserDO,
+    do_nm_batch_task_small_set: schemas.NmTaskDO,
+) -> None:
+    task_id = do_nm_batch_task_small_set.id
+    watcher = TaskPodWatcher(FakePodWatchSource(pods=[], watch_rounds=[]))
+    stale_started_at = datetime.utcnow() - timedelta(
+        seconds=API_SETTING.K8S_PREPARING_TIMEOUT + 60
+    )
+
+    def get_status() -> schemas.NM_STATUS:
+        db.session.expire_all()
+        return NM_TASK_CRUD.get_task(task_id).ext_info.nm_status
+
+    # preparing within the timeout, the launch may still be running
+    NM_TASK_CRUD.update_task_status(
+        task_id, schemas.NM_STATUS.PREPARING, started_at=datetime.utcnow()
+    )
+    watcher.fail_stale_preparing_tasks()
+    assert get_status() == schemas.NM_STATUS.PREPARING
+
+    # launched, the pod is pending
+    NM_TASK_CRUD.update_task_status(
+        task_id, schemas.NM_STATUS.PREPARING, started_at=stale_started_at
+    )
+    NM_TASK_CRUD.add_task_run_record(do_dummy_user.id, task_id, "pod-pending")
+    watcher.fail_stale_preparing_tasks()
+    assert get_status() == schemas.NM_STATUS.PREPARING
+
+    # the launch is lost, a run record of the last round doesn't count
+    NM_TASK_CRUD.update_task_status(
+        task_id,
+        schemas.NM_STATUS.PREPARING,
+        started_at=stale_started_at + timedelta(seconds=1),
+    )
+    db.session.query(models.AbcXyzTaskRunHistory).filter(
+        models.AbcXyzTaskRunHistory.pod_name == "pod-pending"
+    ).update({"started_at": stale_started_at})
+    db.session.commit()
+    watcher.fail_stale_preparing_tasks()
+    assert get_status() == schemas.NM_STATUS.FAILED
+    assert NM_TASK_CRUD.get_task(task_id).finished_at is not None
+
+    db.session.query(models.AbcXyzTaskRunHistory).filter(
+        models.AbcXyzTaskRunHistory.pod_name == "pod-pending"
+    ).delete(synchronize_session=False)
+    db.session.commit()
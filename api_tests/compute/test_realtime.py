@@ -0,0 +1,67 @@
+import importlib
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Generator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server.apps.nm_task import schemas
+from server.nm_algo.create_data import build_small_data, save_test_data
+from server.settings import API_SETTING
+
+
+@pytest.fixture()
+def realtime_pod(
+    do_nm_rt_task_small_set: schemas.NmTaskDO, monkeypatch: Any
+) -> Generator[ModuleType, None, None]:
+    """
+    the real-time pod module, which loads the task on import
+    """
+    Path("./localfs/data/").mkdir(parents=True, exist_ok=True)
+    gt_df, nm_df = build_small_data()
+    save_test_data(
+        gt_df,
+        "./localfs/data/gt-small.csv",
+        nm_df,
+        "./localfs/data/nm-small.csv",
+    )
+
+    monkeypatch.setenv("NM_TASK_ID", str(do_nm_rt_task_small_set.id))
+    monkeypatch.setenv("USER_ID", str(do_nm_rt_task_small_set.owner_id))
+    yield importlib.import_module("server.compute.realtime")
+    sys.modules.pop("server.compute.realtime", None)
+
+
+def test_nm_rt_search_option(
+    do_nm_rt_task_small_set: schemas.NmTaskDO, realtime_pod: ModuleType
+) -> None:
+    client = TestClient(realtime_pod.app)
+    url = f"{API_SETTING.API_V1_STR}/nm-realtime"
+    default = do_nm_rt_task_small_set.ext_info.search_option.dict()
+
+    response = client.get(url, params={"q": ["Zhe Sun"]})
+    assert response.status_code == 200
+    assert response.json()["search_option"] == default
+
+    # each field not set by the query is the task default
+    response = client.get(url, params={"q": ["Zhe Sun"], "top_n": 1})
+    assert response.status_code == 200
+    assert response.json()["search_option"] == {**default, "top_n": 1}
+
+    response = client.get(
+        url,
+        params={
+            "q": ["Zhe Sun"],
+            "threshold": 0.5,
+            "selected_cols": ["company id"],
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["search_option"] == {
+        **default,
+        "threshold": 0.5,
+        "selected_cols": ["company id"],
+    }
+    assert "company id" in response.json()["columns"]
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import time
+from typing import Any, List, Optional
+
+from server.compute.rq_worker import TASK_EVENT, TaskSupervisor
+
+
+class FakePubSub(object):
+    """Return the queued messages, then nothing, as a subscribed redis pubsub"""
+
+    def __init__(self, messages: List[Any]) -> None:
+        self.messages = messages
+        self.closed = False
+
+    def get_message(
+        self, ignore_subscribe_messages: bool = False, timeout: float = 0
+    ) -> Optional[dict]:
+        if self.messages:
+            return self.messages.pop(0)
+        time.sleep(min(timeout, 0.05))
+        return None
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def start_proc(code: str) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-c", code])
+
+
+def test_task_supervisor_exit() -> None:
+    task_proc = start_proc("import sys; sys.exit(3)")
+    pubsub = FakePubSub([])
+    supervisor = TaskSupervisor(task_proc, pubsub, time.monotonic() + 30)
+
+    assert supervisor.wait() == (TASK_EVENT.EXIT, 3)
+    supervisor.close()
+    assert pubsub.closed
+
+
+def test_task_supervisor_stop() -> None:
+    task_proc = start_proc("import time; time.sleep(30)")
+    pubsub = FakePubSub([None, {"type": "message", "data": b"1"}])
+    supervisor = TaskSupervisor(task_proc, pubsub, None)
+
+    try:
+        assert supervisor.wait() == (TASK_EVENT.STOP, None)
+    finally:
+        task_proc.kill()
+        supervisor.close()
+
+
+def test_task_supervisor_ttl_expired() -> None:
+    task_proc = start_proc("import time; time.sleep(30)")
+    supervisor = TaskSupervisor(
+        task_proc, FakePubSub([]), time.monotonic() + 0.2
+    )
+
+    try:
+        assert supervisor.wait() == (TASK_EVENT.TTL_EXPIRED, None)
+        assert task_proc.poll() is None
+    finally:
+        task_proc.kill()
+        supervisor.close()
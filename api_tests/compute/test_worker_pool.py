@@ -0,0 +1,98 @@
+import threading
+from typing import Dict, List, Optional, Set
+
+import fakeredis
+
+from server.compute.worker_pool import (
+    NM_REALTIME_QUEUE,
+    WorkerPool,
+    gen_rt_task_port,
+)
+from server.settings import API_SETTING
+
+
+class FakeWorkerPool(WorkerPool):
+    def __init__(
+        self, nr_slots: int, server: Optional[fakeredis.FakeServer] = None
+    ) -> None:
+        super().__init__(
+            NM_REALTIME_QUEUE,
+            nr_slots,
+            fakeredis.FakeRedis(server=server or fakeredis.FakeServer()),
+        )
+        self.ended_task_ids: Set[int] = set()
+
+    def is_job_ended(self, task_id: int) -> bool:
+        return task_id in self.ended_task_ids
+
+
+class RacingWorkerPool(FakeWorkerPool):
+    """Both starters check the ended job before either takes the slot over"""
+
+    def __init__(
+        self, server: fakeredis.FakeServer, barrier: threading.Barrier
+    ) -> None:
+        super().__init__(nr_slots=1, server=server)
+        self.barrier = barrier
+
+    def is_job_ended(self, task_id: int) -> bool:
+        self.barrier.wait(timeout=5)
+        return True
+
+
+def test_worker_pool() -> None:
+    worker_pool = FakeWorkerPool(nr_slots=2)
+
+    assert worker_pool.acquire_slot(1) == 0
+    assert worker_pool.acquire_slot(2) == 1
+    # a restarted task keeps its slot
+    assert worker_pool.acquire_slot(1) == 0
+    # all slots are busy
+    assert worker_pool.acquire_slot(3) is None
+    assert worker_pool.get_slots() == {0: 1, 1: 2}
+
+    # the worker releases the slot when the task ends
+    worker_pool.release_task(1)
+    assert worker_pool.get_task_slot(1) is None
+    assert worker_pool.acquire_slot(3) == 0
+    assert worker_pool.get_task_slot(3) == 0
+
+    # the slot of a failed job is taken over
+    worker_pool.ended_task_ids.add(2)
+    assert worker_pool.acquire_slot(4) == 1
+    assert worker_pool.get_slots() == {0: 3, 1: 4}
+
+
+def test_worker_pool_take_over_race() -> None:
+    server = fakeredis.FakeServer()
+    FakeWorkerPool(nr_slots=1, server=server).acquire_slot(9)
+
+    barrier = threading.Barrier(2)
+    acquired: Dict[int, Optional[int]] = {}
+
+    def acquire(task_id: int) -> None:
+        acquired[task_id] = RacingWorkerPool(server, barrier).acquire_slot(
+            task_id
+        )
+
+    threads: List[threading.Thread] = [
+        threading.Thread(target=acquire, args=(task_id,)) for task_id in [1, 2]
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # only one of the starters takes the slot of the ended task over
+    winners = [task_id for task_id, slot in acquired.items() if slot == 0]
+    assert len(winners) == 1
+    assert set(acquired.values()) == {0, None}
+    assert FakeWorkerPool(nr_slots=1, server=server).get_slots() == {
+        0: winners[0]
+    }
+
+
+def test_gen_rt_task_port() -> None:
+    base_port = int(API_SETTING.REALTIME_NM_ENDPOINT_PORT)
+    assert gen_rt_task_port(0) == base_port
+    assert gen_rt_task_port(2) == base_port + 2
@@ -0,0 +1,55 @@
+import os
+import signal
+import sys
+from typing import List
+
+from server.compute.zygote import (
+    fork_entrypoint,
+    get_task_entrypoint,
+    run_batch_command,
+    run_realtime_command,
+)
+
+
+def exit_by_env(command: List[str]) -> None:
+    sys.exit(int(os.environ["EXIT_CODE"]))
+
+
+def kill_self(command: List[str]) -> None:
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def raise_error(command: List[str]) -> None:
+    raise ValueError(command)
+
+
+def test_get_task_entrypoint() -> None:
+    assert (
+        get_task_entrypoint(["python", "server/compute/batch.py", "1", "2"])
+        == run_batch_command
+    )
+    assert (
+        get_task_entrypoint(
+            [
+                "uvicorn",
+                "server.compute.realtime:app",
+                "--host",
+                "0.0.0.0",
+                "--port",
+                "8002",
+            ]
+        )
+        == run_realtime_command
+    )
+    assert get_task_entrypoint(["python", "-c", "pass"]) is None
+
+
+def test_fork_entrypoint() -> None:
+    task_proc = fork_entrypoint(exit_by_env, [], {"EXIT_CODE": "3"})
+    assert task_proc.wait() == 3
+    assert task_proc.poll() == 3
+
+    # the return code of a killed task is the same as `subprocess.Popen`
+    assert fork_entrypoint(kill_self, [], {}).wait() == -signal.SIGKILL
+    assert fork_entrypoint(raise_error, [], {}).wait() == 1
+    assert fork_entrypoint(lambda command: None, [], {}).wait() == 0
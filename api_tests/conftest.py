@@ -1,3 +1,4 @@
+import asyncio
 import copy
 import json
 import os
@@ -22,6 +23,7 @@ from server.apps.oauth.crud import OAUTH_CRUD
 from server.apps.user import schemas as user_schemas
 from server.apps.user.crud import USER_CRUD
 from server.core import security
+from server.libs.db.async_db import async_db
 from server.libs.db.sqlalchemy import db
 from server.settings import API_SETTING
 
@@ -207,6 +209,22 @@ def api_client() -> Generator:
         yield client
 
 
+@pytest.fixture(params=["sync", "async"])
+def db_path(request: Any) -> Generator[str, None, None]:
+    """
+    Run a test by the sync session and by the async DB, see `ReadCRUD`
+    """
+    connected = False
+    if request.param == "async" and not async_db.is_connected:
+        asyncio.get_event_loop().run_until_complete(async_db.connect())
+        connected = True
+
+    yield request.param
+
+    if connected:
+        asyncio.get_event_loop().run_until_complete(async_db.disconnect())
+
+
 def get_token_header(do_user: user_schemas.UserDO) -> Dict:
     """
     generate a token by a given user
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+from typing import Any, Dict, Generator, List
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from starlette.requests import Request
+
+from server.apps.user import schemas as user_schemas
+from server.apps.user.cache import USER_CACHE, RedisUserCache
+from server.core import request as core_request
+from server.libs.db.async_db import async_db
+from server.libs.db.sqlalchemy import engine
+from server.settings import API_SETTING
+
+
+@pytest.fixture()
+def user_queries(monkeypatch: Any) -> Generator[List[str], None, None]:
+    """
+    collect the SQL statements on table users during a test, by both sync and async DB
+    """
+    statements: List[str] = []
+
+    def before_cursor_execute(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    def count_async(fetch: Any) -> Any:
+        async def counted_fetch(query: Any, *args: Any, **kwargs: Any) -> Any:
+            if "FROM users" in str(query):
+                statements.append(str(query))
+            return await fetch(query, *args, **kwargs)
+
+        return counted_fetch
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    monkeypatch.setattr(async_db, "fetch_one", count_async(async_db.fetch_one))
+    monkeypatch.setattr(async_db, "fetch_all", count_async(async_db.fetch_all))
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_resolve_user_once_per_request(
+    api_client: TestClient,
+    dummy_user_token_header: dict,
+    do_dummy_user: user_schemas.UserDO,
+    user_queries: List[str],
+    monkeypatch: Any,
+) -> None:
+    # demo account route check, route logger and get_current_user all need the user
+    monkeypatch.setattr(API_SETTING, "DEMO_ACCOUNT_LIMITATION", True)
+    USER_CACHE.invalidate(do_dummy_user.id)
+
+    response = api_client.post(
+        f"{API_SETTING.API_V1_STR}/test-token", headers=dummy_user_token_header
+    )
+    assert response.status_code == 200
+    assert response.json()["id"] == do_dummy_user.id
+    assert len(user_queries) == 1
+
+    # the user is cached for the next request
+    response = api_client.post(
+        f"{API_SETTING.API_V1_STR}/test-token", headers=dummy_user_token_header
+    )
+    assert response.status_code == 200
+    assert len(user_queries) == 1
+
+
+def test_resolve_invalid_token(
+    api_client: TestClient,
+    user_queries: List[str],
+) -> None:
+    response = api_client.post(
+        f"{API_SETTING.API_V1_STR}/test-token",
+        headers={"Authorization": "Bearer invalid-token"},
+    )
+    assert response.status_code == 418
+    assert response.json()["error_domain"] == "API__VALIDATE_CRDENTIALS_ERROR"
+    assert len(user_queries) == 0
+
+
+def test_resolve_user_by_redis_cache(
+    dummy_user_token_header: Dict[str, str],
+    do_dummy_user: user_schemas.UserDO,
+    user_queries: List[str],
+    monkeypatch: Any,
+) -> None:
+    redis_user_cache = RedisUserCache()
+    redis_conn = fakeredis.FakeRedis()
+    redis_user_cache.redis_conn = redis_conn
+    monkeypatch.setattr(core_request, "USER_CACHE", redis_user_cache)
+
+    # record the threads of the redis calls, which must not block the event loop
+    redis_threads: List[threading.Thread] = []
+
+    def track_thread(command: Any) -> Any:
+        def tracked_command(*args: Any, **kwargs: Any) -> Any:
+            redis_threads.append(threading.current_thread())
+            return command(*args, **kwargs)
+
+        return tracked_command
+
+    monkeypatch.setattr(redis_conn, "get", track_thread(redis_conn.get))
+    monkeypatch.setattr(redis_conn, "set", track_thread(redis_conn.set))
+
+    def resolve_user() -> Any:
+        headers = [
+            (key.lower().encode(), value.encode())
+            for key, value in dummy_user_token_header.items()
+        ]
+        request = Request({"type": "http", "headers": headers})
+        principal = asyncio.get_event_loop().run_until_complete(
+            core_request.resolve_request_principal(request)
+        )
+        return principal.user
+
+    assert resolve_user() == do_dummy_user
+    assert len(user_queries) == 1
+    assert redis_conn.exists(redis_user_cache.gen_key(do_dummy_user.id))
+
+    # the next request is served by redis
+    assert resolve_user() == do_dummy_user
+    assert len(user_queries) == 1
+
+    assert len(redis_threads) == 3
+    assert threading.main_thread() not in redis_threads
@@ -0,0 +1,88 @@
+from typing import Any, List
+
+from kubernetes.client.rest import ApiException
+
+from server.apps.nm_task import models, schemas
+from server.apps.nm_task.crud import NM_TASK_CRUD
+from server.apps.user import schemas as user_schemas
+from server.executors.kubernetes_executor import KubernetesExecutor
+from server.libs.db.sqlalchemy import db
+
+
+class FakeK8SCommand:
+    """Record the launches instead of calling the K8S API"""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.launches: List[Any] = []
+
+    def run_task_in_k8s(
+        self,
+        task_id: int,
+        user_id: int,
+        entrypoint: List,
+        command: List,
+        with_service: bool = False,
+    ) -> str:
+        if self.fail:
+            raise ApiException(status=500)
+        self.launches.append((task_id, command, with_service))
+        return f"pod-{task_id}-{len(self.launches)}"
+
+
+def run_k8s_executor(
+    k8s_command: FakeK8SCommand, do_task: schemas.NmTaskDO, user_id: int
+) -> None:
+    NM_TASK_CRUD.update_task_status(do_task.id, schemas.NM_STATUS.PREPARING)
+    executor = KubernetesExecutor(k8s_command, redis_conn=object())  # type: ignore
+    executor.start_task(do_task, user_id)
+    # wait for the background launch
+    executor.shutdown()
+    db.session.expire_all()
+
+
+def test_kubernetes_executor_launch(
+    do_dummy_user: user_schemas.UserDO,
+    do_nm_batch_task_small_set: schemas.NmTaskDO,
+    do_nm_rt_task_small_set: schemas.NmTaskDO,
+) -> None:
+    k8s_command = FakeK8SCommand()
+    run_k8s_executor(k8s_command, do_nm_batch_task_small_set, do_dummy_user.id)
+    run_k8s_executor(k8s_command, do_nm_rt_task_small_set, do_dummy_user.id)
+
+    # only the realtime task has a service
+    assert [
+        (task_id, with_service)
+        for task_id, _, with_service in k8s_command.launches
+    ] == [
+        (do_nm_batch_task_small_set.id, False),
+        (do_nm_rt_task_small_set.id, True),
+    ]
+    pod_names = [
+        r.pod_name
+        for r in NM_TASK_CRUD.get_task_run_history_list(
+            do_dummy_user.id, do_nm_rt_task_small_set.id
+        )
+    ]
+    assert f"pod-{do_nm_rt_task_small_set.id}-2" in pod_names
+
+    db.session.query(models.AbcXyzTaskRunHistory).filter(
+        models.AbcXyzTaskRunHistory.pod_name.in_(
+            [
+                f"pod-{task_id}-{i}"
+                for i, (task_id, _, _) in enumerate(k8s_command.launches, 1)
+            ]
+        )
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def test_kubernetes_executor_launch_failed(
+    do_dummy_user: user_schemas.UserDO,
+    do_nm_batch_task_small_set: schemas.NmTaskDO,
+) -> None:
+    run_k8s_executor(
+        FakeK8SCommand(fail=True), do_nm_batch_task_small_set, do_dummy_user.id
+    )
+    do_task = NM_TASK_CRUD.get_task(do_nm_batch_task_small_set.id)
+    assert do_task.ext_info.nm_status == schemas.NM_STATUS.FAILED
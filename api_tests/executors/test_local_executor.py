@@ -0,0 +1,86 @@
+import sys
+import time
+from typing import Any, List
+
+import pytest
+
+from server.apps.nm_task import schemas
+from server.apps.nm_task.crud import NM_TASK_CRUD
+from server.apps.user import schemas as user_schemas
+from server.core.exception import EXCEPTION_LIB
+from server.executors import local_executor
+from server.executors.local_executor import LocalExecutor
+from server.libs.db.sqlalchemy import db
+
+
+def wait_task_status(
+    task_id: int, nm_status: schemas.NM_STATUS, timeout: float = 30
+) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        db.session.expire_all()
+        if NM_TASK_CRUD.get_task(task_id).ext_info.nm_status == nm_status:
+            return
+        time.sleep(0.1)
+    raise AssertionError(f"task {task_id} is not {nm_status}")
+
+
+def run_local_executor(
+    monkeypatch: Any,
+    do_task: schemas.NmTaskDO,
+    user_id: int,
+    command: List[str],
+) -> LocalExecutor:
+    monkeypatch.setattr(
+        local_executor, "gen_task_command", lambda *args, **kwargs: command
+    )
+    NM_TASK_CRUD.update_task_status(do_task.id, schemas.NM_STATUS.PREPARING)
+    executor = LocalExecutor(max_tasks=1)
+    executor.start_task(do_task, user_id)
+    return executor
+
+
+def test_local_executor_complete(
+    monkeypatch: Any,
+    do_dummy_user: user_schemas.UserDO,
+    do_nm_batch_task_small_set: schemas.NmTaskDO,
+) -> None:
+    executor = run_local_executor(
+        monkeypatch,
+        do_nm_batch_task_small_set,
+        do_dummy_user.id,
+        [sys.executable, "-c", "pass"],
+    )
+    wait_task_status(do_nm_batch_task_small_set.id, schemas.NM_STATUS.COMPLETE)
+    executor.shutdown()
+    assert executor.runs == {}
+
+
+def test_local_executor_stop(
+    monkeypatch: Any,
+    do_dummy_user: user_schemas.UserDO,
+    do_nm_batch_task_small_set: schemas.NmTaskDO,
+) -> None:
+    executor = run_local_executor(
+        monkeypatch,
+        do_nm_batch_task_small_set,
+        do_dummy_user.id,
+        [sys.executable, "-c", "import time; time.sleep(30)"],
+    )
+
+    # all the slots are busy
+    with pytest.raises(EXCEPTION_LIB.EXECUTOR__TASK_WORKER_NOT_AVAILABLE.value):
+        executor.start_task(do_nm_batch_task_small_set, do_dummy_user.id)
+
+    executor.stop_task(do_nm_batch_task_small_set, do_dummy_user.id)
+    wait_task_status(do_nm_batch_task_small_set.id, schemas.NM_STATUS.STOPPED)
+    executor.shutdown()
+    assert executor.runs == {}
+
+    # the task is not running in this executor anymore
+    with pytest.raises(EXCEPTION_LIB.TASK__STATUS_DISORDER.value):
+        executor.stop_task(do_nm_batch_task_small_set, do_dummy_user.id)
+    with pytest.raises(EXCEPTION_LIB.TASK__STATUS_DISORDER.value):
+        executor.gen_rt_task_base_url(
+            do_nm_batch_task_small_set.id, do_dummy_user.id
+        )
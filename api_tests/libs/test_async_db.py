@@ -0,0 +1,56 @@
+from typing import Any, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server.apps.dataset import schemas as dataset_schemas
+from server.libs.db.async_db import async_db, is_async_db_available
+from server.settings import API_SETTING
+
+
+@pytest.mark.parametrize("async_enabled", [True, False])
+def test_list_dataset_by_async_and_sync_db(
+    api_client: TestClient,
+    dummy_user_token_header: Dict[str, str],
+    do_dummy_dataset: dataset_schemas.DatasetDO,
+    monkeypatch: Any,
+    async_enabled: bool,
+) -> None:
+    # the startup event of api_client connects the async DB
+    assert async_db.is_connected
+    monkeypatch.setattr(API_SETTING, "DB_ASYNC_ENABLED", async_enabled)
+    assert is_async_db_available() == async_enabled
+
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/datasets", headers=dummy_user_token_header
+    )
+
+    assert response.status_code == 200
+    dto_datasets = [
+        dataset_schemas.DatasetDTO(**d)
+        for d in response.json()
+        if d["id"] == do_dummy_dataset.id
+    ]
+    assert len(dto_datasets) == 1
+    assert dto_datasets[0].name == do_dummy_dataset.name
+    assert (
+        dto_datasets[0].ownership_type == dataset_schemas.OWNERSHIP_TYPE.PRIVATE
+    )
+
+
+@pytest.mark.parametrize("async_enabled", [True, False])
+def test_get_nm_task_not_exist_by_async_and_sync_db(
+    api_client: TestClient,
+    dummy_user_token_header: Dict[str, str],
+    monkeypatch: Any,
+    async_enabled: bool,
+) -> None:
+    monkeypatch.setattr(API_SETTING, "DB_ASYNC_ENABLED", async_enabled)
+
+    response = api_client.get(
+        f"{API_SETTING.API_V1_STR}/tasks/nm/99999",
+        headers=dummy_user_token_header,
+    )
+
+    assert response.status_code == 418
+    assert response.json()["error_domain"] == "TASK__CURRENT_TASK_NOT_EXIST"
@@ -0,0 +1,69 @@
+from typing import Any
+
+from sqlalchemy import create_engine
+
+from server.libs.db import sqlalchemy as db_sqlalchemy
+from server.libs.db.pool import (
+    POOL_CHECKED_OUT,
+    POOL_SATURATION,
+    InstrumentedQueuePool,
+    gen_engine_args,
+    setup_pool_events,
+)
+from server.libs.db.sqlalchemy import database_url, db
+from server.settings import API_SETTING
+
+
+def test_lazy_session() -> None:
+    with db():
+        lazy_session = db_sqlalchemy._session.get()
+        assert db.has_session
+        assert lazy_session.session is None
+
+        session = db.session
+        assert lazy_session.session is session
+        assert db.session is session
+
+    assert db_sqlalchemy._session.get() is not lazy_session
+
+
+def test_gen_engine_args(monkeypatch: Any) -> None:
+    assert "pool_size" not in gen_engine_args(use_null_pool=True)
+
+    monkeypatch.setattr(API_SETTING, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(API_SETTING, "DB_POOL_MAX_OVERFLOW", 1)
+    engine_args = gen_engine_args(use_null_pool=False)
+    assert engine_args["poolclass"] is InstrumentedQueuePool
+    assert engine_args["pool_size"] == 3
+    assert engine_args["max_overflow"] == 1
+
+
+def test_pool_usage_metrics(monkeypatch: Any) -> None:
+    monkeypatch.setattr(API_SETTING, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(API_SETTING, "DB_POOL_MAX_OVERFLOW", 1)
+    engine = create_engine(database_url, **gen_engine_args(False))
+    setup_pool_events(engine, "replica")
+    other_engine = create_engine(database_url, **gen_engine_args(False))
+    setup_pool_events(other_engine, "primary")
+
+    conn_1 = engine.connect()
+    assert POOL_CHECKED_OUT.labels("replica")._value.get() == 1
+    assert POOL_SATURATION.labels("replica")._value.get() == 0.5
+
+    conn_2 = engine.connect()
+    assert POOL_SATURATION.labels("replica")._value.get() == 1
+
+    # the pools of the engines don't overwrite each other
+    other_conn = other_engine.connect()
+    other_conn.close()
+    assert POOL_CHECKED_OUT.labels("primary")._value.get() == 0
+    assert POOL_SATURATION.labels("replica")._value.get() == 1
+
+    conn_1.close()
+    conn_2.close()
+    assert POOL_CHECKED_OUT.labels("replica")._value.get() == 0
+    engine.dispose()
+    other_engine.dispose()
+
+    # the pool recreated by dispose keeps the label
+    assert engine.pool.engine_name == "replica"
@@ -0,0 +1,41 @@
+from typing import Any
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from server.apps.dataset.crud import DATASET_CRUD
+from server.apps.user import schemas as user_schemas
+from server.libs.db import sqlalchemy as db_sqlalchemy
+from server.libs.db.sqlalchemy import database_url, db, session_args
+
+
+def test_read_session_without_replica(monkeypatch: Any) -> None:
+    monkeypatch.setattr(db_sqlalchemy, "_ReadSession", None)
+    with db():
+        assert db.read_session is db.session
+
+
+def test_read_session_on_replica(
+    do_dummy_user: user_schemas.UserDO, monkeypatch: Any
+) -> None:
+    # the replica DSN points at the same Postgres
+    replica_engine = create_engine(database_url)
+    monkeypatch.setattr(
+        db_sqlalchemy,
+        "_ReadSession",
+        sessionmaker(bind=replica_engine, **session_args),
+    )
+
+    with db():
+        read_session = db.read_session
+        assert read_session is not db.session
+        assert read_session.bind is replica_engine
+        DATASET_CRUD.get_datasets_by_owner(do_dummy_user.id)
+        assert not db.committed
+
+        # read your writes after a commit in the same context
+        db.session.commit()
+        assert db.committed
+        assert db.read_session is db.session
+
+    replica_engine.dispose()
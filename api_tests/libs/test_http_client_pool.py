@@ -0,0 +1,81 @@
+import asyncio
+from typing import List
+
+import httpx
+
+from server.libs.http.client_pool import AsyncHttpClientPool
+
+
+def track_close(client: httpx.AsyncClient, closed: List) -> None:
+    aclose = client.aclose
+
+    async def tracked_aclose() -> None:
+        closed.append(client)
+        await aclose()
+
+    client.aclose = tracked_aclose  # type: ignore
+
+
+def test_AsyncHttpClientPool() -> None:
+    pool = AsyncHttpClientPool(
+        connect_timeout=1.0,
+        timeout=5.0,
+        max_connections=4,
+        max_keepalive_connections=2,
+    )
+
+    closed: List[httpx.AsyncClient] = []
+    client_a = pool.get_client("http://nm-1-1.nm.svc")
+    track_close(client_a, closed)
+    assert pool.get_client("http://nm-1-1.nm.svc") is client_a
+
+    client_b = pool.get_client("http://nm-2-1.nm.svc")
+    track_close(client_b, closed)
+    assert client_b is not client_a
+    assert len(pool.clients) == 2
+
+    asyncio.get_event_loop().run_until_complete(
+        pool.evict_client("http://nm-1-1.nm.svc")
+    )
+    assert "http://nm-1-1.nm.svc" not in pool.clients
+    assert closed == [client_a]
+    assert pool.get_client("http://nm-1-1.nm.svc") is not client_a
+
+    asyncio.get_event_loop().run_until_complete(pool.aclose())
+    assert len(pool.clients) == 0
+    assert closed == [client_a, client_b]
+
+
+def test_AsyncHttpClientPool_evict_in_use() -> None:
+    pool = AsyncHttpClientPool(
+        connect_timeout=1.0,
+        timeout=5.0,
+        max_connections=4,
+        max_keepalive_connections=2,
+    )
+    base_url = "http://nm-1-1.nm.svc"
+
+    closed: List[httpx.AsyncClient] = []
+
+    async def run() -> None:
+        async with pool.use_client(base_url) as client:
+            track_close(client, closed)
+            other_client = pool.acquire_client(base_url)
+            assert other_client is client
+
+            # a failed request evicts the client used by another request
+            await pool.evict_client(base_url)
+            assert base_url not in pool.clients
+            assert closed == []
+            assert pool.get_client(base_url) is not client
+
+            await pool.release_client(other_client)
+            assert closed == []
+
+        # closed by its last user
+        assert closed == [client]
+        assert pool.evicted == set()
+        assert pool.nr_users == {}
+        await pool.aclose()
+
+    asyncio.get_event_loop().run_until_complete(run())
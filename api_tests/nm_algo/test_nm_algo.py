@@ -3,7 +3,8 @@ from pathlib import Path
 import pandas as pd
 from pandas.testing import assert_frame_equal
 
-from server.apps.nm_task.schemas import NmTaskDO
+from server.apps.nm_task.crud import NM_TASK_CRUD
+from server.apps.nm_task.schemas import NmTaskDO, SearchOption
 from server.nm_algo.create_data import build_small_data, save_test_data
 from server.nm_algo.pipeline import NameMatchingBatch, NameMatchingRealtime
 
@@ -112,3 +113,28 @@ def test_NameMatchingRealtime(do_nm_rt_task_small_set: NmTaskDO) -> None:
     print(result)
 
     assert_frame_equal(result, expected, check_names=False)
+
+
+def test_NameMatchingRealtime_search_option(
+    do_nm_rt_task_small_set: NmTaskDO,
+) -> None:
+    nm_rt_task = NameMatchingRealtime(do_nm_rt_task_small_set.id, user_id=0)
+    search_option = SearchOption(top_n=1, threshold=0.01, selected_cols=[])
+    result = nm_rt_task.execute(
+        ["Zhe Sun", "Dirk Nowitzki", "Zimmer Hao"], search_option
+    )
+
+    expected = pd.DataFrame.from_records(
+        [
+            ["Zhe Sun", 0, "Zhe Sun", 1.0],
+            ["Dirk Nowitzki", 3, "Dirk Nowitzki", 1],
+            ["Zimmer Hao", -1, "N/A", 0],
+        ],
+        columns=["nm_name", "gt_row_no", "matched_name", "score"],
+    )
+    assert_frame_equal(result, expected, check_names=False)
+
+    # the per-request search option doesn't change the task configuration
+    assert nm_rt_task.nm_cfg.search_option.top_n == 2
+    do_task = NM_TASK_CRUD.get_task(do_nm_rt_task_small_set.id)
+    assert do_task.ext_info.search_option.top_n == 2  # type: ignore
@@ -1,8 +1,11 @@
+import asyncio
 import json
+from typing import Any, Callable
 
 from requests.models import Response
 
 from server.core.exception import NmBaseException
+from server.libs.db.async_db import AsyncCRUDProxy
 
 
 def assert_endpoint_response(response: Response, err: NmBaseException) -> None:
@@ -17,3 +20,30 @@ def assert_endpoint_response(response: Response, err: NmBaseException) -> None:
 
     response_body = json.loads(response.content)
     assert response_body["error_domain"] == err.error_domain
+
+
+class ReadCRUD:
+    """The read methods of an app CRUD, by the sync session or by the async DB
+
+    :param crud_proxy: the async CRUD entry of an app, e.g., NM_TASK_ASYNC_CRUD
+    :type crud_proxy: AsyncCRUDProxy
+    :param db_path: "sync" or "async", see the `db_path` fixture
+    :type db_path: str
+    """
+
+    def __init__(self, crud_proxy: AsyncCRUDProxy, db_path: str) -> None:
+        self.crud_proxy = crud_proxy
+        self.db_path = db_path
+
+    def __getattr__(self, name: str) -> Callable:
+        if self.db_path == "sync":
+            return getattr(self.crud_proxy.sync_crud, name)
+
+        async_method = getattr(self.crud_proxy.async_crud, name)
+
+        def run_async_method(*args: Any, **kwargs: Any) -> Any:
+            return asyncio.get_event_loop().run_until_complete(
+                async_method(*args, **kwargs)
+            )
+
+        return run_async_method
@@ -0,0 +1,116 @@
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+import fakeredis
+
+from server.settings import dynamic_setting as dynamic_setting_module
+from server.settings.dynamic_setting import (
+    DYNAMIC_SETTING_CHANNEL,
+    DYNAMIC_SETTING_KEY,
+    DynamicSetting,
+    publish_dynamic_settings,
+)
+
+
+class FakeRedis:
+    """The redis hash and pubsub calls of the dynamic settings, in memory"""
+
+    def __init__(self) -> None:
+        self.hashes: Dict[str, Dict[bytes, bytes]] = {}
+        self.published: List[Any] = []
+
+    def hgetall(self, name: str) -> Dict[bytes, bytes]:
+        return dict(self.hashes.get(name, {}))
+
+    def hset(self, name: str, mapping: Dict[str, str]) -> None:
+        self.hashes.setdefault(name, {}).update(
+            {k.encode("utf-8"): v.encode("utf-8") for k, v in mapping.items()}
+        )
+
+    def publish(self, channel: str, message: str) -> None:
+        self.published.append((channel, message))
+
+
+def test_dynamic_setting() -> None:
+    redis_conn: Any = FakeRedis()
+    dynamic_setting = DynamicSetting()
+    changed_task_ids = []
+    dynamic_setting.on_change(
+        "RAPIDAPI_SANCTION_TASK_ID", changed_task_ids.append
+    )
+
+    # the housekeeper publishes only the changed values
+    values = {"DEMO_ACCOUNT_LIMITATION": "no", "RAPIDAPI_SANCTION_TASK_ID": "1"}
+    assert publish_dynamic_settings(redis_conn, values) == values
+    assert publish_dynamic_settings(redis_conn, values) == {}
+    assert len(redis_conn.published) == 1
+
+    # a backend loads all the values once
+    dynamic_setting.load(redis_conn)
+    assert dynamic_setting.get("DEMO_ACCOUNT_LIMITATION") == "no"
+    assert dynamic_setting.get("RAPIDAPI_SANCTION_TASK_ID") == "1"
+    assert changed_task_ids == ["1"]
+
+    # then applies the published changes
+    values["RAPIDAPI_SANCTION_TASK_ID"] = "2"
+    assert publish_dynamic_settings(redis_conn, values) == {
+        "RAPIDAPI_SANCTION_TASK_ID": "2"
+    }
+    channel, message = redis_conn.published[-1]
+    assert channel == DYNAMIC_SETTING_CHANNEL
+    dynamic_setting.on_message({"data": message.encode("utf-8")})
+    assert dynamic_setting.get("RAPIDAPI_SANCTION_TASK_ID") == "2"
+    assert changed_task_ids == ["1", "2"]
+    assert json.loads(message) == {"RAPIDAPI_SANCTION_TASK_ID": "2"}
+    stored = redis_conn.hashes[DYNAMIC_SETTING_KEY]
+    assert stored[b"RAPIDAPI_SANCTION_TASK_ID"] == b"2"
+
+
+def wait_until(predicate: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return
+        time.sleep(0.05)
+    raise AssertionError("timeout")
+
+
+def test_dynamic_setting_listener_reconnect(monkeypatch: Any) -> None:
+    monkeypatch.setattr(
+        dynamic_setting_module, "DYNAMIC_SETTING_LISTEN_TIMEOUT_SECONDS", 0.05
+    )
+    monkeypatch.setattr(
+        dynamic_setting_module, "DYNAMIC_SETTING_RECONNECT_SECONDS", 0.1
+    )
+    server = fakeredis.FakeServer()
+    redis_conn = fakeredis.FakeRedis(server=server)
+    publish_dynamic_settings(redis_conn, {"RAPIDAPI_SANCTION_TASK_ID": "1"})
+
+    dynamic_setting = DynamicSetting()
+    dynamic_setting.start_listener(redis_conn)
+    try:
+        assert dynamic_setting.get("RAPIDAPI_SANCTION_TASK_ID") == "1"
+
+        publish_dynamic_settings(redis_conn, {"RAPIDAPI_SANCTION_TASK_ID": "2"})
+        wait_until(
+            lambda: dynamic_setting.get("RAPIDAPI_SANCTION_TASK_ID") == "2"
+        )
+
+        # the connection breaks, and the change is published meanwhile
+        server.connected = False
+        time.sleep(0.2)
+        server.connected = True
+        redis_conn.hset(
+            DYNAMIC_SETTING_KEY, mapping={"RAPIDAPI_SANCTION_TASK_ID": "3"}
+        )
+
+        # the listener reloads the settings after it reconnects
+        wait_until(
+            lambda: dynamic_setting.get("RAPIDAPI_SANCTION_TASK_ID") == "3"
+        )
+        assert dynamic_setting.listener is not None
+        assert dynamic_setting.listener.is_alive()
+    finally:
+        dynamic_setting.stop_listener()
+    assert dynamic_setting.listener is None
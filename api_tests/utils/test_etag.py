@@ -0,0 +1,57 @@
+import datetime
+from typing import Dict
+
+from starlette.requests import Request
+
+from server.utils import etag
+
+
+def gen_request(headers: Dict[str, str]) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [
+                (k.lower().encode("latin-1"), v.encode("latin-1"))
+                for k, v in headers.items()
+            ],
+        }
+    )
+
+
+def test_is_not_modified() -> None:
+    version_etag = etag.gen_version_etag(
+        "task", 1, datetime.datetime(2021, 3, 4)
+    )
+    assert version_etag.startswith('W/"')
+    assert version_etag != etag.gen_version_etag(
+        "task", 1, datetime.datetime(2021, 3, 5)
+    )
+
+    assert not etag.is_not_modified(gen_request({}), version_etag)
+    assert etag.is_not_modified(
+        gen_request({"If-None-Match": version_etag}), version_etag
+    )
+    # weak comparison, and a list of tags
+    assert etag.is_not_modified(
+        gen_request({"If-None-Match": f'"x", {version_etag[2:]}'}),
+        version_etag,
+    )
+    assert etag.is_not_modified(gen_request({"If-None-Match": "*"}), "W/x")
+    assert not etag.is_not_modified(
+        gen_request({"If-None-Match": '"x"'}), version_etag
+    )
+
+
+def test_static_json_response() -> None:
+    static_response = etag.StaticJSONResponse({"a": [1, 2]})
+    assert static_response.body == b'{"a":[1,2]}'
+
+    response = static_response.to_response(gen_request({}))
+    assert response.status_code == 200
+    assert response.headers["ETag"] == static_response.etag
+
+    response = static_response.to_response(
+        gen_request({"If-None-Match": static_response.etag})
+    )
+    assert response.status_code == 304
+    assert response.body == b""
@@ -0,0 +1,31 @@
+import datetime
+
+import pytest
+
+from server.core.exception import EXCEPTION_LIB
+from server.utils import pagination
+
+
+def test_encode_decode_cursor() -> None:
+    created_at = datetime.datetime(2021, 3, 4, 5, 6, 7, 890)
+    cursor = pagination.encode_cursor(created_at, 42)
+
+    assert pagination.decode_cursor(cursor) == pagination.Cursor(created_at, 42)
+
+    with pytest.raises(EXCEPTION_LIB.API__INVALID_PAGE_PARAM.value):
+        pagination.decode_cursor("not-a-cursor")
+
+
+def test_parse_fields() -> None:
+    allowed = ["name", "description", "id", "created_at", "ext_info"]
+
+    assert pagination.parse_fields(None, allowed) is None
+    assert pagination.parse_fields("ext_info, name", allowed) == [
+        "name",
+        "id",
+        "created_at",
+        "ext_info",
+    ]
+
+    with pytest.raises(EXCEPTION_LIB.API__INVALID_PAGE_PARAM.value):
+        pagination.parse_fields("name,password", allowed)
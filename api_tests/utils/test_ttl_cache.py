@@ -0,0 +1,30 @@
+from server.utils.ttl_cache import TTLCache
+
+
+def test_TTLCache() -> None:
+    now = [0.0]
+    cache = TTLCache(max_size=2, ttl=10, timer=lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    assert cache.get("c") is None
+
+    # "b" is the least recently used key, and it is evicted
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+    # expired
+    now[0] = 10.0
+    assert cache.get("a") is None
+
+    cache.set("a", 1)
+    cache.delete("a")
+    assert cache.get("a") is None
+
+    cache.set("a", 1)
+    cache.clear()
+    assert len(cache) == 0
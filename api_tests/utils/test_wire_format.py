@@ -0,0 +1,69 @@
+from server.utils import wire_format
+
+
+def test_negotiate_media_type() -> None:
+    assert wire_format.negotiate_media_type(None) == "application/json"
+    assert wire_format.negotiate_media_type("*/*") == "application/json"
+    assert (
+        wire_format.negotiate_media_type("application/x-msgpack")
+        == "application/x-msgpack"
+    )
+    assert (
+        wire_format.negotiate_media_type(
+            "application/x-msgpack, application/json;q=0.9"
+        )
+        == "application/x-msgpack"
+    )
+
+    # q=0 means not acceptable
+    assert (
+        wire_format.negotiate_media_type(
+            "application/x-msgpack;q=0, application/json"
+        )
+        == "application/json"
+    )
+    assert (
+        wire_format.negotiate_media_type("application/x-msgpack;q=0")
+        == "application/json"
+    )
+    assert (
+        wire_format.negotiate_media_type(
+            "application/json;q=0.5, application/x-msgpack;q=0.8"
+        )
+        == "application/x-msgpack"
+    )
+    # the most specific range decides the q-value of a type
+    assert (
+        wire_format.negotiate_media_type(
+            "application/*;q=0.1, application/x-msgpack;q=0.5"
+        )
+        == "application/x-msgpack"
+    )
+    assert (
+        wire_format.negotiate_media_type("*/*, application/json;q=0")
+        == "application/x-msgpack"
+    )
+    assert (
+        wire_format.negotiate_media_type("text/html, application/x-msgpack;q=a")
+        == "application/json"
+    )
+
+
+def test_encode_decode() -> None:
+    content = {
+        "query_result": [
+            ["Zhe Sun", 0, "Zhe Sun", 1.0],
+            ["Zimmer Hao", -1, "N/A", 0],
+        ],
+        "columns": ["query", "row_id", "matched_str", "similarity_score"],
+        "search_option": {"top_n": 1, "threshold": 0.5, "selected_cols": []},
+    }
+
+    for media_type in ["application/json", "application/x-msgpack"]:
+        data = wire_format.encode(content, media_type)
+        assert isinstance(data, bytes)
+        assert wire_format.decode(data, media_type) == content
+
+    assert len(wire_format.encode(content, "application/x-msgpack")) < len(
+        wire_format.encode(content, "application/json")
+    )
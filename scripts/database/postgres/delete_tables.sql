@@ -5,6 +5,7 @@ DROP TABLE IF EXISTS public_datasets cascade;
 DROP TABLE IF EXISTS datasets cascade;
 DROP TABLE IF EXISTS medias cascade;
 DROP TABLE IF EXISTS abcxyz_tasks_run_history;
+DROP TABLE IF EXISTS task_dataset_refs;
 DROP TABLE IF EXISTS abcxyz_tasks;
 DROP TABLE IF EXISTS dataset_shared_groups cascade;
 DROP TABLE IF EXISTS dataset_shared_users cascade;
@@ -37,6 +37,8 @@ CREATE TABLE IF NOT EXISTS group_members (
     group_id bigint references groups(id),
     member_id bigint references users(id)
 );
+CREATE INDEX IF NOT EXISTS ix_group_members_group_id_member_id ON group_members (group_id, member_id);
+CREATE INDEX IF NOT EXISTS ix_group_members_member_id ON group_members (member_id);
 CREATE TABLE IF NOT EXISTS medias (
     id bigint primary key DEFAULT next_id(),
     owner_id bigint references users(id),
@@ -58,6 +60,7 @@ CREATE TABLE IF NOT EXISTS datasets (
     created_at timestamp without time zone DEFAULT timezone('UTC'::text, now()) NOT NULL,
     updated_at timestamp without time zone DEFAULT timezone('UTC'::text, now()) NOT NULL
 );
+CREATE INDEX IF NOT EXISTS ix_datasets_owner_id ON datasets (owner_id);
 CREATE TABLE IF NOT EXISTS abcxyz_tasks (
     id bigint primary key DEFAULT next_id(),
     name varchar(200),
@@ -68,8 +71,18 @@ CREATE TABLE IF NOT EXISTS abcxyz_tasks (
     type text, -- TODO: what is the type of the column type?
     created_at timestamp without time zone DEFAULT timezone('UTC'::text, now()) NOT NULL,
     updated_at timestamp without time zone DEFAULT timezone('UTC'::text, now()) NOT NULL,
-    ext_info text
+    ext_info jsonb,
+    nm_status varchar(20),
+    result_location text
+);
+CREATE INDEX IF NOT EXISTS ix_abcxyz_tasks_owner_id_nm_status ON abcxyz_tasks (owner_id, nm_status);
+CREATE TABLE IF NOT EXISTS task_dataset_refs (
+    task_id bigint references abcxyz_tasks(id) ON DELETE CASCADE,
+    role varchar(10),
+    dataset_id bigint NOT NULL,
+    primary key (task_id, role)
 );
+CREATE INDEX IF NOT EXISTS ix_task_dataset_refs_dataset_id_role ON task_dataset_refs (dataset_id, role);
 
 -- create table abcxyz_tasks_users (
 --     abcxyz_task_id references datasets(id),
@@ -85,11 +98,15 @@ CREATE TABLE IF NOT EXISTS dataset_shared_groups (
     dataset_id bigint references datasets(id),
     group_id bigint references groups(id)
 );
+CREATE INDEX IF NOT EXISTS ix_dataset_shared_groups_dataset_id_group_id ON dataset_shared_groups (dataset_id, group_id);
+CREATE INDEX IF NOT EXISTS ix_dataset_shared_groups_group_id ON dataset_shared_groups (group_id);
 CREATE TABLE IF NOT EXISTS dataset_shared_users (
     id bigint primary key DEFAULT next_id(),
     dataset_id bigint references datasets(id),
     user_id bigint references users(id)
 );
+CREATE INDEX IF NOT EXISTS ix_dataset_shared_users_dataset_id_user_id ON dataset_shared_users (dataset_id, user_id);
+CREATE INDEX IF NOT EXISTS ix_dataset_shared_users_user_id ON dataset_shared_users (user_id);
 
 CREATE TABLE IF NOT EXISTS oauth2_users (
     id bigint primary key DEFAULT next_id(),
@@ -0,0 +1,57 @@
+"""
+Measure the startup latency of a task process, from the launch until the task
+modules are imported, by a new interpreter and by a fork of a preloaded parent
+
+    python -m scripts.tests.measure_task_startup [nr_runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, List
+
+from server.compute.zygote import (
+    PRELOAD_MODULES,
+    fork_entrypoint,
+    preload_task_modules,
+)
+
+IMPORT_CODE = "; ".join(f"import {name}" for name in PRELOAD_MODULES)
+
+
+def measure(launch: Callable[[], int], nr_runs: int) -> List[float]:
+    durations = []
+    for _ in range(nr_runs):
+        start_t = time.perf_counter()
+        return_code = launch()
+        durations.append(time.perf_counter() - start_t)
+        assert return_code == 0, return_code
+    return durations
+
+
+def launch_popen() -> int:
+    return subprocess.Popen(
+        [sys.executable, "-c", IMPORT_CODE], env=os.environ.copy()
+    ).wait()
+
+
+def launch_fork() -> int:
+    return fork_entrypoint(
+        lambda command: exec(IMPORT_CODE), [], os.environ.copy()
+    ).wait()
+
+
+if __name__ == "__main__":
+    nr_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    popen_durations = measure(launch_popen, nr_runs)
+    preload_t = time.perf_counter()
+    preload_task_modules()
+    preload_duration = time.perf_counter() - preload_t
+    fork_durations = measure(launch_fork, nr_runs)
+
+    print(f"preload once: {preload_duration:.3f}s")
+    print(f"popen median: {statistics.median(popen_durations):.3f}s")
+    print(f"fork median: {statistics.median(fork_durations):.3f}s")
@@ -9,6 +9,7 @@ from server.api.main import app  # noqa: F401
 from server.apps.nm_task.crud import NM_TASK_CRUD
 from server.compute.rq_worker import run_task_in_subprocess
 from server.compute.utils import get_q
+from server.compute.worker_pool import gen_task_job_id
 from server.libs.db.sqlalchemy import db
 
 
@@ -34,7 +35,7 @@ def run() -> None:
                 NM_TASK_CRUD,
                 ["python", "server/compute/batch.py", f"{do_batch_task.id}"],
             ),
-            job_id="nm_batch_task",
+            job_id=gen_task_job_id(do_batch_task.id),
             job_timeout=-1,
         )
 
@@ -7,6 +7,7 @@ from scripts.tests.nm_task_helper import (
 from server.apps.nm_task.crud import NM_TASK_CRUD
 from server.compute.rq_worker import run_task_in_subprocess
 from server.compute.utils import get_q
+from server.compute.worker_pool import gen_task_job_id
 from server.libs.db.sqlalchemy import db
 
 
@@ -33,7 +34,7 @@ def run() -> None:
                     "8001",
                 ],
             ),
-            job_id="nm_realtime_task",
+            job_id=gen_task_job_id(do_realtime_task.id),
             job_timeout=-1,
         )
 
@@ -1,18 +1,22 @@
 import sys
 
-from server.compute.utils import get_q
+from server.compute.utils import gen_pubsub_channel_name, get_q
+from server.compute.worker_pool import (
+    NM_BATCH_QUEUE,
+    NM_REALTIME_QUEUE,
+    gen_task_stop_key,
+)
 
 if __name__ == "__main__":
     worker_type = str(sys.argv[1])
+    task_id = int(sys.argv[2])
+    user_id = int(sys.argv[3])
     if worker_type == "batch":
-        worker_name = "nm_batch_worker"
-        job_name = "nm_batch_task"
+        worker_name = NM_BATCH_QUEUE
     else:
-        worker_name = "nm_realtime_worker"
-        job_name = "nm_realtime_task"
+        worker_name = NM_REALTIME_QUEUE
 
-    # following the way of stackoverflow threads
-    # https://stackoverflow.com/questions/55244729/python-rq-how-to-pass-information-from-the-caller-to-the-worker
+    # the same as the stop endpoint
     q = get_q(worker_name)
-    nm_job = q.fetch_job(job_name)
-    nm_job.connection.set(nm_job.key + b":should_stop", 1, ex=30)
+    q.connection.set(gen_task_stop_key(task_id), 1, ex=30)
+    q.connection.publish(gen_pubsub_channel_name(task_id, user_id), "1")
@@ -5,6 +5,7 @@ from typing import Any, Callable
 
 import redis
 from fastapi import Depends, FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
@@ -20,10 +21,24 @@ from server.core.middleware import (
     handle_metrics,
 )
 from server.core.request import parse_user_from_request
-from server.libs.db.sqlalchemy import DBSessionMiddleware, engine, session_args
+from server.executors.factory import TASK_EXECUTOR
+from server.libs.db.async_db import async_db, async_read_db
+from server.libs.db.sqlalchemy import (
+    DBSessionMiddleware,
+    engine,
+    replica_engine,
+    session_args,
+)
+from server.libs.http import RT_HTTP_CLIENT_POOL
 from server.settings import API_SETTING
+from server.settings.dynamic_setting import (
+    DEMO_ACCOUNT_LIMITATION,
+    DYNAMIC_SETTING,
+)
 from server.settings.logger import api_logger as logger
 from server.utils.env_check import env_check
+from server.utils.etag import ETAG_HEADER
+from server.utils.pagination import NEXT_CURSOR_HEADER
 from server.utils.validator import validate_demo_account_route
 
 if os.getenv("DEPLOY_ENV") == "prod":
@@ -52,7 +67,10 @@ async def api_exception_handler(
 
 
 app.add_middleware(
-    DBSessionMiddleware, custom_engine=engine, session_args=session_args
+    DBSessionMiddleware,
+    custom_engine=engine,
+    session_args=session_args,
+    read_engine=replica_engine,
 )
 
 app.add_middleware(PrometheusMiddleware, group_paths=True)
@@ -80,9 +98,7 @@ async def check_demo_account_route(
     request: Request, call_next: Callable
 ) -> Response:
     if os.getenv("API_RUN_LOCATION") in ["k8s"]:
-        demo_account_limitation = redis_conn.get("DEMO_ACCOUNT_LIMITATION")
-        # N.B. the result from redis is byte type
-        if demo_account_limitation == b"no":
+        if DYNAMIC_SETTING.get(DEMO_ACCOUNT_LIMITATION) == "no":
             response = await call_next(request)
             return response
     else:
@@ -94,7 +110,7 @@ async def check_demo_account_route(
         response = await call_next(request)
         return response
 
-    do_user = parse_user_from_request(request)
+    do_user = await parse_user_from_request(request)
     if do_user and do_user.email == API_SETTING.DEMO_ACCOUNT_EMAIL:
         err_msg = "Demo account has no permission to do this action. Please sign up a free account to experience full functionalities of uniframe.io."
         if request.method.lower() in ["delete", "put", "patch"]:
@@ -176,6 +192,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # readable by the UI, for the conditional GET and the next page
+    expose_headers=[ETAG_HEADER, NEXT_CURSOR_HEADER],
 )
 
 
@@ -185,6 +203,39 @@ async def healthcheck() -> str:
     return "OK"
 
 
+@app.on_event("startup")
+async def connect_async_db() -> None:
+    if API_SETTING.DB_ASYNC_ENABLED:
+        await async_db.connect()
+        if async_read_db is not None:
+            await async_read_db.connect()
+
+
+@app.on_event("shutdown")
+async def disconnect_async_db() -> None:
+    if async_db.is_connected:
+        await async_db.disconnect()
+    if async_read_db is not None and async_read_db.is_connected:
+        await async_read_db.disconnect()
+
+
+@app.on_event("startup")
+async def start_dynamic_setting_listener() -> None:
+    if os.getenv("API_RUN_LOCATION") in ["k8s"]:
+        DYNAMIC_SETTING.start_listener(redis_conn)
+
+
+@app.on_event("shutdown")
+async def close_http_client_pool() -> None:
+    DYNAMIC_SETTING.stop_listener()
+    await RT_HTTP_CLIENT_POOL.aclose()
+
+
+@app.on_event("shutdown")
+async def shutdown_task_executor() -> None:
+    await run_in_threadpool(TASK_EXECUTOR.shutdown)
+
+
 app.include_router(api_router, prefix=API_SETTING.API_V1_STR)
 
 if os.getenv("DEPLOY_ENV") == "prod":
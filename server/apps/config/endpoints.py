@@ -1,6 +1,6 @@
-from typing import Dict
+from typing import Any, Dict
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 
 from server.apps.config.schemas import HelpGuide
 from server.apps.nm_task.schemas import NmTaskCreateDTO
@@ -9,10 +9,30 @@ from server.apps.user.utils import get_user_premium_type
 from server.core import dependency
 from server.settings import GLOBAL_LIMIT_CONFIG, USER_BASE_LIMIT_CONFIG
 from server.settings.limitation import NmTaskResourceLimit, UserUIPermission
+from server.utils.etag import StaticJSONResponse
 from server.utils.parser import load_json, load_yaml
 
 router = APIRouter()
 
+# the static config responses are serialized once, and tagged by the hash of the body
+STATIC_RESPONSES: Dict[str, StaticJSONResponse] = {}
+
+
+@router.on_event("startup")
+def load_static_responses() -> None:
+    STATIC_RESPONSES["nm_batch_defaults"] = StaticJSONResponse(
+        NmTaskCreateDTO(**load_yaml("./conf/nm-task-batch-default.yaml"))
+    )
+    STATIC_RESPONSES["nm_rt_defaults"] = StaticJSONResponse(
+        NmTaskCreateDTO(**load_yaml("./conf/nm-task-rt-default.yaml"))
+    )
+    STATIC_RESPONSES["help_guide"] = StaticJSONResponse(
+        {
+            k: HelpGuide(**v)
+            for k, v in load_json("./conf/help-guide.json").items()
+        }
+    )
+
 
 @router.get(
     "/config/defaults/nm/batch",
@@ -21,10 +41,10 @@ router = APIRouter()
     response_description="the name matching batch task default value",
 )
 def get_nm_batch_task_defaults(
+    request: Request,
     current_user: UserDO = Depends(dependency.get_current_active_user),
-) -> NmTaskCreateDTO:
-    cfg_dict = load_yaml("./conf/nm-task-batch-default.yaml")
-    return NmTaskCreateDTO(**cfg_dict)
+) -> Any:
+    return STATIC_RESPONSES["nm_batch_defaults"].to_response(request)
 
 
 @router.get(
@@ -34,10 +54,10 @@ def get_nm_batch_task_defaults(
     response_description="the name matching realtime task default value",
 )
 def get_nm_rt_task_defaults(
+    request: Request,
     current_user: UserDO = Depends(dependency.get_current_active_user),
-) -> NmTaskCreateDTO:
-    cfg_dict = load_yaml("./conf/nm-task-rt-default.yaml")
-    return NmTaskCreateDTO(**cfg_dict)
+) -> Any:
+    return STATIC_RESPONSES["nm_rt_defaults"].to_response(request)
 
 
 @router.get(
@@ -47,10 +67,10 @@ def get_nm_rt_task_defaults(
     response_description="Help guide",
 )
 def get_help_guide(
+    request: Request,
     current_user: UserDO = Depends(dependency.get_current_active_user),
-) -> Dict[str, HelpGuide]:
-    help_guide_dict = load_json("./conf/help-guide.json")
-    return help_guide_dict
+) -> Any:
+    return STATIC_RESPONSES["help_guide"].to_response(request)
 
 
 @router.get(
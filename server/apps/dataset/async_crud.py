@@ -0,0 +1,71 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from server.apps.dataset import listing, schemas
+from server.apps.dataset.crud import DATASET_CRUD, DatasetConvert
+from server.libs.db.async_db import AsyncCRUDProxy, get_read_db
+from server.settings.global_sys_config import GLOBAL_CONFIG
+from server.utils.pagination import Cursor
+
+
+class DatasetAsyncAbsFactory(ABC, DatasetConvert):
+    @abstractmethod
+    async def get_visible_datasets(
+        self,
+        user_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[schemas.DatasetDTO]:
+        pass
+
+    @abstractmethod
+    async def get_visible_dataset_fields(
+        self,
+        user_id: int,
+        fields: List[str],
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[Dict[str, Any]]:
+        pass
+
+    @classmethod
+    def make_concrete(cls) -> "DatasetAsyncAbsFactory":
+        """The factory method to load async dataset factory"""
+
+        DATASET_ASYNC_FACTORY_DICT = {"pg": PGDatasetAsyncCRUD}
+
+        return DATASET_ASYNC_FACTORY_DICT[GLOBAL_CONFIG.api_store]()
+
+
+class PGDatasetAsyncCRUD(DatasetAsyncAbsFactory):
+    """Async dataset factory: PG Database system"""
+
+    async def get_visible_datasets(
+        self,
+        user_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[schemas.DatasetDTO]:
+        records = await get_read_db().fetch_all(
+            listing.gen_visible_datasets_query(
+                user_id, limit=limit, cursor=cursor
+            )
+        )
+        return [self.visible_dataset_row_to_dto(r) for r in records]
+
+    async def get_visible_dataset_fields(
+        self,
+        user_id: int,
+        fields: List[str],
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[Dict[str, Any]]:
+        records = await get_read_db().fetch_all(
+            listing.gen_visible_datasets_query(user_id, fields, limit, cursor)
+        )
+        return [self.visible_dataset_row_to_fields(r, fields) for r in records]
+
+
+DATASET_ASYNC_CRUD = AsyncCRUDProxy(
+    DatasetAsyncAbsFactory.make_concrete(), DATASET_CRUD
+)
@@ -0,0 +1,14 @@
+"""
+Dataset access decision cache of `dataset.utils.check_access`, keyed by (user_id, dataset_id).
+
+The cache is cleared by the dataset share / public and the group member changes.
+The other replicas see a change after at most DATASET_ACCESS_CACHE_TTL seconds
+"""
+
+from server.settings import API_SETTING
+from server.utils.ttl_cache import TTLCache
+
+DATASET_ACCESS_CACHE = TTLCache(
+    max_size=API_SETTING.DATASET_ACCESS_CACHE_SIZE,
+    ttl=API_SETTING.DATASET_ACCESS_CACHE_TTL,
+)
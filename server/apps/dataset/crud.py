@@ -1,14 +1,18 @@
 import datetime
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy import true
+from sqlalchemy import and_, exists, func, or_, true
 
-from server.apps.dataset import models, schemas
+from server.apps.dataset import listing, models, schemas
+from server.apps.dataset.cache import DATASET_ACCESS_CACHE
+from server.apps.group import models as group_models
+from server.apps.media.crud import MediaConvert
 from server.core.exception import EXCEPTION_LIB
 from server.libs.db.sqlalchemy import db
 from server.settings.global_sys_config import GLOBAL_CONFIG
 from server.settings.logger import app_dataset_logger as logger
+from server.utils.pagination import Cursor
 
 
 class DatasetConvert(object):
@@ -38,6 +42,46 @@ class DatasetConvert(object):
             updated_at=do_dataset.updated_at,
         )
 
+    @staticmethod
+    def visible_dataset_row_to_dto(row: Any) -> schemas.DatasetDTO:
+        (
+            po_dataset,
+            po_media,
+            ownership_type,
+        ) = listing.visible_dataset_row_to_po(row)
+        dto_dataset = DatasetConvert.dataset_do_to_dto(
+            DatasetConvert.dataset_po_to_do(po_dataset)
+        )
+        if po_media is not None:
+            dto_dataset.media = MediaConvert.media_do_to_dto(
+                MediaConvert.media_po_to_do(po_media)
+            )
+        dto_dataset.ownership_type = ownership_type
+        return dto_dataset
+
+    @staticmethod
+    def visible_dataset_row_to_fields(
+        row: Any, fields: List[str]
+    ) -> Dict[str, Any]:
+        row = dict(row)
+        dataset_fields = {
+            f: row[f] for f in fields if f in listing.dataset_table.c
+        }
+        if "ownership_type" in fields:
+            dataset_fields["ownership_type"] = listing.OWNERSHIP_RANKS[
+                row["ownership_rank"]
+            ]
+        if "media" in fields:
+            po_media = listing.visible_media_row_to_po(row)
+            dataset_fields["media"] = (
+                MediaConvert.media_do_to_dto(
+                    MediaConvert.media_po_to_do(po_media)
+                )
+                if po_media is not None
+                else None
+            )
+        return dataset_fields
+
 
 class DatasetAbsFactory(ABC, DatasetConvert):
     @abstractmethod
@@ -48,6 +92,10 @@ class DatasetAbsFactory(ABC, DatasetConvert):
     def get_datasets_by_owner(self, owner_id: int) -> List[schemas.DatasetDO]:
         pass
 
+    @abstractmethod
+    def count_datasets_by_owner(self, owner_id: int) -> int:
+        pass
+
     @abstractmethod
     def get_dataset_by_name(
         self, owner_id: int, name: str
@@ -108,6 +156,31 @@ class DatasetAbsFactory(ABC, DatasetConvert):
     def get_dataset_shared_with_user(self, user_id: int) -> List[int]:
         pass
 
+    @abstractmethod
+    def get_shared_ownership_type(
+        self, dataset_id: int, user_id: int
+    ) -> Optional[schemas.OWNERSHIP_TYPE]:
+        pass
+
+    @abstractmethod
+    def get_visible_datasets(
+        self,
+        user_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[schemas.DatasetDTO]:
+        pass
+
+    @abstractmethod
+    def get_visible_dataset_fields(
+        self,
+        user_id: int,
+        fields: List[str],
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[Dict[str, Any]]:
+        pass
+
     @abstractmethod
     def get_dataset_by_ids(
         self, dataset_ids: List[int]
@@ -165,7 +238,7 @@ class PGDatasetCRUD(DatasetAbsFactory):
 
     def get_datasets_by_owner(self, owner_id: int) -> List[schemas.DatasetDO]:
         po_datasets = (
-            db.session.query(models.Dataset)
+            db.read_session.query(models.Dataset)
             .filter(models.Dataset.is_active == true())
             .filter(models.Dataset.owner_id == owner_id)
             .all()
@@ -173,6 +246,14 @@ class PGDatasetCRUD(DatasetAbsFactory):
         do_datasets = [self.dataset_po_to_do(d) for d in po_datasets]
         return do_datasets
 
+    def count_datasets_by_owner(self, owner_id: int) -> int:
+        return (
+            db.read_session.query(func.count(models.Dataset.id))
+            .filter(models.Dataset.is_active == true())
+            .filter(models.Dataset.owner_id == owner_id)
+            .scalar()
+        )
+
     def get_dataset_by_name(
         self, owner_id: int, name: str
     ) -> Optional[schemas.DatasetDO]:
@@ -215,9 +296,15 @@ class PGDatasetCRUD(DatasetAbsFactory):
     def update_dataset(
         self, dataset_id: int, dataset_update: schemas.DatasetUpdateDO
     ) -> schemas.DatasetDO:
+        # a new version, see the ETag of `GET /datasets/{did}`
         db.session.query(models.Dataset).filter(
             models.Dataset.id == dataset_id
-        ).update(dataset_update.dict(exclude_none=True))
+        ).update(
+            {
+                **dataset_update.dict(exclude_none=True),
+                "updated_at": datetime.datetime.utcnow(),
+            }
+        )
         db.session.commit()
 
         do_dataset = self.get_dataset(dataset_id)
@@ -235,6 +322,7 @@ class PGDatasetCRUD(DatasetAbsFactory):
             models.Dataset.id == dataset_id
         ).delete()
         db.session.commit()
+        DATASET_ACCESS_CACHE.clear()
 
     def share_dataset_with_groups(
         self, dataset_id: int, group_ids: List[int]
@@ -248,6 +336,7 @@ class PGDatasetCRUD(DatasetAbsFactory):
             objs.append(obj)
         db.session.bulk_save_objects(objs)
         db.session.commit()
+        DATASET_ACCESS_CACHE.clear()
 
     def share_dataset_with_users(
         self, dataset_id: int, user_ids: List[int]
@@ -261,6 +350,7 @@ class PGDatasetCRUD(DatasetAbsFactory):
             objs.append(obj)
         db.session.bulk_save_objects(objs)
         db.session.commit()
+        DATASET_ACCESS_CACHE.clear()
 
     def get_shared_groups(self, dataset_id: int) -> List[int]:
         groups = (
@@ -287,6 +377,8 @@ class PGDatasetCRUD(DatasetAbsFactory):
         ).filter(models.DatasetShareGroup.group_id.in_(group_ids)).delete(
             synchronize_session=False
         )
+        db.session.commit()
+        DATASET_ACCESS_CACHE.clear()
 
     def remove_shared_users(self, dataset_id: int, user_ids: List[int]) -> None:
         db.session.query(models.DatasetShareUser).filter(
@@ -294,13 +386,15 @@ class PGDatasetCRUD(DatasetAbsFactory):
         ).filter(models.DatasetShareUser.user_id.in_(user_ids)).delete(
             synchronize_session=False
         )
+        db.session.commit()
+        DATASET_ACCESS_CACHE.clear()
 
     def get_dataset_shared_with_groups(self, group_ids: List[int]) -> List[int]:
         if not group_ids:
             return []
 
         datasets = (
-            db.session.query(models.DatasetShareGroup.dataset_id)
+            db.read_session.query(models.DatasetShareGroup.dataset_id)
             .filter(models.DatasetShareGroup.group_id.in_(group_ids))
             .all()
         )
@@ -308,17 +402,75 @@ class PGDatasetCRUD(DatasetAbsFactory):
 
     def get_dataset_shared_with_user(self, user_id: int) -> List[int]:
         datasets = (
-            db.session.query(models.DatasetShareUser.dataset_id)
+            db.read_session.query(models.DatasetShareUser.dataset_id)
             .filter(models.DatasetShareUser.user_id == user_id)
             .all()
         )
         return [d[0] for d in datasets]
 
+    def get_shared_ownership_type(
+        self, dataset_id: int, user_id: int
+    ) -> Optional[schemas.OWNERSHIP_TYPE]:
+        """
+        Check in one query if a dataset is shared with the user, directly or by a group
+        the user is member of, or is public. Shared takes precedence over public
+        """
+        shared_with_user = exists().where(
+            and_(
+                models.DatasetShareUser.dataset_id == dataset_id,
+                models.DatasetShareUser.user_id == user_id,
+            )
+        )
+        shared_with_group = exists().where(
+            and_(
+                models.DatasetShareGroup.dataset_id == dataset_id,
+                models.DatasetShareGroup.group_id
+                == group_models.GroupMembers.group_id,
+                group_models.GroupMembers.member_id == user_id,
+            )
+        )
+        public = exists().where(models.PublicDataset.dataset_id == dataset_id)
+
+        is_shared, is_public = db.session.query(
+            or_(shared_with_user, shared_with_group), public
+        ).one()
+
+        if is_shared:
+            return schemas.OWNERSHIP_TYPE.SHARED
+        if is_public:
+            return schemas.OWNERSHIP_TYPE.PUBLIC
+        return None
+
+    def get_visible_datasets(
+        self,
+        user_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[schemas.DatasetDTO]:
+        rows = db.read_session.execute(
+            listing.gen_visible_datasets_query(
+                user_id, limit=limit, cursor=cursor
+            )
+        ).fetchall()
+        return [self.visible_dataset_row_to_dto(r) for r in rows]
+
+    def get_visible_dataset_fields(
+        self,
+        user_id: int,
+        fields: List[str],
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[Dict[str, Any]]:
+        rows = db.read_session.execute(
+            listing.gen_visible_datasets_query(user_id, fields, limit, cursor)
+        ).fetchall()
+        return [self.visible_dataset_row_to_fields(r, fields) for r in rows]
+
     def get_dataset_by_ids(
         self, dataset_ids: List[int]
     ) -> List[schemas.DatasetDO]:
         objs = (
-            db.session.query(models.Dataset)
+            db.read_session.query(models.Dataset)
             .filter(models.Dataset.id.in_(dataset_ids))
             .order_by(models.Dataset.created_at.desc())
             .all()
@@ -342,11 +494,12 @@ class PGDatasetCRUD(DatasetAbsFactory):
         )
         db.session.add(po_public_dataset)
         db.session.commit()
+        DATASET_ACCESS_CACHE.clear()
 
         return None
 
     def get_public_datasets(self) -> List[int]:
-        datasets = db.session.query(models.PublicDataset.dataset_id).all()
+        datasets = db.read_session.query(models.PublicDataset.dataset_id).all()
         return [d[0] for d in datasets]
 
     def delete_public_dataset(self, dataset_id: int) -> None:
@@ -354,12 +507,14 @@ class PGDatasetCRUD(DatasetAbsFactory):
             models.PublicDataset.dataset_id == dataset_id
         ).delete()
         db.session.commit()
+        DATASET_ACCESS_CACHE.clear()
 
     def delete_public_dataset_by_ids(self, dataset_ids: List[int]) -> None:
         db.session.query(models.PublicDataset).filter(
             models.PublicDataset.dataset_id.in_(dataset_ids)
         ).delete(synchronize_session=False)
         db.session.commit()
+        DATASET_ACCESS_CACHE.clear()
 
 
 DATASET_CRUD = DatasetAbsFactory.make_concrete()
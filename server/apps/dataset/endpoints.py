@@ -1,9 +1,11 @@
-from typing import List
+from typing import Any, List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
 from server.apps.dataset import utils
+from server.apps.dataset.async_crud import DATASET_ASYNC_CRUD
 from server.apps.dataset.crud import DATASET_CRUD
+from server.apps.dataset.listing import DATASET_LIST_FIELDS
 from server.apps.dataset.schemas import (
     OWNERSHIP_TYPE,
     DatasetCreateDO,
@@ -16,19 +18,34 @@ from server.apps.dataset.schemas import (
     DatasetUpdateDTO,
     PublicDatasetCreateDO,
 )
-from server.apps.group.crud import GROUP_CRUD
 from server.apps.media.crud import MEDIA_CRUD
 from server.apps.nm_task.crud import NM_TASK_CRUD
-from server.apps.nm_task.schemas import NM_STATUS, AbcXyz_TYPE
+from server.apps.nm_task.schemas import NM_STATUS, TASK_DATASET_ROLE
 from server.apps.user.schemas import UserDO
 from server.core import dependency
 from server.core.exception import EXCEPTION_LIB
 from server.settings import API_SETTING
 from server.settings.logger import app_dataset_logger as logger
+from server.utils.etag import check_not_modified, gen_version_etag
+from server.utils.pagination import (
+    PageParams,
+    gen_fields_response,
+    parse_fields,
+    set_next_cursor,
+)
 from server.utils.validator import validate_resource_name
 
 router = APIRouter()
 
+# a dataset can't be deleted if it's used by a task in these status
+DATASET_IN_USE_NM_STATUS_L = [
+    NM_STATUS.INIT,
+    NM_STATUS.PREPARING,
+    NM_STATUS.LAUNCHING,
+    NM_STATUS.TERMINATING,
+    NM_STATUS.READY,
+]
+
 
 @router.post(
     "/datasets",
@@ -188,10 +205,15 @@ def update_dataset(
 )
 def retrieve_dataset(
     did: int,
+    request: Request,
+    response: Response,
     current_user: UserDO = Depends(dependency.get_current_active_user),
-) -> DatasetDTO:
+) -> Any:
     """
     Retrieve dataset by id and only user with view permission or owner of the dataset be able to access.
+
+    The ETag is the version of the dataset for the current user. A poll with the
+    current one in `If-None-Match` is answered by 304 without reading the media
     """
     do_dataset = DATASET_CRUD.get_dataset(did)
     if do_dataset is None:
@@ -213,6 +235,20 @@ def retrieve_dataset(
             "You are not allowed to get current dataset."
         )
 
+    not_modified = check_not_modified(
+        request,
+        response,
+        gen_version_etag(
+            "dataset",
+            do_dataset.id,
+            do_dataset.updated_at,
+            do_dataset.media_id,
+            ownership_type,
+        ),
+    )
+    if not_modified:
+        return not_modified
+
     dto_dataset = DATASET_CRUD.dataset_do_to_dto(do_dataset)
     do_media = MEDIA_CRUD.get_media(do_dataset.media_id)
     dto_media = MEDIA_CRUD.media_do_to_dto(do_media)  # type: ignore
@@ -228,61 +264,30 @@ def retrieve_dataset(
     response_model=List[DatasetDTO],
     response_description="List datasets",
 )
-def list_dataset(
+async def list_dataset(
+    response: Response,
+    page: PageParams = Depends(),
     current_user: UserDO = Depends(dependency.get_current_active_user),
-) -> List[DatasetDTO]:
+) -> Any:
     """
     List all dataset which current user is owner or viewer
-    """
-    # get datasets that current user is owner
-    owned_datasets = DATASET_CRUD.get_datasets_by_owner(current_user.id)
-
-    # get groups that current user is a member
-    viewable_groups = GROUP_CRUD.get_all_group_viewable_by_user(current_user.id)
-
-    # get groups that current user is owner
-    owned_groups = GROUP_CRUD.get_all_groups_owned_by_user(current_user.id)
-
-    group_ids = [g.id for g in viewable_groups + owned_groups]
-
-    # get dataset ids that shared with the groups
-    gorup_dataset_ids = DATASET_CRUD.get_dataset_shared_with_groups(group_ids)
-
-    # get dataset ids that shared with current user
-    user_dataset_ids = DATASET_CRUD.get_dataset_shared_with_user(
-        current_user.id
-    )
 
-    # get public dataset ids
-    public_datasets_ids = DATASET_CRUD.get_public_datasets()
-
-    owned_dataset_ids = [d.id for d in owned_datasets]
-
-    dataset_ids = list(
-        set(
-            gorup_dataset_ids
-            + user_dataset_ids
-            + owned_dataset_ids
-            + public_datasets_ids
+    - limit, cursor: keyset pagination, newest first. The cursor of the next page
+      is in the `X-Next-Cursor` header
+    - fields: comma separated fields to return, e.g., `name,ownership_type`.
+      The media preview is read only if `media` is asked
+    """
+    fields = parse_fields(page.fields, DATASET_LIST_FIELDS)
+    if fields is not None:
+        dataset_rows = await DATASET_ASYNC_CRUD.get_visible_dataset_fields(
+            current_user.id, fields, page.limit, page.cursor
         )
-    )
-    datasets = DATASET_CRUD.get_dataset_by_ids(dataset_ids)
-
-    dto_datasets = []
-    for do_dataset in datasets:
-        dto_dataset = DATASET_CRUD.dataset_do_to_dto(do_dataset)
-        do_media = MEDIA_CRUD.get_media(do_dataset.media_id)
-        dto_media = MEDIA_CRUD.media_do_to_dto(do_media)  # type: ignore
-        dto_dataset.media = dto_media
-
-        if dto_dataset.id in owned_dataset_ids:
-            dto_dataset.ownership_type = OWNERSHIP_TYPE.PRIVATE
-        elif dto_dataset.id in public_datasets_ids:
-            dto_dataset.ownership_type = OWNERSHIP_TYPE.PUBLIC
-        else:
-            dto_dataset.ownership_type = OWNERSHIP_TYPE.SHARED
-        dto_datasets.append(dto_dataset)
+        return gen_fields_response(dataset_rows, page.limit)
 
+    dto_datasets = await DATASET_ASYNC_CRUD.get_visible_datasets(
+        current_user.id, page.limit, page.cursor
+    )
+    set_next_cursor(response, dto_datasets, page.limit)
     return dto_datasets
 
 
@@ -327,23 +332,17 @@ def destroy_dataset(
             "You are not allowed to delete current dataset, because you are not the owner."
         )
 
-    do_tasks = NM_TASK_CRUD.get_all_tasks_by_owner(current_user.id)
-    for t in do_tasks:
-        is_running = t.ext_info.nm_status in (
-            NM_STATUS.INIT,
-            NM_STATUS.PREPARING,
-            NM_STATUS.LAUNCHING,
-            NM_STATUS.TERMINATING,
-            NM_STATUS.READY,
+    # including the tasks of the users the dataset is shared with
+    if NM_TASK_CRUD.is_dataset_in_use(
+        did, DATASET_IN_USE_NM_STATUS_L, role=TASK_DATASET_ROLE.GT
+    ):
+        logger.error(
+            f"[destroy_dataset] DATASET__DELETE_FAILED: dataset owner [{do_dataset.owner_id}]"
+            f" current_user [{current_user.id}]"
+        )
+        raise EXCEPTION_LIB.DATASET__DELETE_FAILED.value(
+            f"Current dataset {did} is used by task"
         )
-        if is_running and t.ext_info.gt_dataset_config.dataset_id == did:
-            logger.error(
-                f"[destroy_dataset] DATASET__DELETE_FAILED: dataset owner [{do_dataset.owner_id}]"
-                f" current_user [{current_user.id}]"
-            )
-            raise EXCEPTION_LIB.DATASET__DELETE_FAILED.value(
-                f"Current dataset {did} is used by task"
-            )
 
     DATASET_CRUD.update_dataset(
         did,
@@ -458,39 +457,12 @@ def retrieve_dataset_stats(
             "You are not allowed to get the status of current dataset, because you are not the owner."
         )
 
-    do_tasks = NM_TASK_CRUD.get_all_tasks_by_owner(current_user.id)
-    used_by_tasks: List[DatasetStatTask] = []
-    for t in do_tasks:
-        is_running = t.ext_info.nm_status in (
-            NM_STATUS.INIT,
-            NM_STATUS.PREPARING,
-            NM_STATUS.LAUNCHING,
-            NM_STATUS.TERMINATING,
-            NM_STATUS.READY,
-        )
-        if is_running:
-            if (
-                t.type == AbcXyz_TYPE.NAME_MATCHING_REALTIME
-                and t.ext_info.gt_dataset_config.dataset_id == did
-            ):
-                used_by_tasks.append(
-                    DatasetStatTask(
-                        id=t.id,
-                        name=t.name,
-                        type=t.type,
-                    )
-                )
-            if t.type == AbcXyz_TYPE.NAME_MATCHING_BATCH and (
-                t.ext_info.gt_dataset_config.dataset_id == did
-                or t.ext_info.nm_dataset_config.dataset_id == did  # type: ignore
-            ):
-                used_by_tasks.append(
-                    DatasetStatTask(
-                        id=t.id,
-                        name=t.name,
-                        type=t.type,
-                    )
-                )
+    do_tasks = NM_TASK_CRUD.get_tasks_by_dataset(
+        did, DATASET_IN_USE_NM_STATUS_L, owner_id=current_user.id
+    )
+    used_by_tasks: List[DatasetStatTask] = [
+        DatasetStatTask(id=t.id, name=t.name, type=t.type) for t in do_tasks
+    ]
 
     return DatasetStatDTO(
         used_by_tasks=used_by_tasks,
@@ -0,0 +1,154 @@
+"""
+Batched listing of the datasets a user can see, for `GET /datasets`
+
+One query gets the visible dataset ids (owned, public, shared with the user, shared
+with a group the user owns or is member of), joins the datasets and their media,
+and resolves the ownership type. It's used by both the sync and the async CRUD,
+see `DatasetConvert.visible_dataset_row_to_dto`
+
+With `fields`, only the asked dataset columns are selected, and the media, with
+its `first_n_rows` preview in `ext_info`, is joined only if `media` is asked
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, select, true, union, union_all
+from sqlalchemy.sql import Select
+
+from server.apps.dataset import models, schemas
+from server.apps.group import models as group_models
+from server.apps.media import models as media_models
+from server.utils.pagination import Cursor, paginate
+
+# a dataset visible by more than one way takes the smallest rank
+OWNERSHIP_RANKS = [
+    schemas.OWNERSHIP_TYPE.PRIVATE,
+    schemas.OWNERSHIP_TYPE.PUBLIC,
+    schemas.OWNERSHIP_TYPE.SHARED,
+]
+
+MEDIA_COLUMN_PREFIX = "media__"
+
+DATASET_LIST_FIELDS = list(schemas.DatasetDTO.__fields__)
+
+dataset_table = models.Dataset.__table__
+media_table = media_models.Media.__table__
+
+
+def gen_ownership_rank(ownership_type: schemas.OWNERSHIP_TYPE) -> Any:
+    # inline the rank, so the driver doesn't need to infer a type of a bind parameter
+    return literal_column(str(OWNERSHIP_RANKS.index(ownership_type))).label(
+        "ownership_rank"
+    )
+
+
+def gen_visible_datasets_query(
+    user_id: int,
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[Cursor] = None,
+) -> Select:
+    viewable_group_ids = union(
+        select([group_models.GroupMembers.group_id]).where(
+            group_models.GroupMembers.member_id == user_id
+        ),
+        select([group_models.Group.id])
+        .where(group_models.Group.owner_id == user_id)
+        .where(group_models.Group.is_active == true()),
+    )
+
+    visible = union_all(
+        select(
+            [
+                models.Dataset.id.label("dataset_id"),
+                gen_ownership_rank(schemas.OWNERSHIP_TYPE.PRIVATE),
+            ]
+        )
+        .where(models.Dataset.owner_id == user_id)
+        .where(models.Dataset.is_active == true()),
+        select(
+            [
+                models.PublicDataset.dataset_id,
+                gen_ownership_rank(schemas.OWNERSHIP_TYPE.PUBLIC),
+            ]
+        ),
+        select(
+            [
+                models.DatasetShareUser.dataset_id,
+                gen_ownership_rank(schemas.OWNERSHIP_TYPE.SHARED),
+            ]
+        ).where(models.DatasetShareUser.user_id == user_id),
+        select(
+            [
+                models.DatasetShareGroup.dataset_id,
+                gen_ownership_rank(schemas.OWNERSHIP_TYPE.SHARED),
+            ]
+        ).where(models.DatasetShareGroup.group_id.in_(viewable_group_ids)),
+    ).alias("visible")
+
+    ownership = (
+        select(
+            [
+                visible.c.dataset_id,
+                func.min(visible.c.ownership_rank).label("ownership_rank"),
+            ]
+        )
+        .group_by(visible.c.dataset_id)
+        .alias("ownership")
+    )
+
+    if fields is None:
+        columns = [dataset_table, ownership.c.ownership_rank]
+    else:
+        columns = [dataset_table.c[f] for f in fields if f in dataset_table.c]
+        if "ownership_type" in fields:
+            columns.append(ownership.c.ownership_rank)
+
+    from_clause = dataset_table.join(
+        ownership, ownership.c.dataset_id == dataset_table.c.id
+    )
+    if fields is None or "media" in fields:
+        columns += [
+            c.label(f"{MEDIA_COLUMN_PREFIX}{c.name}") for c in media_table.c
+        ]
+        from_clause = from_clause.outerjoin(
+            media_table, media_table.c.id == dataset_table.c.media_id
+        )
+
+    query = (
+        select(columns)
+        .select_from(from_clause)
+        .where(dataset_table.c.is_active == true())
+    )
+    return paginate(
+        query, dataset_table.c.created_at, dataset_table.c.id, limit, cursor
+    )
+
+
+def visible_dataset_row_to_po(
+    row: Any,
+) -> Tuple[
+    models.Dataset, Optional[media_models.Media], schemas.OWNERSHIP_TYPE
+]:
+    """
+    Unpack a row of `gen_visible_datasets_query`, from either SQLAlchemy or `databases`
+    """
+    row = dict(row)
+    po_dataset = models.Dataset(
+        **{c.name: row[c.name] for c in dataset_table.c}
+    )
+
+    po_media = visible_media_row_to_po(row)
+
+    return po_dataset, po_media, OWNERSHIP_RANKS[row["ownership_rank"]]
+
+
+def visible_media_row_to_po(
+    row: Dict[str, Any]
+) -> Optional[media_models.Media]:
+    if row[f"{MEDIA_COLUMN_PREFIX}id"] is None:
+        return None
+
+    return media_models.Media(
+        **{c.name: row[f"{MEDIA_COLUMN_PREFIX}{c.name}"] for c in media_table.c}
+    )
@@ -1,4 +1,12 @@
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
 from sqlalchemy.sql import func
 
 from server.libs.db.sqlalchemy import Base
@@ -10,7 +18,9 @@ class Dataset(Base):
     id = Column(
         Integer, primary_key=True, index=True, server_default=func.next_id()
     )
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(
+        Integer, ForeignKey("users.id"), nullable=False, index=True
+    )
     name = Column(String(200))
     description = Column(String(200))
     media_id = Column(Integer, ForeignKey("medias.id"))
@@ -28,6 +38,13 @@ class DatasetShareUser(Base):
     dataset_id = Column(Integer, ForeignKey("datasets.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
 
+    __table_args__ = (
+        Index(
+            "ix_dataset_shared_users_dataset_id_user_id", dataset_id, user_id
+        ),
+        Index("ix_dataset_shared_users_user_id", user_id),
+    )
+
 
 class DatasetShareGroup(Base):
     __tablename__ = "dataset_shared_groups"
@@ -38,6 +55,13 @@ class DatasetShareGroup(Base):
     dataset_id = Column(Integer, ForeignKey("datasets.id"))
     group_id = Column(Integer, ForeignKey("groups.id"))
 
+    __table_args__ = (
+        Index(
+            "ix_dataset_shared_groups_dataset_id_group_id", dataset_id, group_id
+        ),
+        Index("ix_dataset_shared_groups_group_id", group_id),
+    )
+
 
 class PublicDataset(Base):
     __tablename__ = "public_datasets"
@@ -1,8 +1,8 @@
 from typing import Optional, Tuple
 
+from server.apps.dataset.cache import DATASET_ACCESS_CACHE
 from server.apps.dataset.crud import DATASET_CRUD
 from server.apps.dataset.schemas import OWNERSHIP_TYPE, DatasetDO
-from server.apps.group.crud import GROUP_CRUD
 from server.apps.media.crud import MEDIA_CRUD
 from server.apps.user.schemas import UserDO
 
@@ -13,25 +13,15 @@ def check_access(
     if dataset.owner_id == user.id:
         return True, OWNERSHIP_TYPE.PRIVATE
 
-    # get dataset ids that shared with current user
-    user_dataset_ids = DATASET_CRUD.get_dataset_shared_with_user(user.id)
-    if dataset.id in user_dataset_ids:
-        return True, OWNERSHIP_TYPE.SHARED
+    cache_key = (user.id, dataset.id)
+    decision = DATASET_ACCESS_CACHE.get(cache_key)
+    if decision is not None:
+        return decision
 
-    # get groups that the dataset is shared to
-    dataset_shared_group_ids = DATASET_CRUD.get_shared_groups(dataset.id)
-    for shared_group_id in dataset_shared_group_ids:
-        shared_group_members = GROUP_CRUD.get_group_members(shared_group_id)
-
-        if user.id in shared_group_members.members:
-            return True, OWNERSHIP_TYPE.SHARED
-
-    # get public datasets
-    public_dataset_ids = DATASET_CRUD.get_public_datasets()
-    if dataset.id in public_dataset_ids:
-        return True, OWNERSHIP_TYPE.PUBLIC
-
-    return False, None
+    ownership_type = DATASET_CRUD.get_shared_ownership_type(dataset.id, user.id)
+    decision = (ownership_type is not None, ownership_type)
+    DATASET_ACCESS_CACHE.set(cache_key, decision)
+    return decision
 
 
 def validate_dataset_access(user: UserDO, dataset_id: int) -> bool:
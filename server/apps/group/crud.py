@@ -1,14 +1,50 @@
 import datetime
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy import exc, true
+from sqlalchemy import and_, exc, or_, select, true
+from sqlalchemy.sql import Select
 
+from server.apps.dataset.cache import DATASET_ACCESS_CACHE
 from server.apps.group import models, schemas
 from server.apps.group.schema_converter import GroupSchemaConvert
 from server.core.exception import EXCEPTION_LIB
 from server.libs.db.sqlalchemy import db
 from server.settings.global_sys_config import GLOBAL_CONFIG
+from server.utils.pagination import Cursor, paginate
+
+GROUP_LIST_FIELDS = list(schemas.GroupDTO.__fields__)
+
+group_table = models.Group.__table__
+
+
+def gen_visible_groups_query(
+    user_id: int,
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[Cursor] = None,
+) -> Select:
+    """
+    The groups owned by the user, and the groups the user is member of
+    """
+    member_group_ids = select([models.GroupMembers.group_id]).where(
+        models.GroupMembers.member_id == user_id
+    )
+    columns = (
+        [group_table] if fields is None else [group_table.c[f] for f in fields]
+    )
+    query = select(columns).where(
+        or_(
+            and_(
+                group_table.c.owner_id == user_id,
+                group_table.c.is_active == true(),
+            ),
+            group_table.c.id.in_(member_group_ids),
+        )
+    )
+    return paginate(
+        query, group_table.c.created_at, group_table.c.id, limit, cursor
+    )
 
 
 class GroupAbsFactory(ABC):
@@ -28,6 +64,25 @@ class GroupAbsFactory(ABC):
     ) -> List[schemas.GroupDO]:
         pass
 
+    @abstractmethod
+    def get_visible_groups(
+        self,
+        user_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[schemas.GroupDO]:
+        pass
+
+    @abstractmethod
+    def get_visible_group_fields(
+        self,
+        user_id: int,
+        fields: List[str],
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[Dict[str, Any]]:
+        pass
+
     # @abstractmethod
     # def get_all_group_ids_viewable_by_user(self, user_id: int) -> List[int]:
     #     pass
@@ -102,7 +157,7 @@ class PGGroupCRUD(GroupAbsFactory):
         self, user_id: int
     ) -> List[schemas.GroupDO]:
         po_groups = (
-            db.session.query(models.Group)
+            db.read_session.query(models.Group)
             .filter(models.Group.owner_id == user_id)
             .filter(models.Group.is_active == true())
             .all()
@@ -117,11 +172,11 @@ class PGGroupCRUD(GroupAbsFactory):
     def get_all_group_viewable_by_user(
         self, user_id: int
     ) -> List[schemas.GroupDO]:
-        group_member_ids = db.session.query(
+        group_member_ids = db.read_session.query(
             models.GroupMembers.group_id
         ).filter(models.GroupMembers.member_id == user_id)
         po_groups = (
-            db.session.query(models.Group)
+            db.read_session.query(models.Group)
             .filter(models.Group.id.in_(group_member_ids))
             .all()
         )
@@ -132,6 +187,32 @@ class PGGroupCRUD(GroupAbsFactory):
         do_groups = [GroupSchemaConvert.group_po_2_do(g) for g in po_groups]
         return do_groups
 
+    def get_visible_groups(
+        self,
+        user_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[schemas.GroupDO]:
+        rows = db.read_session.execute(
+            gen_visible_groups_query(user_id, limit=limit, cursor=cursor)
+        ).fetchall()
+        return [
+            GroupSchemaConvert.group_po_2_do(models.Group(**dict(r)))
+            for r in rows
+        ]
+
+    def get_visible_group_fields(
+        self,
+        user_id: int,
+        fields: List[str],
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[Dict[str, Any]]:
+        rows = db.read_session.execute(
+            gen_visible_groups_query(user_id, fields, limit, cursor)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
     def create_group(
         self, group_create: schemas.GroupCreateDO, user_id: int
     ) -> schemas.GroupDO:
@@ -207,6 +288,7 @@ class PGGroupCRUD(GroupAbsFactory):
 
             db.session.delete(obj)
             db.session.commit()
+            DATASET_ACCESS_CACHE.clear()
         except exc.IntegrityError:
             # the group_id is a foreign key of group_members, and other table in future
             # we need to release all relationship of group-member or group-tasks before we delete the group
@@ -228,6 +310,7 @@ class PGGroupCRUD(GroupAbsFactory):
         try:
             db.session.add(po_group_member)
             db.session.commit()
+            DATASET_ACCESS_CACHE.clear()
         except exc.IntegrityError:
             # the group id and user id are foreign keys of users and group table
             # group id and user id must be a valid id which exist in tables
@@ -256,6 +339,7 @@ class PGGroupCRUD(GroupAbsFactory):
 
         db.session.delete(obj)
         db.session.commit()
+        DATASET_ACCESS_CACHE.clear()
 
         return None
 
@@ -303,12 +387,13 @@ class PGGroupCRUD(GroupAbsFactory):
             db.session.bulk_save_objects(add_objs)
 
         db.session.commit()
+        DATASET_ACCESS_CACHE.clear()
 
         return self.get_group_members(group_id)
 
     def get_group_by_ids(self, group_ids: List[int]) -> List[schemas.GroupDO]:
         groups = (
-            db.session.query(models.Group)
+            db.read_session.query(models.Group)
             .filter(models.Group.id.in_(group_ids))
             .all()
         )
@@ -1,10 +1,10 @@
-from typing import List, Optional, Set
+from typing import Any, List, Optional, Set
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 
 from server.apps.dataset import utils as dataset_utils
 from server.apps.dataset.crud import DATASET_CRUD
-from server.apps.group.crud import GROUP_CRUD
+from server.apps.group.crud import GROUP_CRUD, GROUP_LIST_FIELDS
 from server.apps.group.schema_converter import GroupSchemaConvert
 from server.apps.group.schemas import (
     GroupCreateDTO,
@@ -21,6 +21,12 @@ from server.apps.user.schemas import UserDO
 from server.core import dependency
 from server.core.exception import EXCEPTION_LIB
 from server.settings.logger import app_group_logger as logger
+from server.utils.pagination import (
+    PageParams,
+    gen_fields_response,
+    parse_fields,
+    set_next_cursor,
+)
 from server.utils.validator import validate_resource_name
 
 router = APIRouter()
@@ -115,11 +121,13 @@ def get_shared_groups(
     response_description="list of groups owned or viewable by user",
 )
 def get_all_groups(
+    response: Response,
     action: Optional[str] = None,
     resource_type: Optional[str] = None,
     query: Optional[int] = None,
+    page: PageParams = Depends(),
     current_user: UserDO = Depends(dependency.get_current_active_user),
-) -> List[GroupDTO]:
+) -> Any:
     """
     Retrieve all groups owned or viewable by user
 
@@ -129,6 +137,9 @@ def get_all_groups(
     - action: shared
     - resource_type: dataset
     - query: dataset id
+    - limit, cursor: keyset pagination of 1., newest first. The cursor of the next
+      page is in the `X-Next-Cursor` header
+    - fields: comma separated fields of 1. to return, e.g., `name,owner_id`
     - current_user: logged-in user
     """
 
@@ -137,30 +148,23 @@ def get_all_groups(
             return []
         return get_shared_groups(action, resource_type, query, current_user)
 
-    # 1. get all groups ownder by user
-    do_owned_groups = GROUP_CRUD.get_all_groups_owned_by_user(current_user.id)
+    fields = parse_fields(page.fields, GROUP_LIST_FIELDS)
+    if fields is not None:
+        group_rows = GROUP_CRUD.get_visible_group_fields(
+            current_user.id, fields, page.limit, page.cursor
+        )
+        return gen_fields_response(group_rows, page.limit)
 
-    # 2. get all groups viewable by user
-    # viewable_group_id_l = GROUP_CRUD.get_all_group_ids_viewable_by_user(
-    #     current_user.id
-    # )
-    # do_viewable_groups = []
-    # for group_id in viewable_group_id_l:
-    #     do_group = GROUP_CRUD.get_group(group_id)
-    #     if not do_group:
-    #         raise EXCEPTION_LIB.GROUP__GROUP_TABLE_MEMBER_TABLE_OUT_OF_SYNC.value(
-    #             f"group_id {group_id} is shared with current user, but it is not in the group table!"
-    #         )
-    #     do_viewable_groups.append(do_group)
-    do_viewable_groups = GROUP_CRUD.get_all_group_viewable_by_user(
-        current_user.id
+    # the groups owned by user, and the groups viewable by user in one query
+    do_groups = GROUP_CRUD.get_visible_groups(
+        current_user.id, page.limit, page.cursor
     )
 
-    do_groups = do_owned_groups + do_viewable_groups
-
-    return [
+    dto_groups = [
         GroupSchemaConvert.group_do_2_dto(do_group) for do_group in do_groups
     ]
+    set_next_cursor(response, dto_groups, page.limit)
+    return dto_groups
 
 
 @router.get(
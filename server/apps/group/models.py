@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey
+from sqlalchemy import Column, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.sql.sqltypes import Boolean
 from sqlalchemy.types import DateTime, Integer, String, Text
@@ -28,3 +28,8 @@ class GroupMembers(Base):
     )
     group_id = Column(Integer, ForeignKey("groups.id"))
     member_id = Column(Integer, ForeignKey("users.id"))
+
+    __table_args__ = (
+        Index("ix_group_members_group_id_member_id", group_id, member_id),
+        Index("ix_group_members_member_id", member_id),
+    )
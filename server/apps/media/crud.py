@@ -150,7 +150,7 @@ class PGMediaCRUD(MediaAbsFactory):
 
     def get_all_medias_by_owner(self, owner_id: int) -> List[schemas.MediaDO]:
         po_medias = (
-            db.session.query(models.Media)
+            db.read_session.query(models.Media)
             .filter(models.Media.owner_id == owner_id)
             .all()
         )
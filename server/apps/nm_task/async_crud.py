@@ -0,0 +1,109 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, true
+
+from server.apps.nm_task import listing, models
+from server.apps.nm_task.crud import NM_TASK_CRUD
+from server.apps.nm_task.schema_converter import NmTaskSchemaConvert
+from server.apps.nm_task.schemas import AbcXyz_TYPE, NmTaskDO
+from server.libs.db.async_db import (
+    AsyncCRUDProxy,
+    async_db,
+    get_read_db,
+    record_to_po,
+)
+from server.settings.global_sys_config import GLOBAL_CONFIG
+from server.utils.pagination import Cursor
+
+
+class NmTaskAsyncCrudAbsFactory(ABC):
+    """Abstract factory class for async read of Name matching task"""
+
+    @abstractmethod
+    async def get_task(self, abcxyz_id: int) -> Optional[NmTaskDO]:
+        pass
+
+    @abstractmethod
+    async def get_tasks_by_owner(
+        self,
+        owner_id: int,
+        task_type: AbcXyz_TYPE,
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[NmTaskDO]:
+        pass
+
+    @abstractmethod
+    async def get_task_fields_by_owner(
+        self,
+        owner_id: int,
+        task_type: AbcXyz_TYPE,
+        fields: List[str],
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[Dict[str, Any]]:
+        pass
+
+    @classmethod
+    def make_concrete(cls) -> "NmTaskAsyncCrudAbsFactory":
+        """The factory method to load async name matching task factory"""
+
+        NM_TASK_ASYNC_FACTORY_DICT = {"pg": PGNmTaskAsyncCRUD}
+
+        return NM_TASK_ASYNC_FACTORY_DICT[GLOBAL_CONFIG.api_store]()
+
+
+class PGNmTaskAsyncCRUD(NmTaskAsyncCrudAbsFactory):
+    """Async name matching task factory: PG Database system"""
+
+    async def get_task(self, abcxyz_id: int) -> Optional[NmTaskDO]:
+        query = (
+            select([models.AbcXyzTask.__table__])
+            .where(models.AbcXyzTask.id == abcxyz_id)
+            .where(models.AbcXyzTask.is_active == true())
+        )
+        record = await async_db.fetch_one(query)
+        if not record:
+            return None
+
+        return NmTaskSchemaConvert.task_po_2_do(
+            record_to_po(models.AbcXyzTask, record)
+        )
+
+    async def get_tasks_by_owner(
+        self,
+        owner_id: int,
+        task_type: AbcXyz_TYPE,
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[NmTaskDO]:
+        records = await get_read_db().fetch_all(
+            listing.gen_tasks_by_owner_query(
+                owner_id, task_type, limit=limit, cursor=cursor
+            )
+        )
+        return [
+            NmTaskSchemaConvert.task_po_2_do(record_to_po(models.AbcXyzTask, r))
+            for r in records
+        ]
+
+    async def get_task_fields_by_owner(
+        self,
+        owner_id: int,
+        task_type: AbcXyz_TYPE,
+        fields: List[str],
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[Dict[str, Any]]:
+        records = await get_read_db().fetch_all(
+            listing.gen_tasks_by_owner_query(
+                owner_id, task_type, fields, limit, cursor
+            )
+        )
+        return [dict(r) for r in records]
+
+
+NM_TASK_ASYNC_CRUD = AsyncCRUDProxy(
+    NmTaskAsyncCrudAbsFactory.make_concrete(), NM_TASK_CRUD
+)
@@ -0,0 +1,16 @@
+"""
+Route cache of the real-time tasks, task id -> (started_at, pod base url), so a
+real-time query doesn't look the pod up in redis or K8S every time.
+
+A route is only used for the same run of the task, which has the same started_at.
+A restarted task may listen to another port. The route is dropped when the pod
+doesn't answer, see TASK__STATUS_DISORDER
+"""
+
+from server.settings import API_SETTING
+from server.utils.ttl_cache import TTLCache
+
+RT_TASK_ROUTE_CACHE = TTLCache(
+    max_size=API_SETTING.RT_TASK_ROUTE_CACHE_SIZE,
+    ttl=API_SETTING.RT_TASK_ROUTE_CACHE_TTL,
+)
@@ -1,14 +1,18 @@
 import datetime
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy import exc, true
+from sqlalchemy import Text, cast, exc, exists, func, literal, true, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 
-from server.apps.nm_task import models
+from server.apps.nm_task import listing, models
 from server.apps.nm_task.schema_converter import NmTaskSchemaConvert
 from server.apps.nm_task.schemas import (
+    NM_STATUS,
     POD_STATUS,
+    TASK_DATASET_ROLE,
     AbcXyz_TYPE,
+    BatchMatchingResult,
     NmTaskCreateDO,
     NmTaskDO,
 )
@@ -16,6 +20,19 @@ from server.core.exception import EXCEPTION_LIB
 from server.libs.db.sqlalchemy import db
 from server.settings.global_sys_config import GLOBAL_CONFIG
 from server.settings.logger import app_nm_task_logger as logger
+from server.utils.pagination import Cursor
+
+
+def gen_ext_info_set(key: str, value: Any) -> Any:
+    """
+    `ext_info` with its top level `key` set to `value`, computed by Postgres in the
+    UPDATE statement
+    """
+    return func.jsonb_set(
+        models.AbcXyzTask.ext_info,
+        literal([key], ARRAY(Text)),
+        cast(value, JSONB),
+    )
 
 
 class NmTaskCrudAbsFactory(ABC):
@@ -39,10 +56,55 @@ class NmTaskCrudAbsFactory(ABC):
 
     @abstractmethod
     def get_tasks_by_owner(
-        self, owner_id: int, task_type: AbcXyz_TYPE
+        self,
+        owner_id: int,
+        task_type: AbcXyz_TYPE,
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[NmTaskDO]:
+        pass
+
+    @abstractmethod
+    def get_task_fields_by_owner(
+        self,
+        owner_id: int,
+        task_type: AbcXyz_TYPE,
+        fields: List[str],
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def count_tasks_by_owner(
+        self, owner_id: int
+    ) -> Dict[AbcXyz_TYPE, Dict[NM_STATUS, int]]:
+        pass
+
+    @abstractmethod
+    def count_tasks_by_owner_status(
+        self, owner_id: int, nm_statuses: List[NM_STATUS]
+    ) -> int:
+        pass
+
+    @abstractmethod
+    def get_tasks_by_dataset(
+        self,
+        dataset_id: int,
+        nm_statuses: List[NM_STATUS],
+        owner_id: Optional[int] = None,
     ) -> List[NmTaskDO]:
         pass
 
+    @abstractmethod
+    def is_dataset_in_use(
+        self,
+        dataset_id: int,
+        nm_statuses: List[NM_STATUS],
+        role: Optional[TASK_DATASET_ROLE] = None,
+    ) -> bool:
+        pass
+
     @abstractmethod
     def get_task_by_name_type(
         self, user_id: int, name: str, task_type: AbcXyz_TYPE
@@ -53,6 +115,23 @@ class NmTaskCrudAbsFactory(ABC):
     def update_task(self, abcxyz_id: int, nm_task: NmTaskDO) -> None:
         pass
 
+    @abstractmethod
+    def update_task_status(
+        self,
+        abcxyz_id: int,
+        nm_status: NM_STATUS,
+        from_statuses: Optional[List[NM_STATUS]] = None,
+        started_at: Optional[datetime.datetime] = None,
+        finished_at: Optional[datetime.datetime] = None,
+    ) -> bool:
+        pass
+
+    @abstractmethod
+    def update_task_matching_result(
+        self, abcxyz_id: int, matching_result: BatchMatchingResult
+    ) -> None:
+        pass
+
     @abstractmethod
     def deactivate_task(self, abcxyz_id: int) -> None:
         pass
@@ -91,6 +170,22 @@ class NmTaskCrudAbsFactory(ABC):
     ) -> None:
         pass
 
+    @abstractmethod
+    def finish_running_task_run_records(
+        self,
+        pod_statuses: Dict[str, POD_STATUS],
+        finished_at: datetime.datetime,
+    ) -> List[models.AbcXyzTaskRunHistory]:
+        pass
+
+    @abstractmethod
+    def fail_stale_preparing_tasks(
+        self,
+        prepared_before: datetime.datetime,
+        finished_at: datetime.datetime,
+    ) -> List[int]:
+        pass
+
     @abstractmethod
     def get_all_running_task_pod(self) -> List[models.AbcXyzTaskRunHistory]:
         pass
@@ -101,6 +196,12 @@ class NmTaskCrudAbsFactory(ABC):
     ) -> List[models.AbcXyzTaskRunHistory]:
         pass
 
+    @abstractmethod
+    def count_records_by_started_at(
+        self, user_id: int, oldest_started_at: datetime.datetime
+    ) -> int:
+        pass
+
     @abstractmethod
     def get_task_run_history_list(
         self, user_id: int, abcxyz_id: int
@@ -143,11 +244,18 @@ class PGNmTaskCRUD(NmTaskCrudAbsFactory):
             updated_at=datetime.datetime.utcnow(),
             started_at=None,
             finished_at=None,
-            ext_info=nm_task.ext_info.json(),
+            ext_info=NmTaskSchemaConvert.model_2_jsonb(nm_task.ext_info),
+            **NmTaskSchemaConvert.task_ext_info_2_columns(nm_task.ext_info),
         )
 
         try:
             db.session.add(po_task)
+            db.session.flush()
+            db.session.add_all(
+                NmTaskSchemaConvert.task_ext_info_2_dataset_refs(
+                    po_task.id, nm_task.ext_info
+                )
+            )
             db.session.commit()
         except exc.IntegrityError:
             # the owner_id is a foreign key of users table
@@ -187,27 +295,136 @@ class PGNmTaskCRUD(NmTaskCrudAbsFactory):
         return do_task
 
     def get_tasks_by_owner(
-        self, owner_id: int, task_type: AbcXyz_TYPE
+        self,
+        owner_id: int,
+        task_type: AbcXyz_TYPE,
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
     ) -> List[NmTaskDO]:
+        rows = db.read_session.execute(
+            listing.gen_tasks_by_owner_query(
+                owner_id, task_type, limit=limit, cursor=cursor
+            )
+        ).fetchall()
+        do_tasks = [
+            NmTaskSchemaConvert.task_po_2_do(models.AbcXyzTask(**dict(r)))
+            for r in rows
+        ]
+        return do_tasks
+
+    def get_task_fields_by_owner(
+        self,
+        owner_id: int,
+        task_type: AbcXyz_TYPE,
+        fields: List[str],
+        limit: Optional[int] = None,
+        cursor: Optional[Cursor] = None,
+    ) -> List[Dict[str, Any]]:
+        rows = db.read_session.execute(
+            listing.gen_tasks_by_owner_query(
+                owner_id, task_type, fields, limit, cursor
+            )
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def get_all_tasks_by_owner(self, owner_id: int) -> List[NmTaskDO]:
         po_tasks = (
-            db.session.query(models.AbcXyzTask)
+            db.read_session.query(models.AbcXyzTask)
             .filter(models.AbcXyzTask.is_active == true())
             .filter(models.AbcXyzTask.owner_id == owner_id)
-            .filter(models.AbcXyzTask.type == task_type)
             .all()
         )
         do_tasks = [NmTaskSchemaConvert.task_po_2_do(t) for t in po_tasks]
         return do_tasks
 
-    def get_all_tasks_by_owner(self, owner_id: int) -> List[NmTaskDO]:
-        po_tasks = (
-            db.session.query(models.AbcXyzTask)
-            .filter(models.AbcXyzTask.is_active == true())
+    def count_tasks_by_owner(
+        self, owner_id: int
+    ) -> Dict[AbcXyz_TYPE, Dict[NM_STATUS, int]]:
+        """
+        Number of active tasks of the owner per task type and status, counted by a
+        single GROUP BY query
+        """
+        rows = (
+            db.read_session.query(
+                models.AbcXyzTask.type,
+                models.AbcXyzTask.nm_status,
+                func.count(models.AbcXyzTask.id),
+            )
             .filter(models.AbcXyzTask.owner_id == owner_id)
+            .filter(models.AbcXyzTask.is_active == true())
+            .group_by(models.AbcXyzTask.type, models.AbcXyzTask.nm_status)
             .all()
         )
-        do_tasks = [NmTaskSchemaConvert.task_po_2_do(t) for t in po_tasks]
-        return do_tasks
+
+        task_counts: Dict[AbcXyz_TYPE, Dict[NM_STATUS, int]] = {
+            t: {} for t in AbcXyz_TYPE
+        }
+        for task_type, nm_status, count in rows:
+            # both columns are nullable, a task without type or status is not
+            # counted in any of them
+            if task_type is None or nm_status is None:
+                continue
+            task_counts[AbcXyz_TYPE(task_type)][NM_STATUS(nm_status)] = count
+        return task_counts
+
+    def count_tasks_by_owner_status(
+        self, owner_id: int, nm_statuses: List[NM_STATUS]
+    ) -> int:
+        return (
+            db.session.query(func.count(models.AbcXyzTask.id))
+            .filter(models.AbcXyzTask.owner_id == owner_id)
+            .filter(models.AbcXyzTask.is_active == true())
+            .filter(models.AbcXyzTask.nm_status.in_(nm_statuses))
+            .scalar()
+        )
+
+    def get_tasks_by_dataset(
+        self,
+        dataset_id: int,
+        nm_statuses: List[NM_STATUS],
+        owner_id: Optional[int] = None,
+    ) -> List[NmTaskDO]:
+        """
+        The active tasks in one of `nm_statuses` which use the dataset, of any user
+        unless `owner_id` is given
+        """
+        query = (
+            db.session.query(models.AbcXyzTask)
+            .join(
+                models.TaskDatasetRef,
+                models.TaskDatasetRef.task_id == models.AbcXyzTask.id,
+            )
+            .filter(models.TaskDatasetRef.dataset_id == dataset_id)
+            .filter(models.AbcXyzTask.is_active == true())
+            .filter(models.AbcXyzTask.nm_status.in_(nm_statuses))
+        )
+        if owner_id is not None:
+            query = query.filter(models.AbcXyzTask.owner_id == owner_id)
+
+        # a task using the dataset as both gt and nm is returned once
+        po_tasks = query.distinct().all()
+        return [NmTaskSchemaConvert.task_po_2_do(t) for t in po_tasks]
+
+    def is_dataset_in_use(
+        self,
+        dataset_id: int,
+        nm_statuses: List[NM_STATUS],
+        role: Optional[TASK_DATASET_ROLE] = None,
+    ) -> bool:
+        query = (
+            db.session.query(models.TaskDatasetRef)
+            .join(
+                models.AbcXyzTask,
+                models.AbcXyzTask.id == models.TaskDatasetRef.task_id,
+            )
+            .filter(models.TaskDatasetRef.dataset_id == dataset_id)
+            .filter(models.AbcXyzTask.is_active == true())
+            .filter(models.AbcXyzTask.nm_status.in_(nm_statuses))
+        )
+        if role is not None:
+            query = query.filter(models.TaskDatasetRef.role == role)
+
+        return db.session.query(query.exists()).scalar()
 
     def get_task_by_name_type(
         self, owner_id: int, name: str, task_type: AbcXyz_TYPE
@@ -257,17 +474,94 @@ class PGNmTaskCRUD(NmTaskCrudAbsFactory):
             models.AbcXyzTask.id == abcxyz_id
         ).update(
             {
-                "ext_info": nm_task.ext_info.json(),
+                "ext_info": NmTaskSchemaConvert.model_2_jsonb(nm_task.ext_info),
                 "updated_at": nm_task.updated_at,
                 "started_at": nm_task.started_at,
                 "finished_at": nm_task.finished_at,
+                **NmTaskSchemaConvert.task_ext_info_2_columns(nm_task.ext_info),
             }
         )
+        # the datasets of the config may have changed
+        db.session.query(models.TaskDatasetRef).filter(
+            models.TaskDatasetRef.task_id == abcxyz_id
+        ).delete()
+        db.session.add_all(
+            NmTaskSchemaConvert.task_ext_info_2_dataset_refs(
+                abcxyz_id, nm_task.ext_info
+            )
+        )
 
         db.session.commit()
 
         return None
 
+    def update_task_status(
+        self,
+        abcxyz_id: int,
+        nm_status: NM_STATUS,
+        from_statuses: Optional[List[NM_STATUS]] = None,
+        started_at: Optional[datetime.datetime] = None,
+        finished_at: Optional[datetime.datetime] = None,
+    ) -> bool:
+        """
+        Change the task status by a single UPDATE, without reading the task first
+
+        If `from_statuses` is given, the status is only changed when the current one
+        is in it (compare-and-set), so that concurrent writers (endpoint, worker,
+        housekeeper) can't overwrite a newer status. Return if the task was updated
+        """
+        values = {
+            "ext_info": gen_ext_info_set("nm_status", nm_status.value),
+            "nm_status": nm_status,
+            "updated_at": datetime.datetime.utcnow(),
+            # N.B. if finished is None, it means a new running round
+            "finished_at": finished_at,
+        }
+        if started_at:
+            values["started_at"] = started_at
+
+        query = db.session.query(models.AbcXyzTask).filter(
+            models.AbcXyzTask.id == abcxyz_id
+        )
+        if from_statuses is not None:
+            query = query.filter(models.AbcXyzTask.nm_status.in_(from_statuses))
+        nr_updated = query.update(values, synchronize_session=False)
+
+        db.session.commit()
+
+        return nr_updated == 1
+
+    def update_task_matching_result(
+        self, abcxyz_id: int, matching_result: BatchMatchingResult
+    ) -> None:
+        nr_updated = (
+            db.session.query(models.AbcXyzTask)
+            .filter(models.AbcXyzTask.id == abcxyz_id)
+            .update(
+                {
+                    "ext_info": gen_ext_info_set(
+                        "matching_result",
+                        NmTaskSchemaConvert.model_2_jsonb(matching_result),
+                    ),
+                    "result_location": matching_result.location,
+                    "updated_at": datetime.datetime.utcnow(),
+                },
+                synchronize_session=False,
+            )
+        )
+
+        db.session.commit()
+
+        if nr_updated == 0:
+            logger.error(
+                f"Task__Task_ID_NOT_EXIST: update matching result failed! task_id [{abcxyz_id}]"
+            )
+            raise EXCEPTION_LIB.Task__Task_ID_NOT_EXIST.value(
+                f"The task id {abcxyz_id} does not exist"
+            )
+
+        return None
+
     def get_owner_id_by_task_id(self, abcxyz_id: int) -> Optional[int]:
         do_nm_task = self.get_task(abcxyz_id=abcxyz_id)
         if not do_nm_task:
@@ -346,6 +640,73 @@ class PGNmTaskCRUD(NmTaskCrudAbsFactory):
         db.session.commit()
         return
 
+    def finish_running_task_run_records(
+        self,
+        pod_statuses: Dict[str, POD_STATUS],
+        finished_at: datetime.datetime,
+    ) -> List[models.AbcXyzTaskRunHistory]:
+        """
+        Set the final status of the running records of the given pods, by one UPDATE
+        per status. A record not in RUNNING anymore, e.g., DELETED by the user, is
+        kept. Return the records which are updated
+        """
+        run_history_table = models.AbcXyzTaskRunHistory.__table__
+        pod_names_by_status: Dict[POD_STATUS, List[str]] = {}
+        for pod_name, pod_status in pod_statuses.items():
+            pod_names_by_status.setdefault(pod_status, []).append(pod_name)
+
+        run_records = []
+        for pod_status, pod_names in pod_names_by_status.items():
+            rows = db.session.execute(
+                update(run_history_table)
+                .where(run_history_table.c.pod_name.in_(pod_names))
+                .where(
+                    run_history_table.c.pod_status == POD_STATUS.RUNNING.value
+                )
+                .values(pod_status=pod_status.value, finished_at=finished_at)
+                .returning(*run_history_table.c)
+            ).fetchall()
+            run_records += [
+                models.AbcXyzTaskRunHistory(**dict(r)) for r in rows
+            ]
+        db.session.commit()
+
+        return run_records
+
+    def fail_stale_preparing_tasks(
+        self,
+        prepared_before: datetime.datetime,
+        finished_at: datetime.datetime,
+    ) -> List[int]:
+        """
+        Change the tasks in PREPARING since before `prepared_before`, and without a
+        run record of this round, to FAILED by one UPDATE. Such a task was never
+        launched, e.g., the API pod was killed before its launcher ran. Return the
+        ids of the failed tasks
+        """
+        task_table = models.AbcXyzTask.__table__
+        run_history_table = models.AbcXyzTaskRunHistory.__table__
+        has_run_record = exists().where(
+            (run_history_table.c.task_id == task_table.c.id)
+            & (run_history_table.c.started_at >= task_table.c.started_at)
+        )
+        rows = db.session.execute(
+            update(task_table)
+            .where(task_table.c.nm_status == NM_STATUS.PREPARING.value)
+            .where(task_table.c.started_at < prepared_before)
+            .where(~has_run_record)
+            .values(
+                ext_info=gen_ext_info_set("nm_status", NM_STATUS.FAILED.value),
+                nm_status=NM_STATUS.FAILED.value,
+                updated_at=datetime.datetime.utcnow(),
+                finished_at=finished_at,
+            )
+            .returning(task_table.c.id)
+        ).fetchall()
+        db.session.commit()
+
+        return [r.id for r in rows]
+
     def get_all_running_task_pod(self) -> List[models.AbcXyzTaskRunHistory]:
         running_task_l = (
             db.session.query(models.AbcXyzTaskRunHistory)
@@ -379,6 +740,16 @@ class PGNmTaskCRUD(NmTaskCrudAbsFactory):
         )
         return run_history_l
 
+    def count_records_by_started_at(
+        self, user_id: int, oldest_started_at: datetime.datetime
+    ) -> int:
+        return (
+            db.session.query(func.count(models.AbcXyzTaskRunHistory.id))
+            .filter(models.AbcXyzTaskRunHistory.owner_id == user_id)
+            .filter(models.AbcXyzTaskRunHistory.started_at >= oldest_started_at)
+            .scalar()
+        )
+
     def delete_task_by_owner(self, owner_id: int) -> None:
         db.session.query(models.AbcXyzTask).filter(
             models.AbcXyzTask.owner_id == owner_id
@@ -1,21 +1,29 @@
 import json
 import os
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 from urllib.parse import urlparse
 
-import redis
-import requests
-from fastapi import APIRouter, Depends, Request
+import httpx
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from kubernetes.client.rest import ApiException
+from starlette.background import BackgroundTask
 
+from server.apps.nm_task.async_crud import NM_TASK_ASYNC_CRUD
+from server.apps.nm_task.cache import RT_TASK_ROUTE_CACHE
 from server.apps.nm_task.crud import NM_TASK_CRUD
+from server.apps.nm_task.listing import TASK_LIST_FIELDS
+from server.apps.nm_task.rapidapi import RAPIDAPI_SANCTION_LANE
 from server.apps.nm_task.schema_converter import NmTaskSchemaConvert
 from server.apps.nm_task.schemas import (
     NM_STATUS,
+    NM_STATUS_STARTABLE_L,
     POD_STATUS,
     AbcXyz_TYPE,
     NmTaskCreateDTO,
+    NmTaskDO,
     NmTaskDTO,
     RTQueryRequestForRapidAPI,
     RTQueryRequst,
@@ -24,41 +32,54 @@ from server.apps.nm_task.schemas import (
 )
 from server.apps.nm_task.utils import (
     auth_check,
-    is_rq_worker_available,
+    gen_rt_query_params,
     rt_nm_match_validate,
     task_start_validate,
     task_stop_validate,
     validate_task_cfg,
 )
 from server.apps.user.schemas import UserDO
-from server.compute.rq_worker import run_task_in_subprocess
-from server.compute.utils import (
-    change_task_status,
-    gen_pubsub_channel_name,
-    get_q,
-)
+from server.compute.utils import change_task_status
 from server.core import dependency
 from server.core.exception import EXCEPTION_LIB
+from server.executors.factory import TASK_EXECUTOR
 from server.kubernetes.k8s_command import K8SCommand
 from server.libs.fs.factory import FILE_STORE_FACTORY
+from server.libs.http import RT_HTTP_CLIENT_POOL
 from server.libs.log_service.aws_cloudwatch_logs import CloudWatchLogsHelper
 from server.settings import API_SETTING
+from server.settings.dynamic_setting import (
+    DYNAMIC_SETTING,
+    RAPIDAPI_SANCTION_TASK_ID,
+)
 from server.settings.global_sys_config import GLOBAL_CONFIG
 from server.settings.logger import app_nm_task_logger as logger
-from server.utils.k8s_resource_name import gen_k8s_resource_prefix
+from server.utils import wire_format
+from server.utils.etag import check_not_modified, gen_version_etag
+from server.utils.pagination import (
+    PageParams,
+    gen_fields_response,
+    parse_fields,
+    set_next_cursor,
+)
 from server.utils.validator import validate_resource_name
 
 router = APIRouter()
 if os.getenv("API_RUN_LOCATION") in ["k8s", "minikube"]:
     k8s_command = K8SCommand()
-    redis_conn = redis.Redis(
-        host=API_SETTING.REDIS_DNS,
-        port=6379,
-        password=os.getenv("K8S_REDIS_PASSWORD"),
-    )
-    IN_K8S = True
-else:
-    IN_K8S = False
+
+# the sanction list search option of RapidAPI is fixed
+RAPIDAPI_SANCTION_SEARCH_OPTION = SearchOption(
+    top_n=1,
+    threshold=0.25,
+    selected_cols=[
+        "data_source",
+        "dataid",
+        "entity_type",
+        "program_type",
+        "country",
+    ],
+)
 
 
 @router.post(
@@ -124,14 +145,19 @@ def create_nm_task(
     response_model=NmTaskDTO,
     response_description="the name matching task",
 )
-def get_nm_task(
+async def get_nm_task(
     task_id: int,
+    request: Request,
+    response: Response,
     current_user: UserDO = Depends(dependency.get_current_active_user),
-) -> NmTaskDTO:
+) -> Any:
     """
     Retrieve name matching task
+
+    The ETag is the version of the task, i.e., `updated_at`. A poll with the
+    current one in `If-None-Match` is answered by 304
     """
-    do_task = NM_TASK_CRUD.get_task(task_id)
+    do_task = await NM_TASK_ASYNC_CRUD.get_task(task_id)
     if not do_task:
         logger.error(
             f"TASK__CURRENT_TASK_NOT_EXIST: The input task_id {task_id} does not exist! user_id [{current_user.id}] task_id [{task_id}]"
@@ -149,6 +175,14 @@ def get_nm_task(
     #         f"Group operation is not allowed: only the owner or viewer can get the detail of group {group_id}"
     #     )
 
+    not_modified = check_not_modified(
+        request,
+        response,
+        gen_version_etag("task", do_task.id, do_task.updated_at),
+    )
+    if not_modified:
+        return not_modified
+
     dto_nm_task = NmTaskSchemaConvert.task_do_2_dto(do_task)
     return dto_nm_task
 
@@ -159,18 +193,34 @@ def get_nm_task(
     response_model=List[NmTaskDTO],
     response_description="List datasets",
 )
-def list_task(
+async def list_task(
     nm_type: AbcXyz_TYPE,
+    response: Response,
+    page: PageParams = Depends(),
     current_user: UserDO = Depends(dependency.get_current_active_user),
-) -> List[NmTaskDTO]:
+) -> Any:
     """
     List all dataset which current user is owner or viewer
+
+    - limit, cursor: keyset pagination, newest first. The cursor of the next page
+      is in the `X-Next-Cursor` header
+    - fields: comma separated fields to return, e.g., `name,nm_status`
     """
-    do_tasks = NM_TASK_CRUD.get_tasks_by_owner(current_user.id, nm_type)
+    fields = parse_fields(page.fields, TASK_LIST_FIELDS)
+    if fields is not None:
+        task_rows = await NM_TASK_ASYNC_CRUD.get_task_fields_by_owner(
+            current_user.id, nm_type, fields, page.limit, page.cursor
+        )
+        return gen_fields_response(task_rows, page.limit)
+
+    do_tasks = await NM_TASK_ASYNC_CRUD.get_tasks_by_owner(
+        current_user.id, nm_type, page.limit, page.cursor
+    )
 
     # TODO get all dataset which current user is viewer then merge the two parts
 
     dto_tasks = [NmTaskSchemaConvert.task_do_2_dto(d) for d in do_tasks]
+    set_next_cursor(response, dto_tasks, page.limit)
     return dto_tasks
 
 
@@ -261,103 +311,38 @@ def start_task(
     # call task validation
     task_start_validate(do_task, task_id, current_user)
 
-    change_task_status(
+    # a concurrent start request could have started the task after the validation
+    if not change_task_status(
         task_id,
         NM_STATUS.PREPARING,
         "nm start endpoint",
         started_at=datetime.utcnow(),
-    )
+        from_statuses=NM_STATUS_STARTABLE_L,
+    ):
+        logger.error(
+            f"TASK_COMPUTE__TASK_HAS_BEEN_RUNNING: The user [{current_user.id}] has already had task [{task_id}] started by another request"
+        )
+        raise EXCEPTION_LIB.TASK_COMPUTE__TASK_HAS_BEEN_RUNNING.value(
+            f"Task [{do_task.name}] has already been running"
+        )
     logger.info(f"NM task [{task_id}] status switched to PREPARING")
 
-    if IN_K8S:
-        if do_task.type == AbcXyz_TYPE.NAME_MATCHING_BATCH:
-            pod_name = k8s_command.run_task_in_k8s(
-                task_id=do_task.id,
-                user_id=current_user.id,
-                entrypoint=[
-                    "python",
-                    "server/compute/rq_worker.py",
-                ],  # K8S Pod command
-                command=[
-                    "python",
-                    "server/compute/batch.py",
-                    f"{do_task.id}",
-                    f"{current_user.id}",
-                ],  # work initial args
-            )
-        else:
-            pod_name = k8s_command.run_task_in_k8s(
-                task_id=do_task.id,
-                user_id=current_user.id,
-                entrypoint=[
-                    "python",
-                    "server/compute/rq_worker.py",
-                ],  # K8S Pod command
-                command=[
-                    "uvicorn",
-                    "server.compute.realtime:app",
-                    "--host",
-                    "0.0.0.0",
-                    "--port",
-                    f"{API_SETTING.REALTIME_NM_ENDPOINT_PORT}",
-                ],
-            )
-
-        # add record to task run history table
-        NM_TASK_CRUD.add_task_run_record(current_user.id, do_task.id, pod_name)
-
-        return f"start task {task_id} successfully"
-
-    else:
-        # ECS or local mode
-        # call executor
-        if not is_rq_worker_available(do_task):
-            logger.error(
-                f"EXECUTOR__TASK_WORKER_NOT_AVAILABLE: rq worker for type {do_task.type} is not avaiable! You are running in local mode, only 1 batch and 1 realtime can be run in the same time! user_id [{current_user.id}] task_id [{task_id}]"
-            )
-            raise EXCEPTION_LIB.EXECUTOR__TASK_WORKER_NOT_AVAILABLE.value(
-                f"Computation worker for [{do_task.type}] type task is not avaiable! You are running in local mode, only 1 batch and 1 realtime can be run in the same time"
-            )
-
-        if do_task.type == AbcXyz_TYPE.NAME_MATCHING_BATCH:
-            q = get_q("nm_batch_worker")
-            q.enqueue(
-                run_task_in_subprocess,
-                (
-                    do_task.id,
-                    current_user.id,
-                    NM_TASK_CRUD,
-                    [
-                        "python",
-                        "server/compute/batch.py",
-                        f"{do_task.id}",
-                        f"{current_user.id}",
-                    ],
-                ),
-                job_id="nm_batch_task",
-                job_timeout=-1,
-            )
-        else:
-            q = get_q("nm_realtime_worker")
-            q.enqueue(
-                run_task_in_subprocess,
-                (
-                    do_task.id,
-                    current_user.id,
-                    NM_TASK_CRUD,
-                    [
-                        "uvicorn",
-                        "server.compute.realtime:app",
-                        "--host",
-                        "0.0.0.0",
-                        # "--reload", not use reload, otherwise we cannot clean uvicorn thoroughly
-                        "--port",
-                        f"{API_SETTING.REALTIME_NM_ENDPOINT_PORT}",
-                    ],
-                ),
-                job_id="nm_realtime_task",
-                job_timeout=-1,
-            )
+    try:
+        TASK_EXECUTOR.start_task(do_task, current_user.id)
+    except Exception:
+        # the task is not launched, so it can be started again
+        logger.exception(
+            f"NM task [{task_id}] start failed, switch status back to [{do_task.ext_info.nm_status}]"
+        )
+        change_task_status(
+            task_id,
+            do_task.ext_info.nm_status,
+            "nm start endpoint",
+            started_at=do_task.started_at,
+            finished_at=do_task.finished_at,
+            from_statuses=[NM_STATUS.PREPARING],
+        )
+        raise
 
     return f"start task {task_id} successfully"
 
@@ -391,43 +376,113 @@ def stop_task(
     logger.info(
         f"User initiated to stop task {task_id} at {do_task.updated_at}"
     )
-    # K8S Env
-    if IN_K8S:
-        redis_conn.publish(
-            gen_pubsub_channel_name(task_id, current_user.id), "1"
-        )
-    # ECS and Local Env
-    else:
-        # call executor
-        if do_task.type == AbcXyz_TYPE.NAME_MATCHING_BATCH:
-            worker_name = "nm_batch_worker"
-            job_name = "nm_batch_task"
-        else:
-            worker_name = "nm_realtime_worker"
-            job_name = "nm_realtime_task"
-
-        q = get_q(worker_name)
-        nm_job = q.fetch_job(job_name)
-
-        # following the way of stackoverflow threads
-        # https://stackoverflow.com/questions/55244729/python-rq-how-to-pass-information-from-the-caller-to-the-worker
-        nm_job.connection.set(nm_job.key + b":should_stop", 1, ex=30)
+    TASK_EXECUTOR.stop_task(do_task, current_user.id)
 
     return f"Stop task {task_id} successfully"
 
 
-@router.post(
-    "/tasks/nm/{task_id}/match",
-    summary="Match name by a real-time NM task",
-    response_model=RTQueryResp,
-    response_description="Real-time matching result",
-)
-def nm_realtime_match(
+async def proxy_rt_query(
+    base_url: str,
+    payload: dict,
+    task_id: int,
+    user_id: Optional[int],
+    accept: Optional[str] = None,
+) -> Response:
+    """
+    Forward a query to the real-time matching pod by the pooled keep-alive client
+
+    The pod response is already a serialized `RTQueryResp`, so the bytes are passed
+    through without parsing and validating them again. The pod encodes the result in
+    the media type the client accepts (JSON by default, or msgpack)
+    """
+    media_type = wire_format.negotiate_media_type(accept)
+    try:
+        async with RT_HTTP_CLIENT_POOL.use_client(base_url) as client:
+            r = await client.get(
+                f"{API_SETTING.API_V1_STR}/nm-realtime",
+                params=payload,
+                headers={"Accept": media_type},
+            )
+    except httpx.HTTPError as e:
+        # other requests may still use the client, it is closed after them
+        await RT_HTTP_CLIENT_POOL.evict_client(base_url)
+        RT_TASK_ROUTE_CACHE.delete(task_id)
+        logger.error(
+            f"TASK__STATUS_DISORDER: user_id [{user_id}] task_id [{task_id}] 'Running' in DB, but no corresponding pod. Check the task status. error [{e!r}]"
+        )
+        raise EXCEPTION_LIB.TASK__STATUS_DISORDER.value(
+            "This task status is not correct, and it is actually not running. Please delete the task, create and running it again."
+        )
+
+    return Response(
+        content=r.content,
+        status_code=r.status_code,
+        media_type=r.headers.get("content-type", media_type),
+    )
+
+
+async def proxy_rt_bulk_query(
+    base_url: str, query_request: RTQueryRequst, task_id: int, user_id: int
+) -> Response:
+    """
+    Forward a bulk query to the real-time matching pod, and stream the NDJSON
+    result lines back to the client as they arrive
+    """
+    # the client is used until the stream is consumed
+    client = RT_HTTP_CLIENT_POOL.acquire_client(base_url)
+    req = client.build_request(
+        "POST",
+        f"{API_SETTING.API_V1_STR}/nm-realtime/bulk",
+        json=query_request.dict(),
+    )
+    try:
+        r = await client.send(req, stream=True)
+    except httpx.HTTPError as e:
+        await RT_HTTP_CLIENT_POOL.release_client(client)
+        await RT_HTTP_CLIENT_POOL.evict_client(base_url)
+        RT_TASK_ROUTE_CACHE.delete(task_id)
+        logger.error(
+            f"TASK__STATUS_DISORDER: user_id [{user_id}] task_id [{task_id}] 'Running' in DB, but no corresponding pod. Check the task status. error [{e!r}]"
+        )
+        raise EXCEPTION_LIB.TASK__STATUS_DISORDER.value(
+            "This task status is not correct, and it is actually not running. Please delete the task, create and running it again."
+        )
+
+    if r.status_code != 200:
+        try:
+            content = await r.aread()
+        finally:
+            await r.aclose()
+            await RT_HTTP_CLIENT_POOL.release_client(client)
+        return Response(
+            content=content,
+            status_code=r.status_code,
+            media_type=r.headers.get("content-type"),
+        )
+
+    async def close_stream() -> None:
+        try:
+            await r.aclose()
+        finally:
+            await RT_HTTP_CLIENT_POOL.release_client(client)
+
+    return StreamingResponse(
+        r.aiter_raw(),
+        media_type=wire_format.NDJSON_MEDIA_TYPE,
+        background=BackgroundTask(close_stream),
+    )
+
+
+async def rt_match_prepare(
     task_id: int,
     query_request: RTQueryRequst,
-    current_user: UserDO = Depends(dependency.get_current_active_user),
-) -> RTQueryResp:
-    do_task = NM_TASK_CRUD.get_task(task_id)
+    current_user: UserDO,
+    bulk: bool = False,
+) -> str:
+    """
+    Validate a real-time matching request, and return the base url of the task pod
+    """
+    do_task = await NM_TASK_ASYNC_CRUD.get_task(task_id)
     if not do_task:
         logger.error(
             f"TASK__CURRENT_TASK_NOT_EXIST: task_id [{task_id}] current_user[{current_user}]"
@@ -448,34 +503,77 @@ def nm_realtime_match(
     auth_check(do_task, task_id, current_user.id)
 
     # nm match validation
-    rt_nm_match_validate(do_task, task_id, current_user, query_request)
+    rt_nm_match_validate(do_task, task_id, current_user, query_request, bulk)
 
-    # update searching option
-    do_task.ext_info.search_option = query_request.search_option
-    do_task.updated_at = datetime.utcnow()
-    NM_TASK_CRUD.update_task(task_id, do_task)
+    return await get_rt_task_base_url(do_task)
 
-    # TODO: replace k8s namespace nm by a global value
-    if IN_K8S:
-        rt_task_svc_name = gen_k8s_resource_prefix(task_id, current_user.id)
-        host_name = f"{rt_task_svc_name}.nm.svc"
-        url = f"http://{host_name}{API_SETTING.API_V1_STR}/nm-realtime"
-    else:
-        url = f"http://{API_SETTING.REALTIME_NM_ENDPOINT_URL}:{API_SETTING.REALTIME_NM_ENDPOINT_PORT}{API_SETTING.API_V1_STR}/nm-realtime"
 
-    payload = {"q": query_request.query_keys}
+async def get_rt_task_base_url(do_task: NmTaskDO) -> str:
+    """
+    The pod base url of a running real-time task, cached for the current run of
+    the task. The executor may look it up by a blocking call, e.g., redis in RQ
+    mode, so it runs in the threadpool
+    """
+    route = RT_TASK_ROUTE_CACHE.get(do_task.id)
+    if route is not None and route[0] == do_task.started_at:
+        return route[1]
 
-    try:
-        r = requests.get(url, params=payload)
-    except Exception:
-        logger.error(
-            f"TASK__STATUS_DISORDER: user_id [{current_user.id}] task_id [{task_id}] 'Running' in DB, but no corresponding pod. Check the task status"
-        )
-        raise EXCEPTION_LIB.TASK__STATUS_DISORDER.value(
-            "This task status is not correct, and it is actually not running. Please delete the task, create and running it again."
-        )
+    base_url = await run_in_threadpool(
+        TASK_EXECUTOR.gen_rt_task_base_url, do_task.id, do_task.owner_id
+    )
+    RT_TASK_ROUTE_CACHE.set(do_task.id, (do_task.started_at, base_url))
+    return base_url
+
+
+@router.post(
+    "/tasks/nm/{task_id}/match",
+    summary="Match name by a real-time NM task",
+    response_model=RTQueryResp,
+    response_description="Real-time matching result",
+)
+async def nm_realtime_match(
+    request: Request,
+    task_id: int,
+    query_request: RTQueryRequst,
+    current_user: UserDO = Depends(dependency.get_current_active_user),
+) -> Response:
+    base_url = await rt_match_prepare(task_id, query_request, current_user)
+
+    payload = gen_rt_query_params(
+        query_request.query_keys, query_request.search_option
+    )
+
+    return await proxy_rt_query(
+        base_url,
+        payload,
+        task_id,
+        current_user.id,
+        request.headers.get("accept"),
+    )
+
+
+@router.post(
+    "/tasks/nm/{task_id}/bulk-match",
+    summary="Match a bulk of names by a real-time NM task",
+    response_description="Real-time matching result, one NDJSON line per chunk of query keys",
+)
+async def nm_realtime_bulk_match(
+    task_id: int,
+    query_request: RTQueryRequst,
+    current_user: UserDO = Depends(dependency.get_current_active_user),
+) -> Response:
+    """
+    Match up to thousands of query keys without creating a batch task
 
-    return RTQueryResp(**r.json())
+    The result is streamed back as NDJSON. Each line is a `RTQueryResp` of a chunk of query keys
+    """
+    base_url = await rt_match_prepare(
+        task_id, query_request, current_user, bulk=True
+    )
+
+    return await proxy_rt_bulk_query(
+        base_url, query_request, task_id, current_user.id
+    )
 
 
 @router.get(
@@ -593,34 +691,15 @@ def get_batch_task_result_download_url(
 # TODO: add task sharing feature
 
 
-@router.post(
-    "/tasks/rapid-api/sanction-list-fuzzy-search",
-    summary="Sanction name list matching for RapidAPI",
-    response_model=RTQueryResp,
-    response_description="Real-time matching result",
-)
-def rapidapi_nm_realtime_match(
-    request: Request,
-    query_request: RTQueryRequestForRapidAPI,
-) -> RTQueryResp:
-    rapidapi_proxy_secret = request.headers.get("x-rapidapi-proxy-secret")
-    if rapidapi_proxy_secret != API_SETTING.X_RAPIDAPI_PROXY_SECRET:
-        raise EXCEPTION_LIB.RAPIDAPI__SECRET_ERROR.value(
-            f"RapidAPI secret mismatch. Input secret is {rapidapi_proxy_secret}. Please check the configuration secret"
-        )
-
+def rapidapi_rt_match_prepare() -> Tuple[int, str]:
+    """
+    Find the RapidAPI sanction list task, and return its id and the base url of its pod
+    """
     task_id: int = 0
     if os.getenv("API_RUN_LOCATION") in ["k8s"]:
-        redis_conn = redis.Redis(
-            host=API_SETTING.REDIS_DNS,
-            port=6379,
-            password=os.getenv("K8S_REDIS_PASSWORD"),
-        )
-        task_id_bytes = redis_conn.get("RAPIDAPI_SANCTION_TASK_ID")
-
-        # I test in python, and int.from_bytes seems doesn't work
-        # task_id = int.from_bytes(task_id_bytes, "big")
-        task_id = int(task_id_bytes.decode("utf-8"))
+        sanction_task_id = DYNAMIC_SETTING.get(RAPIDAPI_SANCTION_TASK_ID)
+        if sanction_task_id is not None:
+            task_id = int(sanction_task_id)
         logger.info(f"sanction task id [{task_id}]")
 
     if task_id == 0:
@@ -643,30 +722,53 @@ def rapidapi_nm_realtime_match(
             "Matching in real-time is only for a name matching real-time task. Your selected task is a not a real-time task."
         )
 
-    # update searching option
-    do_task.ext_info.search_option = SearchOption(
-        top_n=1,
-        threshold=0.25,
-        selected_cols=[
-            "data_source",
-            "dataid",
-            "entity_type",
-            "program_type",
-            "country",
-        ],
+    return task_id, TASK_EXECUTOR.gen_rt_task_base_url(
+        task_id, do_task.owner_id
     )
-    do_task.updated_at = datetime.utcnow()
-    NM_TASK_CRUD.update_task(task_id, do_task)
 
-    # TODO: replace k8s namespace nm by a global value
-    if IN_K8S:
-        rt_task_svc_name = gen_k8s_resource_prefix(task_id, do_task.owner_id)
-        host_name = f"{rt_task_svc_name}.nm.svc"
-        url = f"http://{host_name}{API_SETTING.API_V1_STR}/nm-realtime"
-    else:
-        url = f"http://{API_SETTING.REALTIME_NM_ENDPOINT_URL}:{API_SETTING.REALTIME_NM_ENDPOINT_PORT}{API_SETTING.API_V1_STR}/nm-realtime"
 
-    payload = {"q": query_request.query_keys}
-    r = requests.get(url, params=payload)
+@router.post(
+    "/tasks/rapid-api/sanction-list-fuzzy-search",
+    summary="Sanction name list matching for RapidAPI",
+    response_model=RTQueryResp,
+    response_description="Real-time matching result",
+)
+async def rapidapi_nm_realtime_match(
+    request: Request,
+    query_request: RTQueryRequestForRapidAPI,
+) -> Response:
+    rapidapi_proxy_secret = request.headers.get("x-rapidapi-proxy-secret")
+    if rapidapi_proxy_secret != API_SETTING.X_RAPIDAPI_PROXY_SECRET:
+        raise EXCEPTION_LIB.RAPIDAPI__SECRET_ERROR.value(
+            f"RapidAPI secret mismatch. Input secret is {rapidapi_proxy_secret}. Please check the configuration secret"
+        )
+
+    # the route is cached in process, and only resolved by redis and DB
+    # when the sanction task changes
+    task_id, base_url = RAPIDAPI_SANCTION_LANE.route or await run_in_threadpool(
+        RAPIDAPI_SANCTION_LANE.load_route, rapidapi_rt_match_prepare
+    )
+
+    media_type = wire_format.negotiate_media_type(request.headers.get("accept"))
+    result_key = RAPIDAPI_SANCTION_LANE.gen_result_key(
+        task_id, media_type, query_request.query_keys
+    )
+    cached_resp = RAPIDAPI_SANCTION_LANE.get_result(result_key)
+    if cached_resp is not None:
+        return cached_resp
+
+    payload = gen_rt_query_params(
+        query_request.query_keys, RAPIDAPI_SANCTION_SEARCH_OPTION
+    )
+
+    try:
+        resp = await proxy_rt_query(
+            base_url, payload, task_id, None, media_type
+        )
+    except EXCEPTION_LIB.TASK__STATUS_DISORDER.value:  # type: ignore
+        # the pod is gone, resolve the route again in the next request
+        RAPIDAPI_SANCTION_LANE.invalidate()
+        raise
 
-    return RTQueryResp(**r.json())
+    RAPIDAPI_SANCTION_LANE.set_result(result_key, resp)
+    return resp
@@ -0,0 +1,41 @@
+"""
+Paginated listing of the tasks of a user, for `GET /tasks/nm`
+
+The same query is used by both the sync and the async CRUD. With `fields` only
+those columns are selected, e.g., the UI lists names and statuses without reading
+the `ext_info` JSON of every task
+"""
+
+from typing import List, Optional
+
+from sqlalchemy import select, true
+from sqlalchemy.sql import Select
+
+from server.apps.nm_task import models, schemas
+from server.utils.pagination import Cursor, paginate
+
+# fields of NmTaskDTO, and the denormalized status of `ext_info`
+TASK_LIST_FIELDS = list(schemas.NmTaskDTO.__fields__) + ["nm_status"]
+
+task_table = models.AbcXyzTask.__table__
+
+
+def gen_tasks_by_owner_query(
+    owner_id: int,
+    task_type: schemas.AbcXyz_TYPE,
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[Cursor] = None,
+) -> Select:
+    columns = (
+        [task_table] if fields is None else [task_table.c[f] for f in fields]
+    )
+    query = (
+        select(columns)
+        .where(task_table.c.is_active == true())
+        .where(task_table.c.owner_id == owner_id)
+        .where(task_table.c.type == task_type)
+    )
+    return paginate(
+        query, task_table.c.created_at, task_table.c.id, limit, cursor
+    )
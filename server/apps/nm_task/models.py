@@ -1,4 +1,5 @@
-from sqlalchemy import Column, ForeignKey
+from sqlalchemy import Column, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.sql.sqltypes import Boolean
 from sqlalchemy.types import DateTime, Integer, String, Text
@@ -22,7 +23,38 @@ class AbcXyzTask(Base):
     updated_at = Column(DateTime, server_default=func.now(), nullable=False)
     started_at = Column(DateTime, nullable=True)
     finished_at = Column(DateTime, nullable=True)
-    ext_info = Column(Text)
+    # JSONB, so that a status or a result is updated in place by `jsonb_set`
+    ext_info = Column(JSONB)
+    # denormalized from ext_info, kept in sync by the CRUD on every update,
+    # so that the status is queried without parsing ext_info
+    nm_status = Column(String(20))
+    result_location = Column(Text)
+
+    __table_args__ = (
+        Index("ix_abcxyz_tasks_owner_id_nm_status", owner_id, nm_status),
+    )
+
+
+class TaskDatasetRef(Base):
+    """
+    The datasets a task uses, written with the task config on create and update, so
+    that the tasks using a dataset are found by the dataset id
+    """
+
+    __tablename__ = "task_dataset_refs"
+
+    task_id = Column(
+        Integer,
+        ForeignKey("abcxyz_tasks.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # gt or nm, see TASK_DATASET_ROLE
+    role = Column(String(10), primary_key=True)
+    dataset_id = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_task_dataset_refs_dataset_id_role", dataset_id, role),
+    )
 
 
 # # N.B.: membe_id should be active user
@@ -58,3 +90,12 @@ class AbcXyzTaskRunHistory(Base):
     started_at = Column(DateTime, server_default=func.now(), nullable=False)
     finished_at = Column(DateTime, nullable=True)
     ext_info = Column(Text)
+
+    # the monthly run quota counts the runs of a user since a date
+    __table_args__ = (
+        Index(
+            "ix_abcxyz_tasks_run_history_owner_id_started_at",
+            owner_id,
+            started_at,
+        ),
+    )
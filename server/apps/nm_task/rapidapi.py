@@ -0,0 +1,88 @@
+"""
+Fast lane of the RapidAPI sanction list search, which carries the highest external QPS
+
+- the sanction task id and its pod base url are resolved once and cached in process.
+  The task id is a dynamic setting, the cached route is dropped when it changes
+- the search option is fixed, so the same query keys always get the same result from
+  the same task. The pod responses are cached in front of the pod
+"""
+
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from fastapi import Response
+
+from server.settings import API_SETTING
+from server.settings.dynamic_setting import (
+    DYNAMIC_SETTING,
+    RAPIDAPI_SANCTION_TASK_ID,
+)
+from server.settings.logger import app_nm_task_logger as logger
+from server.utils.ttl_cache import TTLCache
+
+
+class RapidAPISanctionLane:
+    def __init__(self, result_cache_size: int, result_cache_ttl: float):
+        self.route: Optional[Tuple[int, str]] = None
+        self.result_cache = TTLCache(result_cache_size, result_cache_ttl)
+        # a route resolved before an invalidation must not be cached after it
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def load_route(
+        self, resolve: Callable[[], Tuple[int, str]]
+    ) -> Tuple[int, str]:
+        """
+        Get the cached (task_id, base_url) route. Resolve and cache it if missing
+        """
+        route = self.route
+        if route is not None:
+            return route
+
+        generation = self._generation
+        route = resolve()
+        with self._lock:
+            if generation == self._generation:
+                self.route = route
+        return route
+
+    def invalidate(self) -> None:
+        """
+        Drop the cached route and results, e.g., the sanction task changes or its pod is gone
+        """
+        with self._lock:
+            self._generation += 1
+            self.route = None
+        self.result_cache.clear()
+
+    @staticmethod
+    def gen_result_key(
+        task_id: int, media_type: str, query_keys: List[str]
+    ) -> Tuple:
+        return (task_id, media_type, tuple(query_keys))
+
+    def get_result(self, key: Tuple) -> Optional[Response]:
+        cached = self.result_cache.get(key)
+        if cached is None:
+            return None
+        content, media_type = cached
+        return Response(content=content, media_type=media_type)
+
+    def set_result(self, key: Tuple, resp: Response) -> None:
+        if resp.status_code == 200:
+            self.result_cache.set(key, (resp.body, resp.media_type))
+
+    def on_task_id_change(self, task_id: str) -> None:
+        logger.info(
+            f"RapidAPI sanction task id changes to [{task_id}]. Drop the cached route"
+        )
+        self.invalidate()
+
+
+RAPIDAPI_SANCTION_LANE = RapidAPISanctionLane(
+    result_cache_size=API_SETTING.RAPIDAPI_RESULT_CACHE_SIZE,
+    result_cache_ttl=API_SETTING.RAPIDAPI_RESULT_CACHE_TTL,
+)
+DYNAMIC_SETTING.on_change(
+    RAPIDAPI_SANCTION_TASK_ID, RAPIDAPI_SANCTION_LANE.on_task_id_change
+)
@@ -1,3 +1,8 @@
+import json
+from typing import Any, Dict, List, Union
+
+from pydantic import BaseModel
+
 from server.apps.nm_task import models, schemas
 from server.core.exception import EXCEPTION_LIB
 from server.settings.logger import app_nm_task_logger as logger
@@ -21,7 +26,7 @@ class NmTaskSchemaConvert(object):
                 updated_at=po.updated_at,
                 started_at=po.started_at,
                 finished_at=po.finished_at,
-                ext_info=schemas.NmCfgRtSchema.parse_raw(po.ext_info),
+                ext_info=schemas.NmCfgRtSchema.parse_obj(po.ext_info),
             )
         elif po.type == schemas.AbcXyz_TYPE.NAME_MATCHING_BATCH:
             do = schemas.NmTaskDO(
@@ -36,7 +41,7 @@ class NmTaskSchemaConvert(object):
                 updated_at=po.updated_at,
                 started_at=po.started_at,
                 finished_at=po.finished_at,
-                ext_info=schemas.NmCfgBatchSchema.parse_raw(po.ext_info),
+                ext_info=schemas.NmCfgBatchSchema.parse_obj(po.ext_info),
             )
         else:
             logger.error(
@@ -47,6 +52,52 @@ class NmTaskSchemaConvert(object):
             )
         return do
 
+    @staticmethod
+    def model_2_jsonb(model: BaseModel) -> Any:
+        """
+        The value stored in a JSONB column, encoded by the pydantic JSON encoders
+        (enums, timedelta) as `ext_info` has always been
+        """
+        return json.loads(model.json())
+
+    @staticmethod
+    def task_ext_info_2_columns(
+        ext_info: Union[schemas.NmCfgBatchSchema, schemas.NmCfgRtSchema]
+    ) -> Dict[str, Any]:
+        """
+        The denormalized columns of `abcxyz_tasks`, which are read from ext_info
+        """
+        matching_result = getattr(ext_info, "matching_result", None)
+        return {
+            "nm_status": ext_info.nm_status,
+            "result_location": matching_result.location
+            if matching_result
+            else None,
+        }
+
+    @staticmethod
+    def task_ext_info_2_dataset_refs(
+        abcxyz_id: int,
+        ext_info: Union[schemas.NmCfgBatchSchema, schemas.NmCfgRtSchema],
+    ) -> List[models.TaskDatasetRef]:
+        po_refs = [
+            models.TaskDatasetRef(
+                task_id=abcxyz_id,
+                role=schemas.TASK_DATASET_ROLE.GT,
+                dataset_id=ext_info.gt_dataset_config.dataset_id,
+            )
+        ]
+        nm_dataset_config = getattr(ext_info, "nm_dataset_config", None)
+        if nm_dataset_config:
+            po_refs.append(
+                models.TaskDatasetRef(
+                    task_id=abcxyz_id,
+                    role=schemas.TASK_DATASET_ROLE.NM,
+                    dataset_id=nm_dataset_config.dataset_id,
+                )
+            )
+        return po_refs
+
     @staticmethod
     def task_do_2_dto(do: schemas.NmTaskDO) -> schemas.NmTaskDTO:
         dto = schemas.NmTaskDTO(**do.dict())  # type: ignore
@@ -159,6 +159,34 @@ class NM_STATUS(str, enum.Enum):
     COMPLETE = "complete"  # task finished successfully
 
 
+NM_STATUS_RUNNING_L = [
+    NM_STATUS.PREPARING,
+    NM_STATUS.LAUNCHING,
+    NM_STATUS.READY,
+    NM_STATUS.TERMINATING,
+]
+NM_STATUS_FAILED_L = [
+    NM_STATUS.FAILED,
+    NM_STATUS.OOMKILLED,
+]
+NM_STATUS_COMPLETED_L = [
+    NM_STATUS.STOPPED,
+    NM_STATUS.TERMINATED,
+    NM_STATUS.COMPLETE,
+]
+# a task can be (re)started from these statuses
+NM_STATUS_STARTABLE_L = (
+    [NM_STATUS.INIT] + NM_STATUS_FAILED_L + NM_STATUS_COMPLETED_L
+)
+
+
+class TASK_DATASET_ROLE(str, enum.Enum):
+    """How a task uses a dataset"""
+
+    GT = "gt"  # groundtruth dataset
+    NM = "nm"  # name matching dataset, batch task only
+
+
 class POD_STATUS(str, enum.Enum):
     """Name matching K8S Pod status"""
 
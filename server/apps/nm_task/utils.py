@@ -1,9 +1,7 @@
 import datetime
 import os
 import sys
-
-import redis
-import rq
+from typing import List
 
 from server.apps.dataset.utils import (
     str_in_dataset_col_headers,
@@ -12,15 +10,19 @@ from server.apps.dataset.utils import (
 from server.apps.nm_task.crud import NM_TASK_CRUD
 from server.apps.nm_task.schemas import (
     NM_STATUS,
+    NM_STATUS_COMPLETED_L,
+    NM_STATUS_FAILED_L,
+    NM_STATUS_RUNNING_L,
     AbcXyz_TYPE,
     NmTaskCreateDTO,
     NmTaskDO,
     RTQueryRequst,
+    SearchOption,
 )
 from server.apps.user.schemas import UserDO
 from server.apps.user.utils import get_user_premium_type
 from server.core.exception import EXCEPTION_LIB
-from server.settings import API_SETTING, USER_BASE_LIMIT_CONFIG
+from server.settings import USER_BASE_LIMIT_CONFIG
 from server.settings.logger import app_nm_task_logger as logger
 from server.utils.parser import load_yaml
 
@@ -193,33 +195,21 @@ def auth_check(do_task: NmTaskDO, task_id: int, user_id: int) -> None:
 
 
 def is_nm_task_running(nm_status: NM_STATUS) -> bool:
-    if nm_status in [
-        NM_STATUS.PREPARING,
-        NM_STATUS.LAUNCHING,
-        NM_STATUS.READY,
-        NM_STATUS.TERMINATING,
-    ]:
+    if nm_status in NM_STATUS_RUNNING_L:
         return True
 
     return False
 
 
 def is_nm_task_failed(nm_status: NM_STATUS) -> bool:
-    if nm_status in [
-        NM_STATUS.FAILED,
-        NM_STATUS.OOMKILLED,
-    ]:
+    if nm_status in NM_STATUS_FAILED_L:
         return True
 
     return False
 
 
 def is_nm_task_completed(nm_status: NM_STATUS) -> bool:
-    if nm_status in [
-        NM_STATUS.STOPPED,
-        NM_STATUS.TERMINATED,
-        NM_STATUS.COMPLETE,
-    ]:
+    if nm_status in NM_STATUS_COMPLETED_L:
         return True
 
     return False
@@ -236,16 +226,16 @@ def task_start_validate(
     # TODO: change to real calendar monthly quota, when we enable payment later
     last_month = datetime.datetime.utcnow() - datetime.timedelta(days=30)
     logger.info(f"last month [{last_month}]")
-    last_month_run_l = NM_TASK_CRUD.get_records_by_started_at(
+    nr_last_month_run = NM_TASK_CRUD.count_records_by_started_at(
         user.id, oldest_started_at=last_month
     )
 
     monthly_running_api_quota = USER_BASE_LIMIT_CONFIG[
         user_premium_type
     ].compute.max_running_api_call_per_month
-    if len(last_month_run_l) >= monthly_running_api_quota:
+    if nr_last_month_run >= monthly_running_api_quota:
         logger.error(
-            f"TASK_COMPUTE__MONTHLY_RUN_QUOTA_REACH: The user [{user.id}] has used run task API [{len(last_month_run_l)}] times. Monthly quota reached."
+            f"TASK_COMPUTE__MONTHLY_RUN_QUOTA_REACH: The user [{user.id}] has used run task API [{nr_last_month_run}] times. Monthly quota reached."
         )
         raise EXCEPTION_LIB.TASK_COMPUTE__MONTHLY_RUN_QUOTA_REACH.value(
             f"You have already reached monthly task running quota [{monthly_running_api_quota}]. Please contact info@uniframe.io if you want to enlarge monthly quota."
@@ -261,28 +251,23 @@ def task_start_validate(
         )
 
     # TODO: when we add nm task sharing feature (user can run other user shared task)
-    # we need to change `get_all_tasks_by_owner` function to something like `get_all_task_by_viewer`
-    do_task_l = NM_TASK_CRUD.get_all_tasks_by_owner(user.id)
-    nr_running_task = 0
-    running_task_l = []
+    # we need to change `count_tasks_by_owner_status` function to something like `count_tasks_by_viewer_status`
+    nr_running_task = NM_TASK_CRUD.count_tasks_by_owner_status(
+        user.id, NM_STATUS_RUNNING_L
+    )
 
     # different setting for different type of user
     max_running_task_nr = USER_BASE_LIMIT_CONFIG[
         user_premium_type
     ].compute.max_running_task_nr
 
-    for do_task in do_task_l:
-        if is_nm_task_running(do_task.ext_info.nm_status):
-            nr_running_task += 1
-            running_task_l.append(do_task.id)
-
-        if nr_running_task >= max_running_task_nr:
-            logger.error(
-                f"TASK_COMPUTE__MAX_RUNNING_TASK_NR_REACH: The user [{user.id}] has already had [{nr_running_task}] running job. Running job list: [{running_task_l}]"
-            )
-            raise EXCEPTION_LIB.TASK_COMPUTE__MAX_RUNNING_TASK_NR_REACH.value(
-                f"Free user only can run {max_running_task_nr} simultaneous job. You have already had more than {nr_running_task} job running"
-            )
+    if nr_running_task >= max_running_task_nr:
+        logger.error(
+            f"TASK_COMPUTE__MAX_RUNNING_TASK_NR_REACH: The user [{user.id}] has already had [{nr_running_task}] running job."
+        )
+        raise EXCEPTION_LIB.TASK_COMPUTE__MAX_RUNNING_TASK_NR_REACH.value(
+            f"Free user only can run {max_running_task_nr} simultaneous job. You have already had more than {nr_running_task} job running"
+        )
 
     return
 
@@ -292,7 +277,11 @@ def task_stop_validate(do_task: NmTaskDO, task_id: int, user_id: int) -> None:
 
 
 def rt_nm_match_validate(
-    do_task: NmTaskDO, task_id: int, user: UserDO, query_request: RTQueryRequst
+    do_task: NmTaskDO,
+    task_id: int,
+    user: UserDO,
+    query_request: RTQueryRequst,
+    bulk: bool = False,
 ) -> None:
     if do_task.type != AbcXyz_TYPE.NAME_MATCHING_REALTIME:
         logger.error(
@@ -312,39 +301,34 @@ def rt_nm_match_validate(
 
     # validation: max len of the list
     user_premium_type = get_user_premium_type(user)
-    if (
-        len(query_request.query_keys)
-        > USER_BASE_LIMIT_CONFIG[user_premium_type].compute.max_rt_nr_queries
-    ):
+    limit_compute = USER_BASE_LIMIT_CONFIG[user_premium_type].compute
+    max_nr_queries = (
+        limit_compute.max_rt_nr_bulk_queries
+        if bulk
+        else limit_compute.max_rt_nr_queries
+    )
+    if len(query_request.query_keys) > max_nr_queries:
         logger.error(
-            f"NM_RT__EXCEED_MAX_RT_NR_QUERIES_LIMIT: You can query {USER_BASE_LIMIT_CONFIG[user_premium_type].compute.max_rt_nr_queries} words at most in one run! user_id [{user.id}] length query list [{len(query_request.query_keys)}] task_id [{task_id}]"
+            f"NM_RT__EXCEED_MAX_RT_NR_QUERIES_LIMIT: You can query {max_nr_queries} words at most in one run! user_id [{user.id}] length query list [{len(query_request.query_keys)}] task_id [{task_id}] bulk [{bulk}]"
         )
         raise EXCEPTION_LIB.NM_RT__EXCEED_MAX_RT_NR_QUERIES_LIMIT.value(
-            f"You can query {USER_BASE_LIMIT_CONFIG[user_premium_type].compute.max_rt_nr_queries} words at most in one run"
+            f"You can query {max_nr_queries} words at most in one run"
         )
     return
 
 
-def is_rq_worker_available(do_task: NmTaskDO) -> bool:
+def gen_rt_query_params(
+    query_keys: List[str], search_option: SearchOption
+) -> dict:
     """
-    Check if RQ worker avaialable
-    ONLY USED in ECR or docker-compose mode
+    Generate the query parameters of a real-time task pod query
+
+    The search option travels with each query, so that the real-time pod applies it
+    per request instead of reading it back from the task stored in DB
     """
-    is_available = False
-    if do_task.type == AbcXyz_TYPE.NAME_MATCHING_BATCH:
-        job_id = "nm_batch_task"
-    else:
-        job_id = "nm_realtime_task"
-
-    try:
-        redis_conn = redis.Redis(host=API_SETTING.REDIS_DNS, port=6379, db=0)
-        rq_job = rq.job.Job.fetch(job_id, redis_conn)
-    except rq.exceptions.NoSuchJobError:
-        # no job run yet
-        is_available = True
-    else:
-        rq_job_status = rq_job.get_status()
-        if rq_job_status in ["finished", "stopped", "failed"]:
-            is_available = True
-
-    return is_available
+    return {
+        "q": query_keys,
+        "top_n": search_option.top_n,
+        "threshold": search_option.threshold,
+        "selected_cols": search_option.selected_cols,
+    }
@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from sqlalchemy import select
+
+from server.apps.user import models, schemas
+from server.apps.user.crud import USER_CRUD, UserConvert
+from server.libs.db.async_db import AsyncCRUDProxy, async_db, record_to_po
+from server.settings.global_sys_config import GLOBAL_CONFIG
+
+
+class UserAsyncAbsFactory(ABC, UserConvert):
+    @abstractmethod
+    async def get_user(self, user_id: int) -> Optional[schemas.UserDO]:
+        pass
+
+    @classmethod
+    def make_concrete(cls) -> "UserAsyncAbsFactory":
+        """The factory method to load async user factory"""
+
+        USER_ASYNC_FACTORY_DICT = {"pg": PGUserAsyncCRUD}
+
+        return USER_ASYNC_FACTORY_DICT[GLOBAL_CONFIG.api_store]()
+
+
+class PGUserAsyncCRUD(UserAsyncAbsFactory):
+    """Async user factory: PG Database system"""
+
+    async def get_user(self, user_id: int) -> Optional[schemas.UserDO]:
+        query = select([models.User.__table__]).where(models.User.id == user_id)
+        record = await async_db.fetch_one(query)
+        if not record:
+            return None
+
+        return self.user_po_to_do(record_to_po(models.User, record))
+
+
+USER_ASYNC_CRUD = AsyncCRUDProxy(UserAsyncAbsFactory.make_concrete(), USER_CRUD)
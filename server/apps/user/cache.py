@@ -0,0 +1,120 @@
+"""
+UserDO cache for authentication. `get_current_user` runs for every authenticated request,
+so the user is cached by id instead of querying DB each time.
+
+The cache is invalidated by `USER_CRUD.update_user` and `USER_CRUD.delete_user`.
+With the local backend, the other replicas see a change after at most USER_CACHE_TTL seconds.
+Set USER_CACHE_BACKEND=redis to share the cache, so an invalidation is visible to all replicas at once.
+The request principal is resolved on the event loop by `aget` / `aset`, which run the
+blocking redis calls in the threadpool
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import redis
+from starlette.concurrency import run_in_threadpool
+
+from server.apps.user import schemas
+from server.settings import API_SETTING
+from server.utils.ttl_cache import TTLCache
+
+
+class UserCacheAbsFactory(ABC):
+    @abstractmethod
+    def get(self, user_id: int) -> Optional[schemas.UserDO]:
+        pass
+
+    @abstractmethod
+    def set(self, do_user: schemas.UserDO) -> None:
+        pass
+
+    @abstractmethod
+    def invalidate(self, user_id: int) -> None:
+        pass
+
+    async def aget(self, user_id: int) -> Optional[schemas.UserDO]:
+        """
+        `get` for the event loop. The cache must not block the loop
+        """
+        return self.get(user_id)
+
+    async def aset(self, do_user: schemas.UserDO) -> None:
+        """
+        `set` for the event loop. The cache must not block the loop
+        """
+        self.set(do_user)
+
+    @classmethod
+    def make_concrete(cls) -> "UserCacheAbsFactory":
+        """The factory method to load user cache"""
+
+        USER_CACHE_FACTORY_DICT = {
+            "local": LocalUserCache,
+            "redis": RedisUserCache,
+        }
+
+        return USER_CACHE_FACTORY_DICT[API_SETTING.USER_CACHE_BACKEND]()
+
+
+class LocalUserCache(UserCacheAbsFactory):
+    """User cache: bounded in-process TTL cache"""
+
+    def __init__(self) -> None:
+        self.cache = TTLCache(
+            max_size=API_SETTING.USER_CACHE_SIZE, ttl=API_SETTING.USER_CACHE_TTL
+        )
+
+    def get(self, user_id: int) -> Optional[schemas.UserDO]:
+        do_user = self.cache.get(user_id)
+        if do_user is None:
+            return None
+        # return a copy, so the caller can't change the cached one
+        return do_user.copy()
+
+    def set(self, do_user: schemas.UserDO) -> None:
+        self.cache.set(do_user.id, do_user.copy())
+
+    def invalidate(self, user_id: int) -> None:
+        self.cache.delete(user_id)
+
+
+class RedisUserCache(UserCacheAbsFactory):
+    """User cache: redis, shared by all replicas"""
+
+    def __init__(self) -> None:
+        self.redis_conn = redis.Redis(
+            host=API_SETTING.REDIS_DNS,
+            port=6379,
+            password=os.getenv("K8S_REDIS_PASSWORD"),
+        )
+
+    @staticmethod
+    def gen_key(user_id: int) -> str:
+        return f"user-cache:{user_id}"
+
+    def get(self, user_id: int) -> Optional[schemas.UserDO]:
+        user_json = self.redis_conn.get(self.gen_key(user_id))
+        if user_json is None:
+            return None
+        return schemas.UserDO.parse_raw(user_json)
+
+    def set(self, do_user: schemas.UserDO) -> None:
+        self.redis_conn.set(
+            self.gen_key(do_user.id),
+            do_user.json(),
+            ex=API_SETTING.USER_CACHE_TTL,
+        )
+
+    def invalidate(self, user_id: int) -> None:
+        self.redis_conn.delete(self.gen_key(user_id))
+
+    async def aget(self, user_id: int) -> Optional[schemas.UserDO]:
+        return await run_in_threadpool(self.get, user_id)
+
+    async def aset(self, do_user: schemas.UserDO) -> None:
+        await run_in_threadpool(self.set, do_user)
+
+
+USER_CACHE = UserCacheAbsFactory.make_concrete()
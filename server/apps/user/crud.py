@@ -5,6 +5,7 @@ from typing import List, Optional
 from sqlalchemy import true
 
 from server.apps.user import models, schemas
+from server.apps.user.cache import USER_CACHE
 from server.core.exception import EXCEPTION_LIB
 from server.libs.db.sqlalchemy import db
 from server.settings.global_sys_config import GLOBAL_CONFIG
@@ -137,6 +138,7 @@ class PGUserCRUD(UserAbsFactory):
             user_update.dict(exclude_none=True)
         )
         db.session.commit()
+        USER_CACHE.invalidate(user_id)
 
         do_user = self.get_user(user_id)
         if do_user is None:
@@ -151,6 +153,7 @@ class PGUserCRUD(UserAbsFactory):
             .delete()
         )
         db.session.commit()
+        USER_CACHE.invalidate(user_id)
 
         return None
 
@@ -24,9 +24,8 @@ app.add_middleware(
     DBSessionMiddleware, custom_engine=engine, session_args=session_args
 )
 
-if __name__ == "__main__":
-    task_id = int(sys.argv[1])
-    user_id = int(sys.argv[2])
+
+def run_batch_task(task_id: int, user_id: int) -> None:
     logger.info(
         f"[Batch nm proc] received task_id [{task_id}] and user_id [{user_id}]"
     )
@@ -45,5 +44,14 @@ if __name__ == "__main__":
 
         # setup up nm task status to terminating
         # the main process will setup status as terminated
-        change_task_status(task_id, NM_STATUS.TERMINATING, "Batch nm proc")
+        change_task_status(
+            task_id,
+            NM_STATUS.TERMINATING,
+            "Batch nm proc",
+            from_statuses=[NM_STATUS.LAUNCHING],
+        )
         logger.info("[Batch nm proc]: nm task status switch to TERMINATING")
+
+
+if __name__ == "__main__":
+    run_batch_task(int(sys.argv[1]), int(sys.argv[2]))
@@ -1,17 +1,29 @@
 import os
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
 
 import boto3
 import redis
+from kubernetes.client import models as k8s
+from kubernetes.client.rest import ApiException
 
 from server.api.main import app  # noqa: F401
 from server.apps.nm_task.crud import NM_TASK_CRUD
-from server.apps.nm_task.schemas import NM_STATUS, POD_STATUS
+from server.apps.nm_task.schemas import (
+    NM_STATUS,
+    NM_STATUS_RUNNING_L,
+    POD_STATUS,
+)
 from server.compute.utils import change_task_status
 from server.kubernetes import kube_client
+from server.kubernetes.pod_watch import KubePodWatchSource, PodWatchSource
 from server.libs.db.sqlalchemy import db
 from server.settings import API_SETTING
+from server.settings.dynamic_setting import (
+    DYNAMIC_SETTING_SSM_PARAMETERS,
+    publish_dynamic_settings,
+)
 from server.settings.global_sys_config import GLOBAL_CONFIG
 from server.settings.logger import init_logging
 from server.utils.aws_helper import id_gen
@@ -27,13 +39,17 @@ if os.getenv("API_RUN_LOCATION") in ["k8s"]:
     ssm_client = boto3.client("ssm", region_name=GLOBAL_CONFIG.region.value)
 
 
-def housekeeping() -> None:
+# a watch round ends by the server after the timeout, then the dynamic settings
+# are refreshed and the watch resumes from the last resourceVersion
+WATCH_TIMEOUT_SECONDS = 10
+# pod terminations are written to DB in one batch, OOMKilled ones at once
+BATCH_WINDOW_SECONDS = 1.0
+RETRY_INTERVAL_SECONDS = 5
+
+
+def get_pod_termination(pod: k8s.V1Pod) -> Optional[POD_STATUS]:
     """
-    This housekeeping process will do the following every 5 seconds
-    1. Get the real pod status of the running nm tasks in task run history table
-    2. if the pod state is terminated by OOMKilled
-            - change the task running history table status
-            - change the task table status
+    The final status of a task pod, None if it's not terminated
 
     - for running container
         {'running': {'started_at': datetime.datetime(2021, 10, 14, 13, 36, 58, tzinfo=tzlocal())},
@@ -62,75 +78,207 @@ def housekeeping() -> None:
                         'started_at': datetime.datetime(2021, 10, 14, 13, 45, 12, tzinfo=tzlocal())},
         'waiting': None}
     """
-    # This housekeeping task is only for k8s
-    ks_client = kube_client.get_kube_client(in_cluster=True)
+    # N.B. when pod is still starting, for example, during auto scaling.
+    # pod is in pending status, and there is no container status
+    if pod.status is None or not pod.status.container_statuses:
+        return None
 
-    while True:
-        time.sleep(10)
+    terminated = pod.status.container_statuses[0].state.terminated
+    if not terminated:
+        return None
+    if terminated.reason == "OOMKilled":
+        return POD_STATUS.OOMKILLED
+    return POD_STATUS.COMPLETED
 
-        if os.getenv("API_RUN_LOCATION") in ["k8s"]:
-            # update DEMO_ACCOUNT_LIMITATION
-            ssm_parameter_name = id_gen("ssm-demo-account-limitation")
-            demo_account_limitation = ssm_client.get_parameter(
-                Name=ssm_parameter_name
-            )["Parameter"]["Value"]
-            redis_conn.mset(
-                {"DEMO_ACCOUNT_LIMITATION": demo_account_limitation}
-            )
 
-            ssm_parameter_name = id_gen("rapidapi-sanction-task-id")
-            rapidapi_sanction_task_id = ssm_client.get_parameter(
-                Name=ssm_parameter_name
-            )["Parameter"]["Value"]
-            redis_conn.mset(
-                {"RAPIDAPI_SANCTION_TASK_ID": rapidapi_sanction_task_id}
+class PodTerminationBatch(object):
+    """The pod terminations seen by the watcher, not yet written to DB"""
+
+    def __init__(self) -> None:
+        self.pod_statuses: Dict[str, POD_STATUS] = {}
+        self.first_added_at = 0.0
+
+    def add(self, pod_name: str, pod_status: POD_STATUS) -> None:
+        if not self.pod_statuses:
+            self.first_added_at = time.monotonic()
+        self.pod_statuses[pod_name] = pod_status
+
+    def is_due(self) -> bool:
+        if not self.pod_statuses:
+            return False
+        return (
+            POD_STATUS.OOMKILLED in self.pod_statuses.values()
+            or time.monotonic() - self.first_added_at >= BATCH_WINDOW_SECONDS
+        )
+
+    def flush(self) -> None:
+        """
+        Change the running records of the terminated pods, and the tasks of the
+        OOMKilled pods
+        """
+        if not self.pod_statuses:
+            return
+
+        with db():
+            # TODO: change finished at to pod terminated time
+            run_records = NM_TASK_CRUD.finish_running_task_run_records(
+                self.pod_statuses, finished_at=datetime.utcnow()
             )
+            for run_record in run_records:
+                logger.info(
+                    f"change task run history id [{run_record.id}] user_id [{run_record.owner_id}] task_id [{run_record.task_id}] pod_name [{run_record.pod_name}] to {run_record.pod_status}"
+                )
+                if run_record.pod_status == POD_STATUS.OOMKILLED:
+                    change_task_status(
+                        run_record.task_id,
+                        NM_STATUS.OOMKILLED,
+                        "housekeeper",
+                        finished_at=datetime.utcnow(),
+                        from_statuses=NM_STATUS_RUNNING_L,
+                    )
+
+        self.pod_statuses = {}
+
+
+class TaskPodWatcher(object):
+    """
+    Follow the task pods by list + watch, and finish the running records of the
+    terminated pods
+
+    - relist: reconcile all the running records with the listed pods, then watch
+      from the resourceVersion of the list
+    - watch: handle the pod changes as events, and resume from the resourceVersion
+      of the last event. Relist if it's too old (410 Gone)
+    - before each watch round, fail the tasks in PREPARING for longer than
+      K8S_PREPARING_TIMEOUT without a run record, whose launch was lost
+    """
+
+    def __init__(self, source: PodWatchSource) -> None:
+        self.source = source
+        self.batch = PodTerminationBatch()
+        self.resource_version: Optional[str] = None
+
+    def relist(self) -> None:
+        pods, self.resource_version = self.source.list_pods()
+        listed_pods = {p.metadata.name: p for p in pods}
 
         with db():
             running_task_l = NM_TASK_CRUD.get_all_running_task_pod()
 
-            for running_task in running_task_l:
-                # TODO: need a super user as task manager which can delete any tasks
-                # TODO: get namespace from global configuration
-                try:
-                    pod_obj = ks_client.read_namespaced_pod(
-                        name=running_task.pod_name, namespace="nm"
-                    )
-                except Exception as e:  # noqa
-                    logger.info(
-                        f"Pod [{running_task.pod_name}] not found! Please check the status of this pod. It is in db but not in EKS. Change status to COMPLETE",
-                    )
-                    NM_TASK_CRUD.update_task_run_record_by_id(
-                        running_task.id,
-                        POD_STATUS.COMPLETED,
-                        finished_at=datetime.utcnow(),
-                    )
-                    continue
-
-                # N.B. when pod is still starting, for example, during auto scaling.
-                # pod is in pending status, and there is no container status
-                if pod_obj.status.container_statuses is None:
-                    continue
-
-                nm_container_state = pod_obj.status.container_statuses[0].state
-                if nm_container_state.terminated:
-                    if nm_container_state.terminated.reason == "OOMKilled":
-                        NM_TASK_CRUD.update_task_run_record_by_id(
-                            running_task.id,
-                            POD_STATUS.OOMKILLED,
-                            finished_at=datetime.utcnow(),
-                        )
-                        logger.info(
-                            f"change task run history id [{running_task.id}] user_id [{running_task.owner_id}] task_id [{running_task.task_id}] pod_name [{running_task.pod_name}] to OOMKilled"
-                        )
-
-                        # TODO: change finished at to pod terminated time
-                        change_task_status(
-                            running_task.task_id,
-                            NM_STATUS.OOMKILLED,
-                            "housekeeper",
-                            finished_at=datetime.utcnow(),
-                        )
+        for running_task in running_task_l:
+            pod = listed_pods.get(running_task.pod_name)
+            if pod is None:
+                # a pod launched before the task pods are labeled isn't listed
+                pod = self.source.read_pod(running_task.pod_name)
+            if pod is None:
+                logger.info(
+                    f"Pod [{running_task.pod_name}] not found! Please check the status of this pod. It is in db but not in EKS. Change status to COMPLETE",
+                )
+                self.batch.add(running_task.pod_name, POD_STATUS.COMPLETED)
+                continue
+
+            pod_status = get_pod_termination(pod)
+            if pod_status:
+                self.batch.add(running_task.pod_name, pod_status)
+
+        self.batch.flush()
+
+    def fail_stale_preparing_tasks(self) -> None:
+        now = datetime.utcnow()
+        with db():
+            task_ids = NM_TASK_CRUD.fail_stale_preparing_tasks(
+                prepared_before=now
+                - timedelta(seconds=API_SETTING.K8S_PREPARING_TIMEOUT),
+                finished_at=now,
+            )
+        for task_id in task_ids:
+            logger.info(
+                f"task [{task_id}] is not launched in {API_SETTING.K8S_PREPARING_TIMEOUT} seconds. Change status to FAILED"
+            )
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        pod = event["object"]
+        self.resource_version = pod.metadata.resource_version
+
+        pod_status = get_pod_termination(pod)
+        if event["type"] == "DELETED" and pod_status is None:
+            pod_status = POD_STATUS.COMPLETED
+        if pod_status:
+            self.batch.add(pod.metadata.name, pod_status)
+
+        if self.batch.is_due():
+            self.batch.flush()
+
+    def watch(self) -> None:
+        """
+        One watch round, relist first if there is no resourceVersion to resume from
+        """
+        if self.resource_version is None:
+            self.relist()
+        self.fail_stale_preparing_tasks()
+
+        try:
+            for event in self.source.watch_pods(
+                self.resource_version, WATCH_TIMEOUT_SECONDS  # type: ignore
+            ):
+                self.handle_event(event)
+        except ApiException as e:
+            if e.status != 410:
+                raise
+            logger.info(
+                f"resourceVersion [{self.resource_version}] is too old, relist the task pods"
+            )
+            self.resource_version = None
+        finally:
+            self.batch.flush()
+
+
+def refresh_dynamic_settings() -> None:
+    """
+    Read the SSM parameters of the dynamic settings by one call, and publish the
+    changed ones to the backends
+    """
+    parameter_names = {
+        id_gen(ssm_name): name
+        for name, ssm_name in DYNAMIC_SETTING_SSM_PARAMETERS.items()
+    }
+    parameters = ssm_client.get_parameters(Names=list(parameter_names))[
+        "Parameters"
+    ]
+    changes = publish_dynamic_settings(
+        redis_conn, {parameter_names[p["Name"]]: p["Value"] for p in parameters}
+    )
+    if changes:
+        logger.info(f"publish dynamic settings {changes}")
+
+
+def housekeeping() -> None:
+    """
+    This housekeeping process will do the following
+    1. Publish the changed SSM parameters of the dynamic settings, between the
+       watch rounds
+    2. Watch the task pods, if a pod of a running record in task run history table
+       is terminated
+            - change the task running history table status
+            - if terminated by OOMKilled, change the task table status
+    3. Fail the tasks stuck in PREPARING, whose launch was lost with the API pod
+    """
+    # This housekeeping task is only for k8s
+    ks_client = kube_client.get_kube_client(in_cluster=True)
+    # TODO: need a super user as task manager which can delete any tasks
+    # TODO: get namespace from global configuration
+    watcher = TaskPodWatcher(KubePodWatchSource(ks_client))
+
+    while True:
+        if os.getenv("API_RUN_LOCATION") in ["k8s"]:
+            refresh_dynamic_settings()
+
+        try:
+            watcher.watch()
+        except Exception:  # noqa
+            logger.exception("watch task pods failed, relist later")
+            watcher.resource_version = None
+            time.sleep(RETRY_INTERVAL_SECONDS)
 
 
 # N.B.: main function is used by K8S
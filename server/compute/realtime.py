@@ -1,14 +1,21 @@
 """
 This file contains real-time name matching main class and query API endpoint
 """
+import json
 import os
 import sys
-from typing import List
+from typing import Iterator, List, Optional
 
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Header, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
-from server.apps.nm_task.schemas import NM_STATUS, RTQueryResp
+from server.apps.nm_task.schemas import (
+    NM_STATUS,
+    RTQueryRequst,
+    RTQueryResp,
+    SearchOption,
+)
 from server.compute.utils import change_task_status
 from server.libs.db.sqlalchemy import (
     DBSessionMiddleware,
@@ -19,6 +26,7 @@ from server.libs.db.sqlalchemy import (
 from server.nm_algo.pipeline import NameMatchingRealtime
 from server.settings import API_SETTING
 from server.settings.logger import compute_logger as logger
+from server.utils import wire_format
 
 # def refactor_match_result(
 #     raw_result: Optional[List],
@@ -68,34 +76,118 @@ def heartbeat() -> str:
     return "healthy"
 
 
+def gen_search_option(
+    top_n: Optional[int],
+    threshold: Optional[float],
+    selected_cols: Optional[List[str]],
+) -> SearchOption:
+    """
+    The search option of a query: each field set by the query overrides the one of
+    the task default
+    """
+    overrides = {
+        "top_n": top_n,
+        "threshold": threshold,
+        "selected_cols": selected_cols,
+    }
+    return SearchOption(
+        **{
+            **nm_rt_task.nm_cfg.search_option.dict(),
+            **{k: v for k, v in overrides.items() if v is not None},
+        }
+    )
+
+
 @app.get(
     f"{API_SETTING.API_V1_STR}/nm-realtime",
     summary="Name matching real-time query",
     response_model=RTQueryResp,
     response_description="The matching result of the query string(s)",
 )
-def nm_rt(q: List[str] = Query([])) -> RTQueryResp:
+def nm_rt(
+    q: List[str] = Query([]),
+    top_n: Optional[int] = None,
+    threshold: Optional[float] = None,
+    selected_cols: Optional[List[str]] = Query(None),
+    accept: Optional[str] = Header(None),
+) -> Response:
     """Real-time query
 
     - **q**: list of query string, defaults to Query([]), _type q: List[str], optional_
+    - **top_n**: search option top_n of this query. If not set, use the task default
+    - **threshold**: search option threshold of this query. If not set, use the task default
+    - **selected_cols**: search option selected_cols of this query. If not set, use the task default
+
+    The response is JSON by default. Set `Accept: application/x-msgpack` to get it in msgpack
     """
+    search_option = gen_search_option(top_n, threshold, selected_cols)
+
     if q:
-        nm_result = nm_rt_task.execute(q)
+        nm_result = nm_rt_task.execute(q, search_option)
         # query_result = [
         #     RTQueryResp(query_key=keyword, match_list=refactor_match_result(r))
         #     for keyword, r in zip(q, nm_result)
         # ]
         query_result = nm_result.values.tolist()
+        columns = nm_result.columns.tolist()
     else:
         query_result = []
-
-    resp = RTQueryResp(
-        query_result=query_result,
-        columns=nm_result.columns.tolist(),
-        search_option=nm_rt_task.nm_cfg.search_option,
+        columns = []
+
+    # the content is already plain python types, so skip the response model
+    # validation and serialize it directly in the negotiated media type
+    media_type = wire_format.negotiate_media_type(accept)
+    content = {
+        "query_result": query_result,
+        "columns": columns,
+        "search_option": search_option.dict(),
+    }
+
+    return Response(
+        content=wire_format.encode(content, media_type), media_type=media_type
     )
 
-    return resp
+
+def gen_bulk_result_lines(
+    query_keys: List[str], search_option: SearchOption, chunk_size: int
+) -> Iterator[bytes]:
+    """
+    Match the query keys chunk by chunk, and yield each chunk result as a NDJSON line
+
+    Each line is a serialized `RTQueryResp` of the chunk
+    """
+    for start in range(0, len(query_keys), chunk_size):
+        nm_result = nm_rt_task.execute(
+            query_keys[start : start + chunk_size], search_option
+        )
+        content = {
+            "query_result": nm_result.values.tolist(),
+            "columns": nm_result.columns.tolist(),
+            "search_option": search_option.dict(),
+        }
+        yield json.dumps(content, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+@app.post(
+    f"{API_SETTING.API_V1_STR}/nm-realtime/bulk",
+    summary="Name matching real-time bulk query",
+    response_description="The matching result of the query strings, one NDJSON line per chunk",
+)
+def nm_rt_bulk(query_request: RTQueryRequst) -> StreamingResponse:
+    """Real-time bulk query
+
+    The query keys are in the request body, so the number of keys is not limited by the URL length.
+    They are matched in chunks of `REALTIME_NM_BULK_CHUNK_SIZE`, and the result of each chunk
+    is streamed back as one NDJSON line as soon as it is ready
+    """
+    return StreamingResponse(
+        gen_bulk_result_lines(
+            query_request.query_keys,
+            query_request.search_option,
+            API_SETTING.REALTIME_NM_BULK_CHUNK_SIZE,
+        ),
+        media_type=wire_format.NDJSON_MEDIA_TYPE,
+    )
 
 
 task_id = os.getenv("NM_TASK_ID")
@@ -116,5 +208,10 @@ with db():
 
     nm_rt_task = NameMatchingRealtime(task_id, user_id)  # type: ignore
 
-    change_task_status(task_id, NM_STATUS.READY, "Realtime nm proc")  # type: ignore
+    change_task_status(
+        task_id,  # type: ignore
+        NM_STATUS.READY,
+        "Realtime nm proc",
+        from_statuses=[NM_STATUS.LAUNCHING],
+    )
     logger.info("[Realtime nm proc]: nm task status switch to READY")
@@ -1,10 +1,13 @@
 import datetime
+import enum
 import os
+import queue
 import signal
 import subprocess
 import sys
+import threading
 import time
-from typing import List, Tuple
+from typing import Any, List, Optional, Tuple, Union
 
 import psutil
 import redis
@@ -13,8 +16,20 @@ from fastapi import FastAPI
 from pydantic.datetime_parse import parse_duration
 
 from server.apps.nm_task.crud import NM_TASK_CRUD, NmTaskCrudAbsFactory
-from server.apps.nm_task.schemas import NM_STATUS, POD_STATUS
+from server.apps.nm_task.schemas import (
+    NM_STATUS,
+    NM_STATUS_RUNNING_L,
+    POD_STATUS,
+    AbcXyz_TYPE,
+    NmTaskDO,
+)
 from server.compute.utils import change_task_status, gen_pubsub_channel_name
+from server.compute.worker_pool import gen_task_stop_key, get_worker_pool
+from server.compute.zygote import (
+    ForkedTaskProcess,
+    launch_task_process,
+    preload_task_modules,
+)
 from server.core.exception import EXCEPTION_LIB
 from server.kubernetes.k8s_command import K8SCommand
 from server.libs.db.sqlalchemy import (
@@ -42,11 +57,13 @@ if os.getenv("API_RUN_LOCATION") in ["k8s", "minikube"]:
         port=6379,
         password=os.getenv("K8S_REDIS_PASSWORD"),
     )
-    p = redis_conn.pubsub()
 else:
     worker_location = "RQ-Worker"
     IN_K8S = False
 
+# a blocked read of the stop channel wakes up to check if the supervision is done
+STOP_LISTEN_TIMEOUT_SECONDS = 1.0
+
 
 def terminate_nm_task(pid: int) -> None:
     if not psutil.pid_exists(pid):
@@ -97,6 +114,7 @@ def action_stop_worker_by_command(pid: int, task_id: int) -> None:
         NM_STATUS.STOPPED,
         f"{worker_location} proc",
         finished_at=datetime.datetime.utcnow(),
+        from_statuses=NM_STATUS_RUNNING_L,
     )
     logger.info(
         f"[{worker_location}] change nm task {task_id} status to STOPPED"
@@ -116,6 +134,7 @@ def action_stop_worker_by_ttl(pid: int, task_id: int) -> None:
         NM_STATUS.TERMINATED,
         f"{worker_location} proc",
         finished_at=datetime.datetime.utcnow(),
+        from_statuses=NM_STATUS_RUNNING_L,
     )
     logger.info(
         f"[{worker_location}] change nm task {task_id} status to TERMINATED"
@@ -134,6 +153,7 @@ def action_task_succeed(pid: int, task_id: int) -> None:
         NM_STATUS.COMPLETE,
         f"{worker_location} proc",
         finished_at=datetime.datetime.utcnow(),
+        from_statuses=NM_STATUS_RUNNING_L,
     )
     logger.info(
         f"[{worker_location}] change nm task {task_id} status to TERMINATED"
@@ -154,12 +174,140 @@ def action_task_failed(
         final_status,
         f"{worker_location} proc",
         finished_at=datetime.datetime.utcnow(),
+        from_statuses=NM_STATUS_RUNNING_L,
     )
     logger.info(
         f"[{worker_location}] change nm task {task_id} status to FAILED"
     )
 
 
+class TASK_EVENT(str, enum.Enum):
+    """What ends the supervision of a nm subprocess"""
+
+    EXIT = "exit"
+    STOP = "stop"
+    TTL_EXPIRED = "ttl-expired"
+
+
+def gen_ttl_deadline(task_do: NmTaskDO) -> Optional[float]:
+    """
+    The `time.monotonic()` when the task TTL expires, None if TTL is not enabled
+    """
+    if not task_do.ext_info.running_parameter.TTL_enable:
+        return None
+
+    ttl = parse_duration(task_do.ext_info.running_parameter.TTL)
+    return time.monotonic() + ttl.total_seconds()
+
+
+class TaskSupervisor:
+    """
+    Wait for the first event of a running nm subprocess, without polling
+
+    - EXIT: the subprocess exits. A thread is blocked in `waitpid`
+    - STOP: a stop message on the pubsub channel of the task. A thread is blocked
+      in reading the subscribed redis connection. Without a pubsub, the owner of
+      the supervisor puts the STOP event into `events`
+    - TTL_EXPIRED: nothing happens before the TTL deadline. The main thread waits
+      for the events until the deadline
+    """
+
+    def __init__(
+        self,
+        task_proc: Union[subprocess.Popen, ForkedTaskProcess],
+        stop_pubsub: Optional[Any],
+        ttl_deadline: Optional[float],
+    ) -> None:
+        self.task_proc = task_proc
+        self.stop_pubsub = stop_pubsub
+        self.ttl_deadline = ttl_deadline
+        self.events: queue.Queue = queue.Queue()
+        self._done = threading.Event()
+        self._threads = [threading.Thread(target=self._wait_exit, daemon=True)]
+        if stop_pubsub is not None:
+            self._threads.append(
+                threading.Thread(
+                    target=self._listen_stop, args=(stop_pubsub,), daemon=True
+                )
+            )
+
+    def _wait_exit(self) -> None:
+        self.events.put((TASK_EVENT.EXIT, self.task_proc.wait()))
+
+    def _listen_stop(self, stop_pubsub: Any) -> None:
+        while not self._done.is_set():
+            # the first message is the subscription, only a "message" means stop
+            message = stop_pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=STOP_LISTEN_TIMEOUT_SECONDS,
+            )
+            if message is not None and message["type"] == "message":
+                self.events.put((TASK_EVENT.STOP, None))
+                return
+
+    def wait(self) -> Tuple[TASK_EVENT, Optional[int]]:
+        """
+        Return the first event, and the return code of the subprocess if it exits
+        """
+        for thread in self._threads:
+            thread.start()
+
+        timeout = None
+        if self.ttl_deadline is not None:
+            timeout = max(self.ttl_deadline - time.monotonic(), 0)
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return TASK_EVENT.TTL_EXPIRED, None
+
+    def close(self) -> None:
+        """
+        Stop listening, the waiter thread ends with the subprocess
+        """
+        self._done.set()
+        if self.stop_pubsub is not None:
+            self._threads[1].join(timeout=STOP_LISTEN_TIMEOUT_SECONDS * 2)
+            self.stop_pubsub.close()
+
+
+def handle_task_event(
+    task_event: TASK_EVENT, task_status: Optional[int], pid: int, task_id: int
+) -> None:
+    """
+    Stop the nm subprocess if needed, and write the final task status
+    """
+    # receive termination signal from user via backend
+    if task_event == TASK_EVENT.STOP:
+        action_stop_worker_by_command(pid=pid, task_id=task_id)
+
+    elif task_event == TASK_EVENT.TTL_EXPIRED:
+        logger.info(f"[{worker_location}] task [{task_id}] TTL expired")
+        action_stop_worker_by_ttl(pid=pid, task_id=task_id)
+
+    else:
+        logger.info(
+            f"[{worker_location}] subprocess finished. handle the return code: {task_status}"
+        )
+
+        # Reason we first write task status to DB:
+        # when we have out-of-memory (OOM) error, the pod maybe even killed by K8S instead of complete by the logic here
+        # We try our best to write the status back to db first
+
+        # task finish successfully
+        if task_status == 0:
+            action_task_succeed(pid=pid, task_id=task_id)
+        # task exit execution with failure message
+        elif task_status == -9:
+            # when return code -s -9, it is memory error
+            action_task_failed(
+                pid=pid,
+                task_id=task_id,
+                final_status=NM_STATUS.OOMKILLED,
+            )
+        else:
+            action_task_failed(pid=pid, task_id=task_id)
+
+
 def run_task_in_subprocess(
     input_para: Tuple[int, int, NmTaskCrudAbsFactory, List]
 ) -> None:
@@ -169,7 +317,18 @@ def run_task_in_subprocess(
     In ECS and docker-compose mode, this function is triggered by RQ
     In K8S and minikube mode, this function is trigger by main function
     """
+    try:
+        supervise_task_subprocess(input_para)
+    finally:
+        if not IN_K8S:
+            # the slot of the task in the worker pool is free for the next task
+            rq_job: rq.job.Job = rq.get_current_job()
+            get_worker_pool(rq_job.origin).release_task(input_para[0])
+
 
+def supervise_task_subprocess(
+    input_para: Tuple[int, int, NmTaskCrudAbsFactory, List]
+) -> None:
     logger.info(f"[{worker_location}] start!!!")
 
     # only in ECS or docker compose mode, RQ is used
@@ -193,6 +352,7 @@ def run_task_in_subprocess(
                 task_id,
                 NM_STATUS.LAUNCHING,
                 f"{worker_location} proc",
+                from_statuses=[NM_STATUS.PREPARING],
             )
 
             logger.info(f"[{worker_location}] kick off an nm subprocess")
@@ -202,13 +362,8 @@ def run_task_in_subprocess(
             my_env["NM_TASK_ID"] = str(task_id)
             my_env["USER_ID"] = str(user_id)
 
-            task_proc = subprocess.Popen(
-                command,
-                stderr=subprocess.STDOUT,
-                close_fds=True,
-                env=my_env,
-            )
-        except subprocess.CalledProcessError:
+            task_proc = launch_task_process(command, my_env)
+        except (subprocess.CalledProcessError, OSError):
             logger.error(
                 f"f[{worker_location}] EXECUTOR__TASK_SUBPROCESSOR_STAR_ERR: subprocess.Popen error:\ntask_do [{task_do}]\ncommand [{command}]"
             )
@@ -218,11 +373,14 @@ def run_task_in_subprocess(
 
         process_id = task_proc.pid
         logger.info(f"[{worker_location}] pid [{process_id}]")
+        ttl_deadline = gen_ttl_deadline(task_do)
 
-        if IN_K8S:
-            # K8S uses redis pubsub to receive stop message
-            p.subscribe(gen_pubsub_channel_name(task_id, user_id))
+        # the stop message is published to the channel of the task by backend
+        stop_pubsub = (redis_conn if IN_K8S else rq_job.connection).pubsub()
+        stop_pubsub.subscribe(gen_pubsub_channel_name(task_id, user_id))
+        supervisor = TaskSupervisor(task_proc, stop_pubsub, ttl_deadline)
 
+        if IN_K8S:
             # get the pod name of this worker on K8S
             app_name = gen_k8s_resource_prefix(task_id=task_id, user_id=user_id)
 
@@ -235,113 +393,29 @@ def run_task_in_subprocess(
                 raise EXCEPTION_LIB.EXECUTOR__POD_NAME_NOT_AVAILABLE.value(
                     "backend doesn't set pod name. Please contact administrator"
                 )
+        elif rq_job.connection.get(gen_task_stop_key(task_id)) == b"1":
+            # the stop command came before the subscription
+            supervisor.events.put((TASK_EVENT.STOP, None))
 
-        while True:
-            # receive termination signal from user via backend
-            if IN_K8S:
-                # in K8S (EKS, minikube), pod is delete by backend
-
-                termination_flag = p.get_message()
-                if termination_flag:
-                    # first message is subscription succeed
-                    # {'pattern': None, 'type': 'subscribe', 'channel': 'codehole', 'data': 1L}
-                    # only when type is message means a valid message
-                    if termination_flag["type"] == "message":
-                        # N.B. kubernete service attached to this pod should be deleted by backend
-                        k8s_command.delete_nm_task_service(app_name)
-                        action_stop_worker_by_command(
-                            pid=task_proc.pid, task_id=task_id
-                        )
-                        change_task_run_table_record(
-                            user_id, task_id, pod_name, POD_STATUS.COMPLETED  # type: ignore
-                        )
-                        break
-            else:
-                # only in ECS or docker compose mode, rq is used for receiving task stop message
-                termination_flag = rq_job.connection.get(
-                    rq_job.key + b":should_stop"
-                )
+        try:
+            task_event, task_status = supervisor.wait()
+        finally:
+            supervisor.close()
 
-                # logger.info(f"[{worker_location}] termination_flag is [{termination_flag}]")
-                if termination_flag == b"1":
-                    action_stop_worker_by_command(
-                        pid=task_proc.pid, task_id=task_id
-                    )
-
-                    # set up the termination flag back to 0!!!
-                    rq_job.connection.set(rq_job.key + b":should_stop", 0)
-                    logger.info(
-                        "[{worker_location}] Reset stop signal back to 0"
-                    )
-                    break
-
-            # if worker is not stopped by TTL or user stop action, check task status
-            task_status = task_proc.poll()
-
-            # when task is still running
-            if task_status is None:
-                # if TTL expired enable
-                if task_do.ext_info.running_parameter.TTL_enable:
-                    execution_ttl_timedelta = parse_duration(
-                        task_do.ext_info.running_parameter.TTL
-                    )
-                    ttl = int(execution_ttl_timedelta.total_seconds())
-                    current_epoc = time.time()
-                    ps = psutil.Process(task_proc.pid)
-                    os_create_time_utc = ps.create_time()
-
-                    # and TTL expired
-                    if current_epoc >= os_create_time_utc + ttl:
-                        logger.info(
-                            f"[{worker_location}] task TTL: curr_epoc [{current_epoc}] ttl [{ttl}]  os_create_time_utc [{os_create_time_utc}] "
-                        )
-
-                        if IN_K8S:
-                            # delete kubernete service attached to this pod
-                            k8s_command.delete_nm_task_service(app_name)
-                            change_task_run_table_record(
-                                user_id, task_id, pod_name, POD_STATUS.COMPLETED  # type: ignore
-                            )
-
-                        action_stop_worker_by_ttl(
-                            pid=task_proc.pid, task_id=task_id
-                        )
-                        break
-            else:
-                logger.info(
-                    f"[{worker_location}] subprocess finished. handle the return code: {task_status}"
-                )
+        handle_task_event(task_event, task_status, task_proc.pid, task_id)
 
-                # Reason we first write task status to DB:
-                # when we have out-of-memory (OOM) error, the pod maybe even killed by K8S instead of complete by the logic here
-                # We try our best to write the status back to db first
-
-                # task finish successfully
-                if task_status == 0:
-                    action_task_succeed(pid=task_proc.pid, task_id=task_id)
-                # task exit execution with failure message
-                elif task_status == -9:
-                    # when return code -s -9, it is memory error
-                    action_task_failed(
-                        pid=task_proc.pid,
-                        task_id=task_id,
-                        final_status=NM_STATUS.OOMKILLED,
-                    )
-                else:
-                    action_task_failed(pid=task_proc.pid, task_id=task_id)
-
-                if IN_K8S:
-                    # when nm task finished or failed, we also delete the attached K8S services
-                    # since this pod will be deleted soon
-                    k8s_command.delete_nm_task_service(app_name)
-                    change_task_run_table_record(
-                        user_id, task_id, pod_name, POD_STATUS.COMPLETED  # type: ignore
-                    )
-
-                break
-
-            # TODO: Do we want to implement an exponential back-off?
-            time.sleep(0.05)
+        if IN_K8S:
+            # when nm realtime task ends, we also delete the attached K8S service
+            # since this pod will be deleted soon. A batch task has no service
+            if task_do.type == AbcXyz_TYPE.NAME_MATCHING_REALTIME:
+                k8s_command.delete_nm_task_service(app_name)
+            change_task_run_table_record(
+                user_id, task_id, pod_name, POD_STATUS.COMPLETED  # type: ignore
+            )
+        elif task_event == TASK_EVENT.STOP:
+            # clear the stop flag, not to stop the next run of the task
+            rq_job.connection.delete(gen_task_stop_key(task_id))
+            logger.info(f"[{worker_location}] Clear stop signal")
 
 
 # N.B.: main function is used by K8S
@@ -353,4 +427,6 @@ if __name__ == "__main__":
         f"[{worker_location}] trigger pod: task_id [{task_id}] user_id [{user_id}] command[{command}]"
     )
 
+    if API_SETTING.TASK_FORK_ENABLED:
+        preload_task_modules()
     run_task_in_subprocess((task_id, user_id, NM_TASK_CRUD, command))
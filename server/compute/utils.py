@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 import redis
 import rq
@@ -18,11 +18,26 @@ def change_task_status(
     log_info: str,
     started_at: Optional[datetime] = None,
     finished_at: Optional[datetime] = None,
-) -> None:
+    from_statuses: Optional[List[NM_STATUS]] = None,
+) -> bool:
+    """
+    Change the task status in place. With `from_statuses`, the status is changed only
+    if the current one is in the list, and it returns False otherwise
+    """
     logger.info(
         f"Attempting [{log_info}] {task_id} change status to [{task_status}]"
     )
 
+    if NM_TASK_CRUD.update_task_status(
+        task_id,
+        task_status,
+        from_statuses=from_statuses,
+        started_at=started_at,
+        finished_at=finished_at,
+    ):
+        logger.info(f"[{log_info}] {task_id} changed status to [{task_status}]")
+        return True
+
     task_do = NM_TASK_CRUD.get_task(task_id)
     if task_do is None:
         logger.error(
@@ -32,22 +47,10 @@ def change_task_status(
             f"Input task id {task_id} does not exist!"
         )
 
-    task_do.ext_info.nm_status = task_status
-    task_do.updated_at = datetime.utcnow()
-
-    if started_at:
-        task_do.started_at = started_at
-
-    if finished_at:
-        task_do.finished_at = finished_at
-    else:
-        # N.B. if finished is None, it means a new running round, and task just start and not finished yet.
-        task_do.finished_at = None
-
-    NM_TASK_CRUD.update_task(task_id, task_do)
-    logger.info(
-        f"[{log_info}] {task_id} changed status to [{task_status}] at {task_do.updated_at}"
+    logger.warning(
+        f"[{log_info}] {task_id} status is [{task_do.ext_info.nm_status}], not in [{from_statuses}]. Skip changing status to [{task_status}]"
     )
+    return False
 
 
 def get_task_computation_config(task_id: int) -> dict:
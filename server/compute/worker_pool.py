@@ -0,0 +1,156 @@
+"""
+The RQ worker pool of ECS and docker-compose mode
+
+Each queue has a fixed number of slots, one per `rq worker` process listening to
+it. Starting a task leases a free slot in the redis hash `<queue>:slots`, slot ->
+task id, and enqueues a job with the per-task job id. The worker releases the slot
+when the task subprocess ends. A slot held by a job which failed or stopped, e.g.,
+the worker was killed, is taken over by the next task.
+
+A realtime task listens to the port of its slot, so the realtime tasks of one
+host don't conflict
+"""
+
+from typing import Dict, Optional
+
+import redis
+import rq
+
+from server.apps.nm_task.schemas import AbcXyz_TYPE
+from server.settings import API_SETTING
+from server.settings.logger import compute_logger as logger
+
+NM_BATCH_QUEUE = "nm_batch_worker"
+NM_REALTIME_QUEUE = "nm_realtime_worker"
+
+# the statuses of a job which doesn't hold its slot anymore
+RQ_JOB_ENDED_STATUSES = ["finished", "stopped", "failed"]
+
+# the client is shared by the pools, it connects on the first command
+RQ_REDIS_CONN = redis.Redis(host=API_SETTING.REDIS_DNS, port=6379, db=0)
+
+
+def gen_task_job_id(task_id: int) -> str:
+    return f"nm_task_{task_id}"
+
+
+def gen_task_stop_key(task_id: int) -> str:
+    """
+    The redis key of the stop flag of a task, the backup of the stop message for a
+    worker not subscribed yet
+    """
+    return f"nm_task_{task_id}:should_stop"
+
+
+def gen_rt_task_port(slot: int) -> int:
+    return int(API_SETTING.REALTIME_NM_ENDPOINT_PORT) + slot
+
+
+class WorkerPool(object):
+    def __init__(
+        self, queue_name: str, nr_slots: int, redis_conn: redis.Redis
+    ) -> None:
+        self.queue_name = queue_name
+        self.nr_slots = nr_slots
+        self.redis_conn = redis_conn
+        self.slots_key = f"{queue_name}:slots"
+
+    def get_slots(self) -> Dict[int, int]:
+        """
+        slot -> task id of the leased slots
+        """
+        return {
+            int(slot): int(task_id)
+            for slot, task_id in self.redis_conn.hgetall(self.slots_key).items()
+        }
+
+    def get_task_slot(self, task_id: int) -> Optional[int]:
+        for slot, slot_task_id in self.get_slots().items():
+            if slot_task_id == task_id:
+                return slot
+        return None
+
+    def is_job_ended(self, task_id: int) -> bool:
+        try:
+            rq_job = rq.job.Job.fetch(
+                gen_task_job_id(task_id), connection=self.redis_conn
+            )
+        except rq.exceptions.NoSuchJobError:
+            # the slot is leased, and its job is being enqueued
+            return False
+        return rq_job.get_status() in RQ_JOB_ENDED_STATUSES
+
+    def acquire_slot(self, task_id: int) -> Optional[int]:
+        """
+        Lease a slot for the task, None if all slots are busy
+        """
+        slots = self.get_slots()
+        for slot in range(self.nr_slots):
+            if slots.get(slot) == task_id:
+                return slot
+
+        for slot in range(self.nr_slots):
+            if self.redis_conn.hsetnx(self.slots_key, str(slot), task_id):
+                return slot
+
+            slot_task_id = slots.get(slot)
+            if (
+                slot_task_id is not None
+                and self.is_job_ended(slot_task_id)
+                and self.take_over_slot(slot, slot_task_id, task_id)
+            ):
+                logger.info(
+                    f"[{self.queue_name}] slot [{slot}] of the ended task [{slot_task_id}] is taken over by task [{task_id}]"
+                )
+                return slot
+        return None
+
+    def take_over_slot(
+        self, slot: int, ended_task_id: int, task_id: int
+    ) -> bool:
+        """
+        Lease the slot to the task only if it is still held by the ended task.
+        Another starter may have taken the slot over since the slots were read
+        """
+        with self.redis_conn.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self.slots_key)
+                    if pipe.hget(self.slots_key, str(slot)) != str(
+                        ended_task_id
+                    ).encode("utf-8"):
+                        return False
+                    pipe.multi()
+                    pipe.hset(self.slots_key, str(slot), task_id)
+                    pipe.execute()
+                    return True
+                except redis.WatchError:
+                    # the hash changed, e.g., another slot is leased. Check again
+                    continue
+
+    def release_task(self, task_id: int) -> None:
+        slot = self.get_task_slot(task_id)
+        if slot is not None:
+            self.redis_conn.hdel(self.slots_key, str(slot))
+
+    def get_queue(self) -> rq.Queue:
+        return rq.Queue(self.queue_name, connection=self.redis_conn)
+
+
+def get_worker_pool(queue_name: str) -> WorkerPool:
+    """
+    Get the worker pool of a RQ queue
+    ONLY in ECS and docker-composer mode
+    """
+    nr_slots = (
+        API_SETTING.RQ_BATCH_WORKER_SLOTS
+        if queue_name == NM_BATCH_QUEUE
+        else API_SETTING.RQ_REALTIME_WORKER_SLOTS
+    )
+    return WorkerPool(queue_name, nr_slots, RQ_REDIS_CONN)
+
+
+def get_task_queue_name(task_type: AbcXyz_TYPE) -> str:
+    if task_type == AbcXyz_TYPE.NAME_MATCHING_BATCH:
+        return NM_BATCH_QUEUE
+    return NM_REALTIME_QUEUE
@@ -0,0 +1,182 @@
+"""
+Fork the nm task processes from a parent with the heavy modules preloaded
+
+A task process started by `subprocess.Popen` is a fresh interpreter. It imports
+pandas, scipy, sklearn, sparse_dot_topn and the `server` package, and parses the
+YAML configs, before doing any work. With TASK_FORK_ENABLED the supervisor forks
+the task instead, and the child runs the same entrypoint as the command
+
+- RQ mode: `rq worker --worker-class server.compute.zygote.PreloadWorker` preloads
+  the modules once. The work horse of each job is forked from it, and forks the task
+- K8S mode: the supervisor of the pod preloads the modules, then forks the task
+
+`ForkedTaskProcess` has the `pid`, `wait()` and `poll()` of `subprocess.Popen`, and
+the same return code, e.g., -9 when the task is killed by OOM, so the stop, TTL and
+status handling of the supervisor are unchanged. A command without a known
+entrypoint is still run by `subprocess.Popen`
+
+See `scripts/tests/measure_task_startup.py` for the startup latency
+"""
+
+import importlib
+import os
+import signal
+import subprocess
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Union
+
+import rq
+
+from server.settings import API_SETTING
+from server.settings.logger import compute_logger as logger
+
+BATCH_TASK_SCRIPT = "server/compute/batch.py"
+REALTIME_TASK_APP = "server.compute.realtime:app"
+
+PRELOAD_MODULES = [
+    "numpy",
+    "pandas",
+    "scipy.sparse",
+    "sklearn.feature_extraction.text",
+    "sparse_dot_topn",
+    "uvicorn",
+    "server.nm_algo.pipeline",
+    "server.compute.batch",
+]
+
+
+def preload_task_modules() -> None:
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+    logger.info(f"task modules preloaded in pid [{os.getpid()}]")
+
+
+def run_batch_command(command: List[str]) -> None:
+    from server.compute.batch import run_batch_task
+
+    run_batch_task(int(command[2]), int(command[3]))
+
+
+def run_realtime_command(command: List[str]) -> None:
+    import uvicorn
+
+    options = dict(zip(command[2::2], command[3::2]))
+    uvicorn.run(command[1], host=options["--host"], port=int(options["--port"]))
+
+
+def get_task_entrypoint(
+    command: List[str],
+) -> Optional[Callable[[List[str]], None]]:
+    """
+    The function which runs the task command in a forked process
+    """
+    if command[:2] == ["python", BATCH_TASK_SCRIPT]:
+        return run_batch_command
+    if command[:2] == ["uvicorn", REALTIME_TASK_APP]:
+        return run_realtime_command
+    return None
+
+
+def decode_wait_status(status: int) -> int:
+    """
+    The return code of `subprocess.Popen` from a `os.waitpid` status
+    """
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+class ForkedTaskProcess(object):
+    """A forked task process, with the interface of `subprocess.Popen` used by
+    the supervisor"""
+
+    def __init__(self, pid: int) -> None:
+        self.pid = pid
+        self.returncode: Optional[int] = None
+        self._waitpid_lock = threading.Lock()
+
+    def wait(self) -> int:
+        with self._waitpid_lock:
+            if self.returncode is None:
+                _, status = os.waitpid(self.pid, 0)
+                self.returncode = decode_wait_status(status)
+        return self.returncode
+
+    def poll(self) -> Optional[int]:
+        # the same as `Popen.poll`, don't block while another thread waits
+        if not self._waitpid_lock.acquire(False):
+            return None
+        try:
+            if self.returncode is None:
+                pid, status = os.waitpid(self.pid, os.WNOHANG)
+                if pid == self.pid:
+                    self.returncode = decode_wait_status(status)
+        finally:
+            self._waitpid_lock.release()
+        return self.returncode
+
+
+def fork_entrypoint(
+    entrypoint: Callable[[List[str]], None],
+    command: List[str],
+    env: Dict[str, str],
+) -> ForkedTaskProcess:
+    pid = os.fork()
+    if pid != 0:
+        return ForkedTaskProcess(pid)
+
+    # the child never returns to the stack of the supervisor
+    return_code: Union[int, str, None] = 1
+    try:
+        os.environ.clear()
+        os.environ.update(env)
+        # the task handles the signals as a fresh process
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        entrypoint(command)
+        return_code = 0
+    except SystemExit as e:
+        return_code = e.code
+    except BaseException:
+        logger.exception(f"forked task [{command}] failed")
+    finally:
+        if not isinstance(return_code, int):
+            # `sys.exit("message")` exits with 1, `sys.exit()` with 0
+            if return_code is not None:
+                print(return_code, file=sys.stderr)
+            return_code = 0 if return_code is None else 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(return_code)
+
+
+def launch_task_process(
+    command: List[str], env: Dict[str, str], allow_fork: bool = True
+) -> Union[subprocess.Popen, ForkedTaskProcess]:
+    """
+    Fork the task from this process if enabled and the command is known,
+    otherwise run the command in a new interpreter
+
+    `allow_fork=False` for a multi-threaded parent, e.g., the API server, since the
+    child may inherit a lock held by another thread
+    """
+    entrypoint = get_task_entrypoint(command)
+    if allow_fork and API_SETTING.TASK_FORK_ENABLED and entrypoint is not None:
+        return fork_entrypoint(entrypoint, command, env)
+
+    return subprocess.Popen(
+        command,
+        stderr=subprocess.STDOUT,
+        close_fds=True,
+        env=env,
+    )
+
+
+class PreloadWorker(rq.Worker):
+    """RQ worker which preloads the task modules before forking the work horses"""
+
+    def __init__(self, *args, **kwargs) -> None:  # type: ignore
+        super().__init__(*args, **kwargs)
+        if API_SETTING.TASK_FORK_ENABLED:
+            preload_task_modules()
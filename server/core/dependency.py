@@ -1,18 +1,13 @@
-import traceback
 from typing import Optional
 
 from fastapi import Depends, Request
 from fastapi.openapi.models import OAuthFlows as OAuthFlowsModel
 from fastapi.security import OAuth2
 from fastapi.security.utils import get_authorization_scheme_param
-from jose import jwt
-from pydantic import ValidationError
 
-from server.apps.oauth.schemas import TokenPayload
-from server.apps.user.crud import USER_CRUD
 from server.apps.user.schemas import UserDO
-from server.core import security
 from server.core.exception import EXCEPTION_LIB
+from server.core.request import resolve_request_principal
 from server.settings import API_SETTING
 from server.settings.logger import api_logger as logger
 
@@ -101,31 +96,32 @@ reusable_oauth2 = OAuth2PasswordBearerCookie(
 )
 
 
-def get_current_user(token: str = Depends(reusable_oauth2)) -> UserDO:
+async def get_current_user(
+    request: Request, token: str = Depends(reusable_oauth2)
+) -> UserDO:
     """Get the current login user
     This is the standard way how fastapi handle security, authentication and authorization
     https://fastapi.tiangolo.com/tutorial/security/
 
     `get_current_user` is used as `dependencies` in the endpoint which enforce security and authentication
     Please read https://fastapi.tiangolo.com/tutorial/dependencies/ for more details
+
+    The token is decoded and the user is loaded once per request. If a middleware has resolved it,
+    it is reused from `request.state`
     """
-    try:
-        payload = jwt.decode(
-            token, API_SETTING.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
-        traceback.print_exc()
+    principal = await resolve_request_principal(request, token)
+    if principal.token_data is None:
         logger.error(
             "API__VALIDATE_CRDENTIALS_ERROR： Could not validate credentials! jwt token invalid. Some reasons: 1) server jwt secret change 2) jwt token from user cookie damaged"
         )
         raise EXCEPTION_LIB.API__VALIDATE_CRDENTIALS_ERROR.value(
             "Could not validate credentials. Please logout and login again or input the right JWT token",
         )
-    user = USER_CRUD.get_user(token_data.sub)
+
+    user = principal.user
     if not user:
         logger.error(
-            f"USER__USER_ID_NOT_EXIST: decoded jwt token does not include a valid user id! user_id [{token_data.sub}]"
+            f"USER__USER_ID_NOT_EXIST: decoded jwt token does not include a valid user id! user_id [{principal.token_data.sub}]"
         )
         raise EXCEPTION_LIB.USER__USER_ID_NOT_EXIST.value(
             "The credential is not valid! Please logout and login again or input the right JWT token"
@@ -134,7 +130,7 @@ def get_current_user(token: str = Depends(reusable_oauth2)) -> UserDO:
     return user
 
 
-def get_current_active_user(
+async def get_current_active_user(
     current_user: UserDO = Depends(get_current_user),
 ) -> UserDO:
     """Return the current login user if it is a active user"""
@@ -146,7 +142,7 @@ def get_current_active_user(
     return current_user
 
 
-def get_current_active_superuser(
+async def get_current_active_superuser(
     current_user: UserDO = Depends(get_current_active_user),
 ) -> UserDO:
     """Return the current login user if it is a superuser"""
@@ -160,7 +156,7 @@ def get_current_active_superuser(
     return current_user
 
 
-def get_current_active_normal_user(
+async def get_current_active_normal_user(
     current_user: UserDO = Depends(get_current_active_user),
 ) -> UserDO:
     """Return the current login user if it is a normal user"""
@@ -233,6 +233,9 @@ class EXCEPTION_LIB(enum.Enum):
     API__VALIDATE_CRDENTIALS_ERROR = ErrorClassFactory(
         error_domain="API__VALIDATE_CRDENTIALS_ERROR"
     )
+    API__INVALID_PAGE_PARAM = ErrorClassFactory(
+        error_domain="API__INVALID_PAGE_PARAM"
+    )
 
     # ----------------------------------
     # User error
@@ -58,18 +58,18 @@ class RouteLoggerMiddleware(BaseHTTPMiddleware):
 
         finish_time = time.perf_counter()
         self._logger.info(
-            self._generate_success_log(
+            await self._generate_success_log(
                 request, response, finish_time - start_time
             )
         )
 
         return response
 
-    def _generate_success_log(
+    async def _generate_success_log(
         self, request: Request, response: Response, execution_time: float
     ) -> str:
         user_id: int = 0
-        do_user = parse_user_from_request(request)
+        do_user = await parse_user_from_request(request)
         if do_user:
             user_id = do_user.id
 
@@ -3,16 +3,33 @@ from typing import Optional
 from fastapi import Request
 from fastapi.security.utils import get_authorization_scheme_param
 from jose import jwt
+from pydantic import BaseModel, ValidationError
 
 from server.apps.oauth.schemas import TokenPayload
-from server.apps.user.crud import USER_CRUD
+from server.apps.user.async_crud import USER_ASYNC_CRUD
+from server.apps.user.cache import USER_CACHE
 from server.apps.user.schemas import UserDO
 from server.core import security
-from server.libs.db.sqlalchemy import db
 from server.settings import API_SETTING
 
 
-def parse_user_from_request(request: Request) -> Optional[UserDO]:
+class RequestPrincipal(BaseModel):
+    """The user of a request, resolved once and stored in `request.state.principal`
+
+    :field token: the bearer token from cookie or header. Empty if not exist
+    :field token_data: decoded token payload. None if no token or the token is invalid
+    :field user: the user of the token. None if the user doesn't exist
+    """
+
+    token: str = ""
+    token_data: Optional[TokenPayload] = None
+    user: Optional[UserDO] = None
+
+
+def get_token_from_request(request: Request) -> str:
+    """
+    Get the bearer token from cookie first, then from header
+    """
     token: str = ""
     cookie_authorization = request.cookies.get("Authorization")
     if cookie_authorization is not None:
@@ -33,12 +50,55 @@ def parse_user_from_request(request: Request) -> Optional[UserDO]:
             if header_scheme.lower() == "bearer":
                 token = header_param
 
+    return token
+
+
+async def load_user(user_id: int) -> Optional[UserDO]:
+    """
+    Load a user from user cache, or from DB if not cached
+    """
+    do_user = await USER_CACHE.aget(user_id)
+    if do_user is not None:
+        return do_user
+
+    do_user = await USER_ASYNC_CRUD.get_user(user_id)
+    if do_user is not None:
+        await USER_CACHE.aset(do_user)
+    return do_user
+
+
+async def resolve_request_principal(
+    request: Request, token: Optional[str] = None
+) -> RequestPrincipal:
+    """
+    Resolve the principal of a request once: decode the token and load the user.
+    The result is stored in `request.state`, which is shared by all middlewares and
+    dependencies of the same request, so the following calls reuse it
+    """
+    if token is None:
+        token = get_token_from_request(request)
+
+    principal = getattr(request.state, "principal", None)
+    if principal is not None and principal.token == token:
+        return principal
+
+    principal = RequestPrincipal(token=token)
     if token:
-        payload = jwt.decode(
-            token, API_SETTING.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-        with db():
-            do_user = USER_CRUD.get_user(token_data.sub)
-            return do_user
-    return None
+        try:
+            payload = jwt.decode(
+                token, API_SETTING.SECRET_KEY, algorithms=[security.ALGORITHM]
+            )
+            principal.token_data = TokenPayload(**payload)
+        except (jwt.JWTError, ValidationError):
+            principal.token_data = None
+
+    if principal.token_data is not None:
+        principal.user = await load_user(principal.token_data.sub)
+
+    request.state.principal = principal
+    return principal
+
+
+async def parse_user_from_request(request: Request) -> Optional[UserDO]:
+    principal = await resolve_request_principal(request)
+    return principal.user
@@ -0,0 +1,71 @@
+"""
+The executor runs the nm tasks. The task endpoints only call the executor, which
+is picked by `server.executors.factory`
+
+- KubernetesExecutor: a pod per task, supervised by `server/compute/rq_worker.py`
+- RQExecutor: a job per task in the RQ worker pool of ECS and docker-compose mode
+- LocalExecutor: a child process of the API process per task, supervised by a
+  thread, without Redis, RQ or K8S. For test, local runs and benchmarks
+"""
+
+from abc import ABC, abstractmethod
+from typing import List
+
+from server.apps.nm_task.schemas import AbcXyz_TYPE, NmTaskDO
+from server.settings import API_SETTING
+
+
+def gen_task_command(
+    do_task: NmTaskDO,
+    user_id: int,
+    host: str = "0.0.0.0",
+    port: int = int(API_SETTING.REALTIME_NM_ENDPOINT_PORT),
+) -> List[str]:
+    """
+    The command of the nm subprocess. A realtime task listens to `host:port`
+    """
+    if do_task.type == AbcXyz_TYPE.NAME_MATCHING_BATCH:
+        return [
+            "python",
+            "server/compute/batch.py",
+            f"{do_task.id}",
+            f"{user_id}",
+        ]
+    return [
+        "uvicorn",
+        "server.compute.realtime:app",
+        "--host",
+        host,
+        # "--reload", not use reload, otherwise we cannot clean uvicorn thoroughly
+        "--port",
+        f"{port}",
+    ]
+
+
+class NmTaskExecutorAbcFactory(ABC):
+    @abstractmethod
+    def start_task(self, do_task: NmTaskDO, user_id: int) -> None:
+        """
+        Launch a task in PREPARING status
+        """
+        pass
+
+    @abstractmethod
+    def stop_task(self, do_task: NmTaskDO, user_id: int) -> None:
+        """
+        Ask the supervisor of a running task to stop it
+        """
+        pass
+
+    @abstractmethod
+    def gen_rt_task_base_url(self, task_id: int, owner_id: int) -> str:
+        """
+        The base url of the real-time matching process of a task
+        """
+        pass
+
+    def shutdown(self) -> None:
+        """
+        Release the resources of the executor when the API process exits
+        """
+        pass
@@ -0,0 +1,44 @@
+import os
+
+from server.core.exception import EXCEPTION_LIB
+from server.executors.base import NmTaskExecutorAbcFactory
+from server.executors.kubernetes_executor import KubernetesExecutor
+from server.executors.local_executor import LocalExecutor
+from server.executors.rq_executor import RQExecutor
+from server.settings import API_SETTING
+from server.settings.global_sys_config import EXECUTOR
+from server.settings.logger import compute_logger as logger
+
+
+def get_executor_type() -> EXECUTOR:
+    """
+    API_SETTING.TASK_EXECUTOR if set, otherwise by the API_RUN_LOCATION
+    """
+    if API_SETTING.TASK_EXECUTOR is not None:
+        return API_SETTING.TASK_EXECUTOR
+
+    api_run_location = os.getenv("API_RUN_LOCATION")
+    if api_run_location in ["k8s", "minikube"]:
+        return EXECUTOR.KubernetesExecutor
+    if api_run_location == "test":
+        return EXECUTOR.LocalExecutor
+    return EXECUTOR.RQExecutor
+
+
+def make_task_executor() -> NmTaskExecutorAbcFactory:
+    """The factory method to load the executor of nm tasks"""
+    executor_type = get_executor_type()
+    if executor_type == EXECUTOR.KubernetesExecutor:
+        return KubernetesExecutor()
+    if executor_type == EXECUTOR.RQExecutor:
+        return RQExecutor()
+    if executor_type == EXECUTOR.LocalExecutor:
+        return LocalExecutor(API_SETTING.LOCAL_EXECUTOR_MAX_TASKS)
+
+    logger.error(f"EXECUTOR__NOT_IMPLEMENTED: executor [{executor_type}]")
+    raise EXCEPTION_LIB.EXECUTOR__NOT_IMPLEMENTED.value(
+        f"The executor [{executor_type}] is not implemented"
+    )
+
+
+TASK_EXECUTOR = make_task_executor()
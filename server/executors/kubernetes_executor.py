@@ -0,0 +1,90 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Optional
+
+import redis
+
+from server.apps.nm_task.crud import NM_TASK_CRUD
+from server.apps.nm_task.schemas import NM_STATUS, AbcXyz_TYPE, NmTaskDO
+from server.compute.utils import change_task_status, gen_pubsub_channel_name
+from server.executors.base import NmTaskExecutorAbcFactory, gen_task_command
+from server.kubernetes.k8s_command import K8SCommand
+from server.libs.db.sqlalchemy import db
+from server.settings import API_SETTING
+from server.settings.logger import compute_logger as logger
+from server.utils.k8s_resource_name import gen_k8s_resource_prefix
+
+
+class KubernetesExecutor(NmTaskExecutorAbcFactory):
+    """
+    Run each task in a pod. The pod, and the service of a realtime task, are
+    created by a background launcher, so the start endpoint returns with the
+    task in PREPARING status without waiting for the K8S API. If the launch fails,
+    the task status is changed to FAILED. If the launch is lost, e.g., the API pod is
+    killed, the housekeeper fails the task after K8S_PREPARING_TIMEOUT
+    """
+
+    def __init__(
+        self,
+        k8s_command: Optional[K8SCommand] = None,
+        redis_conn: Optional[Any] = None,
+    ) -> None:
+        self.k8s_command = k8s_command or K8SCommand()
+        self.redis_conn = redis_conn or redis.Redis(
+            host=API_SETTING.REDIS_DNS,
+            port=6379,
+            password=os.getenv("K8S_REDIS_PASSWORD"),
+        )
+        self.launcher = ThreadPoolExecutor(
+            max_workers=API_SETTING.K8S_LAUNCHER_WORKERS,
+            thread_name_prefix="k8s-launcher",
+        )
+
+    def start_task(self, do_task: NmTaskDO, user_id: int) -> None:
+        self.launcher.submit(self.launch_task, do_task, user_id)
+
+    def launch_task(self, do_task: NmTaskDO, user_id: int) -> None:
+        try:
+            pod_name = self.k8s_command.run_task_in_k8s(
+                task_id=do_task.id,
+                user_id=user_id,
+                entrypoint=[
+                    "python",
+                    "server/compute/rq_worker.py",
+                ],  # K8S Pod command
+                command=gen_task_command(do_task, user_id),  # work initial args
+                with_service=do_task.type == AbcXyz_TYPE.NAME_MATCHING_REALTIME,
+            )
+
+            # add record to task run history table
+            with db():
+                NM_TASK_CRUD.add_task_run_record(user_id, do_task.id, pod_name)
+        except Exception:
+            logger.exception(
+                f"[K8S launcher] task [{do_task.id}] user_id [{user_id}] launch failed"
+            )
+            with db():
+                change_task_status(
+                    do_task.id,
+                    NM_STATUS.FAILED,
+                    "K8S launcher",
+                    finished_at=datetime.utcnow(),
+                    from_statuses=[NM_STATUS.PREPARING],
+                )
+
+    def stop_task(self, do_task: NmTaskDO, user_id: int) -> None:
+        self.redis_conn.publish(
+            gen_pubsub_channel_name(do_task.id, user_id), "1"
+        )
+
+    def gen_rt_task_base_url(self, task_id: int, owner_id: int) -> str:
+        # TODO: replace k8s namespace nm by a global value
+        rt_task_svc_name = gen_k8s_resource_prefix(task_id, owner_id)
+        return f"http://{rt_task_svc_name}.nm.svc"
+
+    def shutdown(self) -> None:
+        """
+        Finish the launches in the queue
+        """
+        self.launcher.shutdown(wait=True)
@@ -0,0 +1,183 @@
+import os
+import threading
+from typing import Dict, List, Optional
+
+from server.apps.nm_task.schemas import NM_STATUS, NM_STATUS_RUNNING_L, NmTaskDO
+from server.compute.rq_worker import (
+    TASK_EVENT,
+    TaskSupervisor,
+    gen_ttl_deadline,
+    handle_task_event,
+)
+from server.compute.utils import change_task_status
+from server.compute.worker_pool import gen_rt_task_port
+from server.compute.zygote import launch_task_process
+from server.core.exception import EXCEPTION_LIB
+from server.executors.base import NmTaskExecutorAbcFactory, gen_task_command
+from server.libs.db.sqlalchemy import db
+from server.settings.logger import compute_logger as logger
+
+# the real-time matching processes listen to the loopback of the API host
+LOCAL_RT_TASK_HOST = "127.0.0.1"
+LOCAL_SHUTDOWN_TIMEOUT_SECONDS = 10.0
+
+
+class LocalTaskRun(object):
+    """A task run of LocalExecutor"""
+
+    def __init__(self, task_id: int, slot: int) -> None:
+        self.task_id = task_id
+        self.slot = slot
+        self.supervisor: Optional[TaskSupervisor] = None
+        self.stop_requested = False
+        self.thread: Optional[threading.Thread] = None
+
+
+class LocalExecutor(NmTaskExecutorAbcFactory):
+    """
+    Run each task in a child process of the API process, at most `max_tasks` at
+    the same time. A thread per task launches the process and supervises it as the
+    RQ worker does, by `TaskSupervisor`. The stop command goes straight to the
+    supervisor, there is no Redis, RQ or K8S between the endpoint and the task
+
+    The child is a new interpreter, not a fork, since the API process is
+    multi-threaded. A realtime task listens to the port of its slot
+    """
+
+    def __init__(self, max_tasks: int) -> None:
+        self.max_tasks = max_tasks
+        self.runs: Dict[int, LocalTaskRun] = {}
+        self._lock = threading.Lock()
+
+    def _acquire_run(self, task_id: int) -> Optional[LocalTaskRun]:
+        with self._lock:
+            if task_id in self.runs or len(self.runs) >= self.max_tasks:
+                return None
+            used_slots = {run.slot for run in self.runs.values()}
+            slot = min(set(range(self.max_tasks)) - used_slots)
+            run = LocalTaskRun(task_id, slot)
+            self.runs[task_id] = run
+            return run
+
+    def _release_run(self, task_id: int) -> None:
+        with self._lock:
+            self.runs.pop(task_id, None)
+
+    def start_task(self, do_task: NmTaskDO, user_id: int) -> None:
+        run = self._acquire_run(do_task.id)
+        if run is None:
+            logger.error(
+                f"EXECUTOR__TASK_WORKER_NOT_AVAILABLE: all [{self.max_tasks}] local executor slots are busy! user_id [{user_id}] task_id [{do_task.id}]"
+            )
+            raise EXCEPTION_LIB.EXECUTOR__TASK_WORKER_NOT_AVAILABLE.value(
+                f"Computation worker is not avaiable! At most {self.max_tasks} tasks can be run in the same time"
+            )
+
+        command = gen_task_command(
+            do_task,
+            user_id,
+            host=LOCAL_RT_TASK_HOST,
+            port=gen_rt_task_port(run.slot),
+        )
+        run.thread = threading.Thread(
+            target=self.run_task,
+            args=(run, do_task, user_id, command),
+            name=f"nm-task-{do_task.id}",
+            daemon=True,
+        )
+        run.thread.start()
+
+    def run_task(
+        self,
+        run: LocalTaskRun,
+        do_task: NmTaskDO,
+        user_id: int,
+        command: List[str],
+    ) -> None:
+        task_id = do_task.id
+        try:
+            with db():
+                change_task_status(
+                    task_id,
+                    NM_STATUS.LAUNCHING,
+                    "Local executor",
+                    from_statuses=[NM_STATUS.PREPARING],
+                )
+
+            env = os.environ.copy()
+            env["NM_TASK_ID"] = str(task_id)
+            env["USER_ID"] = str(user_id)
+            task_proc = launch_task_process(command, env, allow_fork=False)
+            logger.info(
+                f"[Local executor] task [{task_id}] pid [{task_proc.pid}]"
+            )
+
+            supervisor = TaskSupervisor(
+                task_proc, None, gen_ttl_deadline(do_task)
+            )
+            with self._lock:
+                run.supervisor = supervisor
+                if run.stop_requested:
+                    supervisor.events.put((TASK_EVENT.STOP, None))
+
+            try:
+                task_event, task_status = supervisor.wait()
+            finally:
+                supervisor.close()
+
+            with db():
+                handle_task_event(
+                    task_event, task_status, task_proc.pid, task_id
+                )
+        except Exception:
+            logger.exception(f"[Local executor] task [{task_id}] failed")
+            with db():
+                change_task_status(
+                    task_id,
+                    NM_STATUS.FAILED,
+                    "Local executor",
+                    from_statuses=NM_STATUS_RUNNING_L,
+                )
+        finally:
+            self._release_run(task_id)
+
+    def stop_task_run(self, run: LocalTaskRun) -> None:
+        with self._lock:
+            run.stop_requested = True
+            if run.supervisor is not None:
+                run.supervisor.events.put((TASK_EVENT.STOP, None))
+
+    def stop_task(self, do_task: NmTaskDO, user_id: int) -> None:
+        run = self.runs.get(do_task.id)
+        if run is None:
+            # e.g., the task was started by another API worker process
+            logger.error(
+                f"TASK__STATUS_DISORDER: local executor task [{do_task.id}] is not running in this process. user_id [{user_id}]"
+            )
+            raise EXCEPTION_LIB.TASK__STATUS_DISORDER.value(
+                "The task is not running in this API process, and cannot be stopped by it. Please try again, or restart the API server."
+            )
+        self.stop_task_run(run)
+
+    def gen_rt_task_base_url(self, task_id: int, owner_id: int) -> str:
+        run = self.runs.get(task_id)
+        if run is None:
+            logger.error(
+                f"TASK__STATUS_DISORDER: local executor real-time task [{task_id}] is not running in this process. owner_id [{owner_id}]"
+            )
+            raise EXCEPTION_LIB.TASK__STATUS_DISORDER.value(
+                "This task status is not correct, and it is actually not running. Please delete the task, create and running it again."
+            )
+        return f"http://{LOCAL_RT_TASK_HOST}:{gen_rt_task_port(run.slot)}"
+
+    def shutdown(self) -> None:
+        """
+        Stop the running tasks, the children don't outlive the API process
+        """
+        with self._lock:
+            runs = list(self.runs.values())
+        for run in runs:
+            self.stop_task_run(run)
+        for run in runs:
+            if run.thread is not None:
+                run.thread.join(timeout=LOCAL_SHUTDOWN_TIMEOUT_SECONDS)
@@ -0,0 +1,64 @@
+from server.apps.nm_task.crud import NM_TASK_CRUD
+from server.apps.nm_task.schemas import NmTaskDO
+from server.compute.rq_worker import run_task_in_subprocess
+from server.compute.utils import gen_pubsub_channel_name
+from server.compute.worker_pool import (
+    NM_REALTIME_QUEUE,
+    gen_rt_task_port,
+    gen_task_job_id,
+    gen_task_stop_key,
+    get_task_queue_name,
+    get_worker_pool,
+)
+from server.core.exception import EXCEPTION_LIB
+from server.executors.base import NmTaskExecutorAbcFactory, gen_task_command
+from server.settings import API_SETTING
+from server.settings.logger import compute_logger as logger
+
+
+class RQExecutor(NmTaskExecutorAbcFactory):
+    def start_task(self, do_task: NmTaskDO, user_id: int) -> None:
+        worker_pool = get_worker_pool(get_task_queue_name(do_task.type))
+        slot = worker_pool.acquire_slot(do_task.id)
+        if slot is None:
+            logger.error(
+                f"EXECUTOR__TASK_WORKER_NOT_AVAILABLE: all [{worker_pool.nr_slots}] rq worker slots of [{worker_pool.queue_name}] are busy! user_id [{user_id}] task_id [{do_task.id}]"
+            )
+            raise EXCEPTION_LIB.EXECUTOR__TASK_WORKER_NOT_AVAILABLE.value(
+                f"Computation worker for [{do_task.type}] type task is not avaiable! You are running in local mode, at most {worker_pool.nr_slots} tasks of this type can be run in the same time"
+            )
+
+        worker_pool.get_queue().enqueue(
+            run_task_in_subprocess,
+            (
+                do_task.id,
+                user_id,
+                NM_TASK_CRUD,
+                gen_task_command(do_task, user_id, port=gen_rt_task_port(slot)),
+            ),
+            job_id=gen_task_job_id(do_task.id),
+            job_timeout=-1,
+        )
+        logger.info(
+            f"NM task [{do_task.id}] enqueued to slot [{slot}] of [{worker_pool.queue_name}]"
+        )
+
+    def stop_task(self, do_task: NmTaskDO, user_id: int) -> None:
+        # the worker of the task subscribes the channel. The stop key is for the
+        # worker which has not subscribed yet
+        redis_conn = get_worker_pool(
+            get_task_queue_name(do_task.type)
+        ).redis_conn
+        redis_conn.set(gen_task_stop_key(do_task.id), 1, ex=30)
+        redis_conn.publish(gen_pubsub_channel_name(do_task.id, user_id), "1")
+
+    def gen_rt_task_base_url(self, task_id: int, owner_id: int) -> str:
+        slot = get_worker_pool(NM_REALTIME_QUEUE).get_task_slot(task_id)
+        if slot is None:
+            logger.error(
+                f"TASK__STATUS_DISORDER: no rq worker slot of the real-time task. task_id [{task_id}] owner_id [{owner_id}]"
+            )
+            raise EXCEPTION_LIB.TASK__STATUS_DISORDER.value(
+                "This task status is not correct, and it is actually not running. Please delete the task, create and running it again."
+            )
+        return f"http://{API_SETTING.REALTIME_NM_ENDPOINT_URL}:{gen_rt_task_port(slot)}"
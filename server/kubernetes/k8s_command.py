@@ -1,4 +1,6 @@
+import copy
 import os
+import threading
 from datetime import datetime
 from typing import List
 
@@ -16,6 +18,7 @@ from kubernetes.client import models as k8s
 from kubernetes.client.exceptions import ApiException
 
 from server.kubernetes import kube_client
+from server.kubernetes.base_generator import BaseGenerator
 from server.kubernetes.pod_generator import PodGenerator
 from server.kubernetes.pod_launcher import PodLauncher
 from server.kubernetes.service_generator import ServiceGenerator
@@ -54,6 +57,18 @@ class K8SCommand:
             + "/server/kubernetes/task-service-k8s.yaml"
         )
 
+        # the templates are parsed once, and deep copied per pod or service.
+        # The container image of the pod template is set on the first launch
+        self.pod_template: k8s.V1Pod = BaseGenerator.deserialize_model_file(
+            self.pod_path, "pod"
+        )
+        self.pod_template.metadata.namespace = "nm"
+        self.pod_template_image_set = False
+        self.service_template: k8s.V1Service = (
+            BaseGenerator.deserialize_model_file(self.service_path, "service")
+        )
+        self._template_lock = threading.Lock()
+
         # setup env bring to nm task pod
         self.pg_host = os.getenv("POSTGRES_HOST")
         self.pg_db = os.getenv("POSTGRES_DB")
@@ -68,9 +83,48 @@ class K8SCommand:
         # setup nm pod resource dictionary
         self.pod_resource_dict = GLOBAL_LIMIT_CONFIG.task_pod_cfg
 
+    def set_pod_template_image(self) -> None:
+        """
+        Set the backend image of the task container, the ECR url needs an AWS call
+        """
+        with self._template_lock:
+            if self.pod_template_image_set:
+                return
+
+            if os.getenv("API_RUN_LOCATION") == "minikube":
+                image = (
+                    f"{os.getenv('PRODUCT_PREFIX')}-dev-backend-local:minikube"
+                )
+            else:
+                CONTAINER_REG_FACTORY = ContainerRegistryFactory.make_concrete()
+                image = CONTAINER_REG_FACTORY.get_backend_container_image_url(
+                    os.getenv("IMAGE_TAG", "latest")
+                )
+            self.pod_template.spec.containers[0].image = image
+            self.pod_template_image_set = True
+
+    def gen_pod(self, pod_name: str, app_name: str) -> k8s.V1Pod:
+        return PodGenerator(pod=copy.deepcopy(self.pod_template)).gen_pod(
+            pod_name, app_name
+        )
+
+    def gen_service(self, app_name: str) -> k8s.V1Service:
+        return ServiceGenerator(
+            k8s_service=copy.deepcopy(self.service_template)
+        ).gen_service(app_name)
+
     def run_task_in_k8s(
-        self, task_id: int, user_id: int, entrypoint: List, command: List
+        self,
+        task_id: int,
+        user_id: int,
+        entrypoint: List,
+        command: List,
+        with_service: bool = False,
     ) -> str:
+        """
+        Create the pod of a task, and the service in front of it if `with_service`,
+        i.e., a realtime task. Return the pod name
+        """
         logger.info(
             f"[K8S commander] task_id [{task_id}] user_id[{user_id}] start with command [{command}]"
         )
@@ -100,24 +154,8 @@ class K8SCommand:
                 now_str = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
                 pod_name = f"{app_name}-{now_str}"
 
-                base_pod = PodGenerator(
-                    pod_template_file=self.pod_path
-                ).gen_pod(pod_name, app_name)
-                base_pod.metadata.namespace = "nm"
-
-                if os.getenv("API_RUN_LOCATION") == "minikube":
-                    base_pod.spec.containers[
-                        0
-                    ].image = f"{os.getenv('PRODUCT_PREFIX')}-dev-backend-local:minikube"
-                else:
-                    CONTAINER_REG_FACTORY = (
-                        ContainerRegistryFactory.make_concrete()
-                    )
-                    base_pod.spec.containers[
-                        0
-                    ].image = CONTAINER_REG_FACTORY.get_backend_container_image_url(
-                        os.getenv("IMAGE_TAG", "latest")
-                    )
+                self.set_pod_template_image()
+                base_pod = self.gen_pod(pod_name, app_name)
 
                 # assign resource limit
                 computation_type = (
@@ -203,17 +241,15 @@ class K8SCommand:
                 self.nm_pod_launcher.run_pod_async(base_pod)
 
                 # -------------
-                # create k8s service
+                # create k8s service, only the realtime task serves requests
                 # -------------
 
-                nm_service = ServiceGenerator(
-                    k8s_service_template_file=self.service_path
-                ).gen_service(app_name)
-                nm_service.spec.ports[0].target_port = int(
-                    API_SETTING.REALTIME_NM_ENDPOINT_PORT
-                )
-
-                self.k8s_service_launcher.put_service_async(nm_service)
+                if with_service:
+                    nm_service = self.gen_service(app_name)
+                    nm_service.spec.ports[0].target_port = int(
+                        API_SETTING.REALTIME_NM_ENDPOINT_PORT
+                    )
+                    self.k8s_service_launcher.put_service_async(nm_service)
 
                 return pod_name
 
@@ -230,18 +266,11 @@ class K8SCommand:
             f"[K8S commander] stop pod [{pod_name}] (pod name in a format of nm-pod-[user-id]-[task-id]-[task-created-time])"
         )
 
-        base_pod = PodGenerator(pod_template_file=self.pod_path).gen_pod(
-            pod_name, app_name
-        )
-        base_pod.metadata.namespace = "nm"
-        self.nm_pod_launcher.delete_pod(base_pod)
+        self.nm_pod_launcher.delete_pod(self.gen_pod(pod_name, app_name))
 
     def delete_nm_task_service(self, app_name: str) -> None:
         logger.info(
             f"[K8S commander] stop service [{app_name}] (app name in a format of nm-[user-id]-[task-id])"
         )
         # Delete K8S service
-        nm_service = ServiceGenerator(
-            k8s_service_template_file=self.service_path
-        ).gen_service(app_name)
-        self.k8s_service_launcher.delete_service(nm_service)
+        self.k8s_service_launcher.delete_service(self.gen_service(app_name))
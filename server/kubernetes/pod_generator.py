@@ -7,6 +7,10 @@ from server.kubernetes.base_generator import BaseGenerator
 
 MAX_LABEL_LEN = 63
 
+# the label of all the name matching task pods, the housekeeper lists and watches them
+TASK_POD_LABEL_KEY = "component"
+TASK_POD_LABEL_VALUE = "nm-task"
+
 
 class PodGenerator(BaseGenerator):
     """
@@ -47,7 +51,10 @@ class PodGenerator(BaseGenerator):
         result = self.ud_pod
 
         result.metadata.name = pod_name
-        result.metadata.labels = {"app": app_name}
+        result.metadata.labels = {
+            "app": app_name,
+            TASK_POD_LABEL_KEY: TASK_POD_LABEL_VALUE,
+        }
         return result
 
     # def gen_pod(self, unique_pod_name: str = None) -> k8s.V1Pod:
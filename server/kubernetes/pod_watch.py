@@ -0,0 +1,88 @@
+"""
+List + watch of the name matching task pods
+
+The housekeeper lists the task pods once, then follows the changes from the
+resourceVersion of the list, instead of reading every running pod periodically.
+`PodWatchSource` is the interface, so that a fake source can replay the events in
+tests
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from kubernetes import watch
+from kubernetes.client import CoreV1Api
+from kubernetes.client import models as k8s
+from kubernetes.client.rest import ApiException
+
+from server.kubernetes.pod_generator import (
+    TASK_POD_LABEL_KEY,
+    TASK_POD_LABEL_VALUE,
+)
+
+TASK_POD_NAMESPACE = "nm"
+TASK_POD_LABEL_SELECTOR = f"{TASK_POD_LABEL_KEY}={TASK_POD_LABEL_VALUE}"
+
+
+class PodWatchSource(ABC):
+    @abstractmethod
+    def list_pods(self) -> Tuple[List[k8s.V1Pod], str]:
+        """List the pods, and the resourceVersion to start the watch from"""
+        pass
+
+    @abstractmethod
+    def watch_pods(
+        self, resource_version: str, timeout_seconds: int
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the events, {"type": ADDED|MODIFIED|DELETED, "object": V1Pod}, after the
+        resourceVersion, until the timeout. Raise ApiException 410 if the resourceVersion
+        is too old
+        """
+        pass
+
+    @abstractmethod
+    def read_pod(self, pod_name: str) -> Optional[k8s.V1Pod]:
+        """Read a pod by name, None if it does not exist"""
+        pass
+
+
+class KubePodWatchSource(PodWatchSource):
+    """Watch the task pods in the K8S cluster"""
+
+    def __init__(
+        self,
+        kube_client: CoreV1Api,
+        namespace: str = TASK_POD_NAMESPACE,
+        label_selector: str = TASK_POD_LABEL_SELECTOR,
+    ) -> None:
+        self.kube_client = kube_client
+        self.namespace = namespace
+        self.label_selector = label_selector
+
+    def list_pods(self) -> Tuple[List[k8s.V1Pod], str]:
+        pod_list = self.kube_client.list_namespaced_pod(
+            self.namespace, label_selector=self.label_selector
+        )
+        return pod_list.items, pod_list.metadata.resource_version
+
+    def watch_pods(
+        self, resource_version: str, timeout_seconds: int
+    ) -> Iterator[Dict[str, Any]]:
+        yield from watch.Watch().stream(
+            self.kube_client.list_namespaced_pod,
+            self.namespace,
+            label_selector=self.label_selector,
+            resource_version=resource_version,
+            timeout_seconds=timeout_seconds,
+        )
+
+    def read_pod(self, pod_name: str) -> Optional[k8s.V1Pod]:
+        try:
+            return self.kube_client.read_namespaced_pod(
+                name=pod_name, namespace=self.namespace
+            )
+        except ApiException as e:
+            if e.status == 404:
+                return None
+            raise
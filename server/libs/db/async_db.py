@@ -0,0 +1,89 @@
+"""
+Async DB access for the hot read endpoints. It uses `databases` (asyncpg) with
+SQLAlchemy core queries built from the same models, alongside the sync session in `db`.
+
+Example:
+```
+task = await NM_TASK_ASYNC_CRUD.get_task(task_id)
+```
+"""
+
+from typing import Any, Callable, Optional
+
+from databases import Database
+from starlette.concurrency import run_in_threadpool
+
+from server.libs.db.sqlalchemy import database_url, db
+from server.settings import API_SETTING
+
+async_db = Database(
+    database_url,
+    min_size=API_SETTING.DB_ASYNC_POOL_MIN_SIZE,
+    max_size=API_SETTING.DB_ASYNC_POOL_MAX_SIZE,
+)
+
+# the listing queries read the replica, the same as `db.read_session`
+async_read_db: Optional[Database] = None
+if API_SETTING.SQLALCHEMY_DATABASE_REPLICA_URL:
+    async_read_db = Database(
+        API_SETTING.SQLALCHEMY_DATABASE_REPLICA_URL,
+        min_size=API_SETTING.DB_ASYNC_POOL_MIN_SIZE,
+        max_size=API_SETTING.DB_ASYNC_POOL_MAX_SIZE,
+    )
+
+
+def is_async_db_available() -> bool:
+    return API_SETTING.DB_ASYNC_ENABLED and async_db.is_connected
+
+
+def get_read_db() -> Database:
+    """
+    Return the replica, or the primary if there is no replica or the request has committed
+    """
+    if async_read_db is None or not async_read_db.is_connected or db.committed:
+        return async_db
+    return async_read_db
+
+
+def run_with_session(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a sync CRUD method. Open a session if the caller is not in a request session
+    """
+    if db.has_session:
+        return func(*args, **kwargs)
+    with db():
+        return func(*args, **kwargs)
+
+
+class AsyncCRUDProxy:
+    """Async CRUD entry of an app
+
+    The methods are from the native async CRUD when the async DB is connected.
+    Otherwise, e.g., DB_ASYNC_ENABLED is false or in a worker process which never connects
+    the async DB, the same method of the sync CRUD runs in threadpool
+    """
+
+    def __init__(self, async_crud: Any, sync_crud: Any):
+        self.async_crud = async_crud
+        self.sync_crud = sync_crud
+
+    def __getattr__(self, name: str) -> Callable:
+        if is_async_db_available():
+            return getattr(self.async_crud, name)
+
+        sync_method = getattr(self.sync_crud, name)
+
+        async def run_sync_method(*args: Any, **kwargs: Any) -> Any:
+            return await run_in_threadpool(
+                run_with_session, sync_method, *args, **kwargs
+            )
+
+        return run_sync_method
+
+
+def record_to_po(model: Any, record: Any) -> Any:
+    """
+    Build a transient model object from a fetched record, so that the existing
+    po -> do converters are reused
+    """
+    return model(**dict(record))
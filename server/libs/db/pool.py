@@ -0,0 +1,131 @@
+"""
+Connection pool of the sync SQLAlchemy engine, with Prometheus metrics
+
+- db_pool_checkout_wait_seconds: time to get a connection from the pool,
+  including the time to open a new one
+- db_pool_checked_out / db_pool_saturation: connections in use, and in use over
+  the pool capacity (pool_size + max_overflow). 1 means the next checkout waits
+- db_pool_checkout_timeout_total: checkouts which waited DB_POOL_TIMEOUT and failed
+
+The metrics are labelled by `engine`, "primary" or "replica", set by
+`setup_pool_events` when the engine is created
+"""
+
+import os
+import time
+from typing import Any, Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool, QueuePool
+
+from server.settings import API_SETTING
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the DB pool, in seconds",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+POOL_CHECKOUT_TIMEOUT = Counter(
+    "db_pool_checkout_timeout_total",
+    "DB pool checkouts failed by timeout",
+    ["engine"],
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "DB connections currently checked out from the pool",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+POOL_SATURATION = Gauge(
+    "db_pool_saturation",
+    "DB connections checked out over the pool capacity",
+    ["engine"],
+    multiprocess_mode="max",
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool which reports the checkout wait time and the pool saturation"""
+
+    engine_name = "primary"
+
+    def _do_get(self) -> Any:
+        begin = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUT.labels(self.engine_name).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.labels(self.engine_name).observe(
+                time.perf_counter() - begin
+            )
+        self.report_usage()
+        return conn
+
+    def _do_return_conn(self, conn: Any) -> None:
+        super()._do_return_conn(conn)
+        self.report_usage()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        # `engine.dispose()` replaces the pool, which keeps the label
+        pool = super().recreate()
+        pool.engine_name = self.engine_name
+        return pool
+
+    def capacity(self) -> int:
+        return self.size() + max(self._max_overflow, 0)
+
+    def report_usage(self) -> None:
+        checked_out = self.checkedout()
+        POOL_CHECKED_OUT.labels(self.engine_name).set(checked_out)
+        POOL_SATURATION.labels(self.engine_name).set(
+            checked_out / max(self.capacity(), 1)
+        )
+
+
+def gen_engine_args(use_null_pool: bool) -> Dict[str, Any]:
+    """
+    Generate the `create_engine` arguments of the pool from API_SETTING
+    """
+    if use_null_pool:
+        return {"poolclass": NullPool}
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": API_SETTING.DB_POOL_SIZE,
+        "max_overflow": API_SETTING.DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": API_SETTING.DB_POOL_TIMEOUT,
+        "pool_recycle": API_SETTING.DB_POOL_RECYCLE,
+        "pool_pre_ping": API_SETTING.DB_POOL_PRE_PING,
+    }
+
+
+def setup_pool_events(engine: Engine, engine_name: str = "primary") -> None:
+    """
+    Label the pool metrics of the engine by `engine_name`
+
+    A pooled connection is never shared by a forked process, e.g., the RQ work horse.
+    The child process drops the inherited connection and opens its own
+    """
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.engine_name = engine_name
+        engine.pool.report_usage()
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        connection_record.info["pid"] = os.getpid()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(
+        dbapi_connection: Any, connection_record: Any, connection_proxy: Any
+    ) -> None:
+        pid = os.getpid()
+        if connection_record.info["pid"] != pid:
+            connection_record.connection = connection_proxy.connection = None
+            raise exc.DisconnectionError(
+                f"Connection record belongs to pid {connection_record.info['pid']}, attempting to check out in pid {pid}"
+            )
@@ -2,12 +2,11 @@ import os
 from contextvars import ContextVar
 from typing import Any, Dict, Optional, Union
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
 from sqlalchemy.engine.url import URL
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import NullPool
 from starlette.middleware.base import (
     BaseHTTPMiddleware,
     RequestResponseEndpoint,
@@ -16,6 +15,7 @@ from starlette.requests import Request
 from starlette.types import ASGIApp
 
 from server.core.exception import EXCEPTION_LIB
+from server.libs.db.pool import gen_engine_args, setup_pool_events
 from server.settings import API_SETTING
 
 Base = declarative_base()
@@ -24,25 +24,30 @@ print("sqlalchemy check: API_RUN_LOCATION", os.getenv("API_RUN_LOCATION"))
 
 if os.getenv("API_RUN_LOCATION") == "test":
     # run pytest
-    engine = create_engine(
-        API_SETTING.SQLALCHEMY_DATABASE_PYTEST_URL, poolclass=NullPool
-    )
+    database_url = API_SETTING.SQLALCHEMY_DATABASE_PYTEST_URL
 elif os.environ.get("API_RUN_LOCATION") == "local":
     # local hosting
-    engine = create_engine(
-        API_SETTING.SQLALCHEMY_DATABASE_LOCAL_URL,
-        poolclass=NullPool,
-    )
+    database_url = API_SETTING.SQLALCHEMY_DATABASE_LOCAL_URL
 elif os.environ.get("API_RUN_LOCATION") == "minikube":
     # local hosting
-    engine = create_engine(
-        API_SETTING.SQLALCHEMY_DATABASE_MINIKUBE_URL,
-        poolclass=NullPool,
-    )
+    database_url = API_SETTING.SQLALCHEMY_DATABASE_MINIKUBE_URL
 else:
     # deploy on cloud environment. dev/staging/pre-prod/prod
-    engine = create_engine(API_SETTING.SQLALCHEMY_DATABASE_URL)
+    database_url = API_SETTING.SQLALCHEMY_DATABASE_URL
 
+engine = create_engine(
+    database_url, **gen_engine_args(API_SETTING.DB_POOL_NULL)
+)
+setup_pool_events(engine, "primary")
+
+# read-only listing queries go to the replica if SQLALCHEMY_DATABASE_REPLICA_URL is set
+replica_engine: Optional[Engine] = None
+if API_SETTING.SQLALCHEMY_DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        API_SETTING.SQLALCHEMY_DATABASE_REPLICA_URL,
+        **gen_engine_args(API_SETTING.DB_POOL_NULL),
+    )
+    setup_pool_events(replica_engine, "replica")
 
 session_args = {
     "autocommit": False,
@@ -50,8 +55,57 @@ session_args = {
     "expire_on_commit": False,
 }
 
+
+class LazySession:
+    """Session holder of a `db` context. The session is created on the first
+    `db.session` access, so a request which never touches DB never checks out
+    a connection. The holder is shared by reference with the threadpool, which
+    copies the context, so a session created there is closed by the context owner
+
+    The read session on the replica is created on the first `db.read_session` access.
+    Once the primary session commits, `db.read_session` returns the primary session
+    for the rest of the context, so the request reads its own writes
+    """
+
+    def __init__(self, session_args: Dict):
+        self.session_args = session_args
+        self.session: Optional[Session] = None
+        self.read_session: Optional[Session] = None
+        self.committed = False
+
+    def get(self) -> Session:
+        if self.session is None:
+            self.session = _Session(**self.session_args)  # type: ignore
+            event.listen(self.session, "after_commit", self.on_commit)
+        return self.session
+
+    def get_read(self) -> Session:
+        if _ReadSession is None or self.committed:
+            return self.get()
+        if self.read_session is None:
+            self.read_session = _ReadSession(**self.session_args)
+        return self.read_session
+
+    def on_commit(self, session: Session) -> None:
+        self.committed = True
+
+    def close(self, rollback: bool, commit: bool) -> None:
+        if self.read_session is not None:
+            self.read_session.close()
+
+        if self.session is not None:
+            if rollback:
+                self.session.rollback()
+            if commit:
+                self.session.commit()
+            self.session.close()
+
+
 _Session: sessionmaker = None
-_session: ContextVar[Optional[Session]] = ContextVar("_session", default=None)
+_ReadSession: Optional[sessionmaker] = None
+_session: ContextVar[Optional[LazySession]] = ContextVar(
+    "_session", default=None
+)
 
 
 class DBSessionMiddleware(BaseHTTPMiddleware):
@@ -63,9 +117,10 @@ class DBSessionMiddleware(BaseHTTPMiddleware):
         engine_args: Dict = None,
         session_args: Dict = None,
         commit_on_exit: bool = False,
+        read_engine: Optional[Engine] = None,
     ):
         super().__init__(app)
-        global _Session
+        global _Session, _ReadSession
         engine_args = engine_args or {}
         self.commit_on_exit = commit_on_exit
 
@@ -79,6 +134,8 @@ class DBSessionMiddleware(BaseHTTPMiddleware):
         else:
             engine = custom_engine
         _Session = sessionmaker(bind=engine, **session_args)
+        if read_engine is not None:
+            _ReadSession = sessionmaker(bind=read_engine, **session_args)
 
     async def dispatch(
         self, request: Request, call_next: RequestResponseEndpoint
@@ -91,9 +148,8 @@ class DBSessionMiddleware(BaseHTTPMiddleware):
 class DBSessionMeta(type):
     # using this metaclass means that we can access db.session as a property at a class level,
     # rather than db().session
-    @property
-    def session(self) -> Session:
-        """Return an instance of Session local to the current async context."""
+    @staticmethod
+    def _get_lazy_session() -> LazySession:
         if _Session is None:
             raise EXCEPTION_LIB.DB__SQLALCHEMY_SESSION_NOT_INIT_ERR.value(
                 """
@@ -102,8 +158,8 @@ class DBSessionMeta(type):
         """
             )
 
-        session = _session.get()
-        if session is None:
+        lazy_session = _session.get()
+        if lazy_session is None:
             raise EXCEPTION_LIB.DB__SQLALCHEMY_MISSING_SESSION_ERR.value(
                 """
         No session found! Either you are not currently in a request context,
@@ -114,7 +170,31 @@ class DBSessionMeta(type):
         """
             )
 
-        return session
+        return lazy_session
+
+    @property
+    def session(self) -> Session:
+        """Return an instance of Session local to the current async context."""
+        return self._get_lazy_session().get()
+
+    @property
+    def read_session(self) -> Session:
+        """Return a Session for read-only queries local to the current async context.
+        It's on the replica, or the primary session if there is no replica or the
+        primary session has committed in this context
+        """
+        return self._get_lazy_session().get_read()
+
+    @property
+    def has_session(self) -> bool:
+        """Return if there is a session context in the current async context."""
+        return _session.get() is not None
+
+    @property
+    def committed(self) -> bool:
+        """Return if the session has committed in the current async context."""
+        lazy_session = _session.get()
+        return lazy_session is not None and lazy_session.committed
 
 
 class DBSession(metaclass=DBSessionMeta):
@@ -131,19 +211,17 @@ class DBSession(metaclass=DBSessionMeta):
         attempting database access.
         """
             )
-        self.token = _session.set(_Session(**self.session_args))  # type: ignore
+        self.token = _session.set(LazySession(self.session_args))  # type: ignore
         return type(self)
 
     def __exit__(self, exc_type, exc_value, traceback) -> Any:  # type: ignore
-        sess = _session.get()
-        if exc_type is not None:
-            sess.rollback()  # type: ignore
-
-        if self.commit_on_exit:
-            sess.commit()  # type: ignore
-
-        sess.close()  # type: ignore
-        _session.reset(self.token)  # type: ignore
+        lazy_session = _session.get()
+        try:
+            lazy_session.close(  # type: ignore
+                rollback=exc_type is not None, commit=self.commit_on_exit
+            )
+        finally:
+            _session.reset(self.token)  # type: ignore
 
 
 db: DBSessionMeta = DBSession
@@ -0,0 +1,3 @@
+from server.libs.http.client_pool import RT_HTTP_CLIENT_POOL
+
+__all__ = ["RT_HTTP_CLIENT_POOL"]
@@ -0,0 +1,118 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Set
+
+import httpx
+
+from server.settings import API_SETTING
+
+
+class AsyncHttpClientPool:
+    """A pool of keep-alive async http clients, one client per base url
+
+    Each client keeps its own connection pool, so requests to the same pod
+    reuse the TCP connection instead of paying a new connection and DNS lookup.
+
+    A client is evicted from the pool on a connection error, e.g., the pod is gone,
+    but it is only closed once the other requests to the same pod stop using it
+
+    Example:
+    ```
+    async with RT_HTTP_CLIENT_POOL.use_client("http://nm-1-2.nm.svc") as client:
+        r = await client.get("/api/v1/nm-realtime", params={"q": ["Zhe Sun"]})
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        connect_timeout: float,
+        timeout: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+    ):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        # client -> number of requests using it
+        self.nr_users: Dict[httpx.AsyncClient, int] = {}
+        # evicted clients still in use, closed by their last user
+        self.evicted: Set[httpx.AsyncClient] = set()
+
+    def get_client(self, base_url: str) -> httpx.AsyncClient:
+        """
+        Get the client of a base url. Create one if it does not exist yet
+        """
+        client = self.clients.get(base_url)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=base_url, timeout=self.timeout, limits=self.limits
+            )
+            self.clients[base_url] = client
+        return client
+
+    def acquire_client(self, base_url: str) -> httpx.AsyncClient:
+        """
+        Get the client of a base url for a request. Call `release_client` when
+        the request is done, e.g., after a streamed response is consumed
+        """
+        client = self.get_client(base_url)
+        self.nr_users[client] = self.nr_users.get(client, 0) + 1
+        return client
+
+    async def release_client(self, client: httpx.AsyncClient) -> None:
+        # the counts are cleared if the pool is closed during the request
+        nr_users = self.nr_users.get(client, 0) - 1
+        if nr_users > 0:
+            self.nr_users[client] = nr_users
+            return
+        self.nr_users.pop(client, None)
+        if client in self.evicted:
+            self.evicted.remove(client)
+            await client.aclose()
+
+    @asynccontextmanager
+    async def use_client(
+        self, base_url: str
+    ) -> AsyncIterator[httpx.AsyncClient]:
+        client = self.acquire_client(base_url)
+        try:
+            yield client
+        finally:
+            await self.release_client(client)
+
+    async def evict_client(self, base_url: str) -> None:
+        """
+        Remove the client of a base url from the pool, e.g., the pod behind it is
+        gone. The next request gets a new client. The client is closed once no
+        request uses it
+        """
+        client = self.clients.pop(base_url, None)
+        if client is None:
+            return
+        if self.nr_users.get(client, 0) > 0:
+            self.evicted.add(client)
+        else:
+            await client.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Close all clients, including the evicted ones still in use. Called when
+        the application shuts down
+        """
+        clients = list(self.clients.values()) + list(self.evicted)
+        self.clients.clear()
+        self.evicted.clear()
+        self.nr_users.clear()
+        for client in clients:
+            await client.aclose()
+
+
+RT_HTTP_CLIENT_POOL = AsyncHttpClientPool(
+    connect_timeout=API_SETTING.REALTIME_NM_PROXY_CONNECT_TIMEOUT,
+    timeout=API_SETTING.REALTIME_NM_PROXY_TIMEOUT,
+    max_connections=API_SETTING.REALTIME_NM_PROXY_MAX_CONNECTIONS,
+    max_keepalive_connections=API_SETTING.REALTIME_NM_PROXY_MAX_KEEPALIVE_CONNECTIONS,
+)
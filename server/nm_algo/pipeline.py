@@ -1,5 +1,5 @@
 import gc
-from typing import Any, List, Union
+from typing import Any, List, Optional, Union
 
 import pandas as pd
 from pandas.core.frame import DataFrame
@@ -258,39 +258,33 @@ class NameMatchingRealtime(NameMatchingBase):
             expected_type=AbcXyz_TYPE.NAME_MATCHING_REALTIME,
         )
 
-    def execute(self, query_l: List[str]) -> DataFrame:
+    def execute(
+        self,
+        query_l: List[str],
+        search_option: Optional[schemas.SearchOption] = None,
+    ) -> DataFrame:
         """
         Trigger the matching action
-        """
 
-        # N.B. Here we get the latest task configuration
-        # then, we check if we need to choose a new matcher and re-run the groudtruth pipeline
+        Input:
+          - query_l: a list of query string
+          - search_option: the search option of this query. If None, the search option
+            stored in the task configuration is used
+
+        N.B. the task configuration is loaded once when the real-time process starts,
+        and only the search option can change between queries. The search option comes
+        with the query request, so we don't need to read the task from DB for each query
+        """
         logger.info("start matching")
-        logger.info(self.nm_task)
-        nm_task = NM_TASK_CRUD.get_task(self.nm_task_id)
-        logger.info("Retrieve nm_task")
 
-        if nm_task is None:
-            logger.info("TASK__CURRENT_TASK_NOT_EXIST")
-            logger.info(self.nm_cfg)
-            raise EXCEPTION_LIB.TASK__CURRENT_TASK_NOT_EXIST.value(
-                f"The name matching task_id {self.nm_task_id} does not exist"
+        curr_nm_cfg = self.nm_cfg
+        if search_option is not None:
+            curr_nm_cfg = self.nm_cfg.copy(
+                update={"search_option": search_option}
             )
-        curr_nm_cfg = nm_task.ext_info
-
-        force_flag = self.update_matcher(curr_nm_cfg)
-        self.run_gt_pipeline(curr_nm_cfg, force=force_flag)
-        mem_usage_in_byte(logger, "complete run_gt_pipeline")
 
         nm_name_series = pd.Series(query_l)
         result = self.transform(curr_nm_cfg, nm_name_series)
         mem_usage_in_byte(logger, "complete matching")
 
-        # update the nm_cfg by the latest nm_cfg
-        self.nm_cfg = curr_nm_cfg
-
-        # ----- free memory explictly ----
-        mem_usage_in_byte(logger, "final usage for this search round")
-        # ---------------------------------
-
         return result
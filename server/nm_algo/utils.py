@@ -1,4 +1,3 @@
-import datetime
 import logging
 import subprocess
 import uuid
@@ -65,9 +64,7 @@ def save_result(task_id: int, user_id: int, result: DataFrame) -> None:
             media_type=MEDIA_CONTENT_TYPE.CSV,
         ),
     )
-    task_do.ext_info.matching_result = matching_result  # type: ignore
-    task_do.updated_at = datetime.datetime.utcnow()
-    NM_TASK_CRUD.update_task(task_id, task_do)
+    NM_TASK_CRUD.update_task_matching_result(task_id, matching_result)
 
 
 def mem_usage_in_byte(logger: logging.Logger, info: str = "") -> None:
@@ -1,11 +1,12 @@
 import os
 import secrets
+from typing import Optional
 
 from pydantic import (  # AnyHttpUrl,; EmailStr,; HttpUrl,; PostgresDsn,; validator,
     BaseSettings,
 )
 
-from server.settings.global_sys_config import GLOBAL_CONFIG
+from server.settings.global_sys_config import EXECUTOR, GLOBAL_CONFIG
 
 
 # Copy from https://github.com/tiangolo/full-stack-fastapi-postgresql/blob/490c554e23343eec0736b06e59b2108fdd057fdc/%7B%7Bcookiecutter.project_slug%7D%7D/backend/app/app/core/config.py
@@ -58,6 +59,23 @@ class APISettings(BaseSettings):
         "postgresql://postgres:postgres@db/postgres"
     )
     # SQLALCHEMY_DATABASE_TEST_URL = "postgresql://postgres:postgres@db/test_nm"
+    # read replica of the listing queries. Empty to read from the primary only
+    SQLALCHEMY_DATABASE_REPLICA_URL: str = ""
+
+    # sync DB connection pool. Set by env per environment. pytest uses NullPool,
+    # so no idle connection blocks dropping the test DB
+    DB_POOL_NULL: bool = os.getenv("API_RUN_LOCATION") == "test"
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # async DB access of the hot read endpoints. If disabled or not connected,
+    # the async CRUD falls back to the sync CRUD in threadpool
+    DB_ASYNC_ENABLED: bool = True
+    DB_ASYNC_POOL_MIN_SIZE: int = 1
+    DB_ASYNC_POOL_MAX_SIZE: int = 10
 
     REDIS_DNS_LOCAL = "rq_redis"
     REDIS_DNS_ECS = "localhost"
@@ -79,6 +97,35 @@ class APISettings(BaseSettings):
     )
     REALTIME_NM_ENDPOINT_PORT = "8002"
 
+    # concurrent tasks of each RQ queue in ECS and docker-compose mode. The queue
+    # needs as many `rq worker` processes. The realtime task of slot i listens to
+    # the port REALTIME_NM_ENDPOINT_PORT + i
+    RQ_BATCH_WORKER_SLOTS: int = 1
+    RQ_REALTIME_WORKER_SLOTS: int = 1
+
+    # fork the task processes from a parent with the heavy modules preloaded,
+    # instead of a new interpreter per task. See `server.compute.zygote`
+    TASK_FORK_ENABLED: bool = True
+
+    # the executor of the nm tasks, see `server.executors`. By default, it's
+    # KubernetesExecutor in K8S, LocalExecutor in test, and RQExecutor otherwise
+    TASK_EXECUTOR: Optional[EXECUTOR] = None
+    # concurrent tasks of LocalExecutor
+    LOCAL_EXECUTOR_MAX_TASKS: int = 4
+    # threads of KubernetesExecutor which create the pods and services of tasks
+    K8S_LAUNCHER_WORKERS: int = 4
+    # a task still in PREPARING without a run record after this is failed by the
+    # housekeeper, as its launch was lost with the API pod
+    K8S_PREPARING_TIMEOUT: int = 600  # seconds
+
+    # the http client pool from backend to real-time matching pods
+    REALTIME_NM_PROXY_CONNECT_TIMEOUT: float = 2.0
+    REALTIME_NM_PROXY_TIMEOUT: float = 30.0
+    REALTIME_NM_PROXY_MAX_CONNECTIONS: int = 50
+    REALTIME_NM_PROXY_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    # a real-time bulk query is matched and streamed back in chunks of this size
+    REALTIME_NM_BULK_CHUNK_SIZE: int = 500
+
     # How OAUTH2_GITHUB_CLIENT_ID and OAUTH2_GITHUB_CLIENT_SECRET set:
     # - setup in AWS secret manager
     # - in EKS version, load from secret manager and set in ENV
@@ -107,6 +154,22 @@ class APISettings(BaseSettings):
     X_RAPIDAPI_PROXY_SECRET: str = os.getenv(
         "RAPIDAPI_PROXY_SECRET", secrets.token_urlsafe(32)
     )
+    # UserDO cache of the authentication. Backend "local" or "redis"
+    USER_CACHE_BACKEND: str = "local"
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: int = 60  # seconds
+
+    # dataset access decision cache in each backend process
+    DATASET_ACCESS_CACHE_SIZE: int = 10000
+    DATASET_ACCESS_CACHE_TTL: int = 10  # seconds
+
+    # real-time task pod route cache in each backend process
+    RT_TASK_ROUTE_CACHE_SIZE: int = 10000
+    RT_TASK_ROUTE_CACHE_TTL: int = 300  # seconds
+
+    # RapidAPI sanction search results cache in each backend process
+    RAPIDAPI_RESULT_CACHE_SIZE: int = 10000
+    RAPIDAPI_RESULT_CACHE_TTL: int = 600  # seconds
 
     # @validator("SQLALCHEMY_DATABASE_URI", pre=True)
     # def assemble_db_connection(
@@ -0,0 +1,165 @@
+"""
+Dynamic settings, which are changed at runtime without a redeploy
+
+The values are SSM parameters. The housekeeper reads them by one batched
+`get_parameters` call, and only when a value differs from the redis hash
+`DYNAMIC_SETTING_KEY`, it writes the hash and publishes the changed values to
+`DYNAMIC_SETTING_CHANNEL`.
+
+An API process loads the hash once at startup and applies the published changes in
+a daemon thread. A lookup is a dict read, there is no network call per request.
+When the connection breaks, the thread subscribes again and reloads the hash, so
+the changes published while it was disconnected are not lost
+"""
+
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import redis
+
+from server.settings.logger import api_logger as logger
+
+DYNAMIC_SETTING_KEY = "dynamic-settings"
+DYNAMIC_SETTING_CHANNEL = "dynamic-setting-channel"
+
+# names of the dynamic settings
+DEMO_ACCOUNT_LIMITATION = "DEMO_ACCOUNT_LIMITATION"
+RAPIDAPI_SANCTION_TASK_ID = "RAPIDAPI_SANCTION_TASK_ID"
+
+# a blocked read of the channel wakes up to check if the listener is stopped
+DYNAMIC_SETTING_LISTEN_TIMEOUT_SECONDS = 1.0
+DYNAMIC_SETTING_RECONNECT_SECONDS = 5.0
+
+# dynamic setting name -> name of its SSM parameter, see `id_gen`
+DYNAMIC_SETTING_SSM_PARAMETERS = {
+    DEMO_ACCOUNT_LIMITATION: "ssm-demo-account-limitation",
+    RAPIDAPI_SANCTION_TASK_ID: "rapidapi-sanction-task-id",
+}
+
+
+class DynamicSetting:
+    def __init__(self) -> None:
+        self.values: Dict[str, str] = {}
+        self.callbacks: Dict[str, List[Callable[[str], None]]] = {}
+        self.listener: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def get(self, name: str) -> Optional[str]:
+        return self.values.get(name)
+
+    def on_change(self, name: str, callback: Callable[[str], None]) -> None:
+        """
+        Call `callback(new_value)` when the setting changes
+        """
+        self.callbacks.setdefault(name, []).append(callback)
+
+    def apply(self, values: Dict[str, str]) -> None:
+        with self._lock:
+            changes = {
+                k: v for k, v in values.items() if self.values.get(k) != v
+            }
+            # copy on write, the readers never see a half applied change
+            self.values = {**self.values, **changes}
+
+        for name, value in changes.items():
+            logger.info(f"dynamic setting [{name}] changes to [{value}]")
+            for callback in self.callbacks.get(name, []):
+                callback(value)
+
+    def load(self, redis_conn: redis.Redis) -> None:
+        values = redis_conn.hgetall(DYNAMIC_SETTING_KEY)
+        self.apply(
+            {k.decode("utf-8"): v.decode("utf-8") for k, v in values.items()}
+        )
+
+    def on_message(self, message: dict) -> None:
+        self.apply(json.loads(message["data"]))
+
+    def subscribe(self, redis_conn: redis.Redis) -> Any:
+        """
+        Subscribe the changes, then load the settings
+
+        It subscribes before loading, so a change published in between is not lost
+        """
+        pubsub = redis_conn.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(DYNAMIC_SETTING_CHANNEL)
+            self.load(redis_conn)
+        except Exception:
+            pubsub.close()
+            raise
+        return pubsub
+
+    def listen(self, redis_conn: redis.Redis, pubsub: Optional[Any]) -> None:
+        """
+        Apply the published changes until stopped. A broken connection is
+        subscribed and loaded again after `DYNAMIC_SETTING_RECONNECT_SECONDS`
+        """
+        while not self._stopped.is_set():
+            try:
+                if pubsub is None:
+                    pubsub = self.subscribe(redis_conn)
+                    logger.info("dynamic setting listener reconnected")
+                message = pubsub.get_message(
+                    timeout=DYNAMIC_SETTING_LISTEN_TIMEOUT_SECONDS
+                )
+                if message is not None and message["type"] == "message":
+                    self.on_message(message)
+            except Exception as e:
+                logger.error(
+                    f"DYNAMIC_SETTING__LISTENER_ERROR: reconnect in [{DYNAMIC_SETTING_RECONNECT_SECONDS}]s. error [{e!r}]"
+                )
+                if pubsub is not None:
+                    pubsub.close()
+                    pubsub = None
+                self._stopped.wait(DYNAMIC_SETTING_RECONNECT_SECONDS)
+
+        if pubsub is not None:
+            pubsub.close()
+
+    def start_listener(self, redis_conn: redis.Redis) -> None:
+        """
+        Load the settings, and subscribe the changes in a daemon thread
+        """
+        if self.listener is not None:
+            return
+        pubsub = self.subscribe(redis_conn)
+        self._stopped.clear()
+        self.listener = threading.Thread(
+            target=self.listen,
+            args=(redis_conn, pubsub),
+            name="dynamic-setting-listener",
+            daemon=True,
+        )
+        self.listener.start()
+
+    def stop_listener(self) -> None:
+        if self.listener is not None:
+            self._stopped.set()
+            self.listener.join(
+                timeout=DYNAMIC_SETTING_LISTEN_TIMEOUT_SECONDS * 2
+            )
+            self.listener = None
+
+
+def publish_dynamic_settings(
+    redis_conn: redis.Redis, values: Dict[str, str]
+) -> Dict[str, str]:
+    """
+    Write and publish the settings which differ from redis, return the changed ones
+    """
+    current_values = {
+        k.decode("utf-8"): v.decode("utf-8")
+        for k, v in redis_conn.hgetall(DYNAMIC_SETTING_KEY).items()
+    }
+    changes = {k: v for k, v in values.items() if current_values.get(k) != v}
+    if changes:
+        # the bundled redis stubs predate the `mapping` argument of redis-py 3.5
+        redis_conn.hset(DYNAMIC_SETTING_KEY, mapping=changes)  # type: ignore
+        redis_conn.publish(DYNAMIC_SETTING_CHANNEL, json.dumps(changes))
+    return changes
+
+
+DYNAMIC_SETTING = DynamicSetting()
@@ -41,6 +41,7 @@ class EXECUTOR(str, enum.Enum):
     CeleryExecutor = "CeleryExecutor"
     LocalExecutor = "LocalExecutor"
     KubernetesExecutor = "KubernetesExecutor"
+    RQExecutor = "RQExecutor"
 
 
 class KUBERNETES(BaseModel):
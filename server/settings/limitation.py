@@ -21,10 +21,12 @@ class LimitCompute(BaseModel):
     """
     LImitation for task
     - max_rt_nr_queries: max query string in real-time task
+    - max_rt_nr_bulk_queries: max query string in a real-time task bulk query
     - max_running_task_nr: max running task in parallel
     """
 
     max_rt_nr_queries: int
+    max_rt_nr_bulk_queries: int
     max_running_task_nr: int
     max_running_api_call_per_month: int
 
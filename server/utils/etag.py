@@ -0,0 +1,99 @@
+"""
+HTTP conditional GET (ETag / If-None-Match) of the read-mostly endpoints
+
+- static content, e.g., the config defaults, is serialized once and tagged by the
+  hash of its body, see `StaticJSONResponse`
+- a DB resource is tagged by its version, e.g., id and `updated_at`, see
+  `gen_version_etag`. The endpoint compares it with `If-None-Match` and answers
+  304 before the resource is converted and serialized
+
+`Cache-Control: private, no-cache` lets the browser keep the response but always
+revalidate it, since the responses depend on the logged-in user
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from server.utils.wire_format import JSON_MEDIA_TYPE
+
+ETAG_HEADER = "ETag"
+IF_NONE_MATCH_HEADER = "If-None-Match"
+CACHE_CONTROL = "private, no-cache"
+
+
+def gen_etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def gen_version_etag(*parts: Any) -> str:
+    """
+    Weak ETag of a resource version, the representation is generated from it
+    """
+    version = ":".join(
+        p.isoformat() if hasattr(p, "isoformat") else str(p) for p in parts
+    )
+    return f'W/"{hashlib.sha1(version.encode("utf-8")).hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    If the `If-None-Match` of the request matches the ETag, by weak comparison
+    """
+    if_none_match = request.headers.get(IF_NONE_MATCH_HEADER)
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque_tag = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == opaque_tag:
+            return True
+    return False
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers[ETAG_HEADER] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def gen_not_modified_response(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
+
+
+def check_not_modified(
+    request: Request, response: Response, etag: str
+) -> Optional[Response]:
+    """
+    Return the 304 response if the client has the current version. Otherwise tag
+    the response of the endpoint and return None
+    """
+    if is_not_modified(request, etag):
+        return gen_not_modified_response(etag)
+    set_etag(response, etag)
+    return None
+
+
+class StaticJSONResponse(object):
+    """A JSON body serialized once, with the hash of the body as ETag"""
+
+    def __init__(self, content: Any) -> None:
+        self.body = json.dumps(
+            jsonable_encoder(content), separators=(",", ":")
+        ).encode("utf-8")
+        self.etag = gen_etag(self.body)
+
+    def to_response(self, request: Request) -> Response:
+        if is_not_modified(request, self.etag):
+            return gen_not_modified_response(self.etag)
+
+        response = Response(self.body, media_type=JSON_MEDIA_TYPE)
+        set_etag(response, self.etag)
+        return response
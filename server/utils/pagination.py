@@ -0,0 +1,149 @@
+"""
+Keyset pagination and sparse fieldsets of the list endpoints
+
+A page is ordered newest first by `(created_at, id)`. The cursor is the key of the
+last row of the previous page, so the next page is an index range scan instead of
+an OFFSET. The cursor of the next page is returned in the `X-Next-Cursor` header,
+the header is absent on the last page.
+
+`fields` picks the columns to return, e.g., `fields=id,name,nm_status`. The list
+is pushed down into the SELECT, so the heavy JSON columns are not read at all.
+`id` and `created_at` are always returned, they are the key of the page.
+"""
+
+import base64
+import binascii
+import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from fastapi import Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+
+from server.core.exception import EXCEPTION_LIB
+from server.settings.logger import api_logger as logger
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PAGE_MAX_LIMIT = 500
+PAGE_KEY_FIELDS = ["id", "created_at"]
+
+
+class Cursor(NamedTuple):
+    created_at: datetime.datetime
+    id: int
+
+
+class PageParams(object):
+    """Query parameters of a paginated list endpoint, used as a dependency"""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(
+            None,
+            ge=1,
+            le=PAGE_MAX_LIMIT,
+            description="Page size. All rows are returned if not given",
+        ),
+        cursor: Optional[str] = Query(
+            None, description=f"The {NEXT_CURSOR_HEADER} of the previous page"
+        ),
+        fields: Optional[str] = Query(
+            None, description="Comma separated fields to return"
+        ),
+    ) -> None:
+        self.limit = limit
+        self.cursor = decode_cursor(cursor) if cursor else None
+        self.fields = fields
+
+
+def encode_cursor(created_at: datetime.datetime, id: int) -> str:
+    raw = f"{created_at.isoformat()},{id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, id = raw.rsplit(",", 1)
+        return Cursor(datetime.datetime.fromisoformat(created_at), int(id))
+    except (binascii.Error, UnicodeError, ValueError):
+        logger.error(f"API__INVALID_PAGE_PARAM: invalid cursor {cursor}")
+        raise EXCEPTION_LIB.API__INVALID_PAGE_PARAM.value(
+            f"The cursor {cursor} is invalid. Please use the {NEXT_CURSOR_HEADER} header of the previous page."
+        )
+
+
+def parse_fields(
+    fields: Optional[str], allowed: Sequence[str]
+) -> Optional[List[str]]:
+    """
+    Parse the `fields` query parameter into a list of the allowed fields, in the
+    order of `allowed`. Return None if no fields are asked, i.e., the full rows
+    """
+    if not fields:
+        return None
+
+    asked = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = asked - set(allowed)
+    if unknown:
+        logger.error(f"API__INVALID_PAGE_PARAM: unknown fields {unknown}")
+        raise EXCEPTION_LIB.API__INVALID_PAGE_PARAM.value(
+            f"The fields {sorted(unknown)} are not supported. Please use the fields in {list(allowed)}."
+        )
+
+    asked.update(PAGE_KEY_FIELDS)
+    return [f for f in allowed if f in asked]
+
+
+def paginate(
+    query: Select,
+    created_at_col: Any,
+    id_col: Any,
+    limit: Optional[int] = None,
+    cursor: Optional[Cursor] = None,
+) -> Select:
+    """
+    Order a query newest first and restrict it to the page after the cursor
+    """
+    if cursor is not None:
+        query = query.where(
+            tuple_(created_at_col, id_col)
+            < tuple_(cursor.created_at, cursor.id)
+        )
+    query = query.order_by(None).order_by(created_at_col.desc(), id_col.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def set_next_cursor(
+    response: Response, items: List[Any], limit: Optional[int]
+) -> None:
+    """
+    Set the cursor of the next page if the page is full
+    """
+    if not limit or len(items) < limit:
+        return
+
+    last = items[-1]
+    if isinstance(last, dict):
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            last["created_at"], last["id"]
+        )
+    else:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            last.created_at, last.id
+        )
+
+
+def gen_fields_response(
+    rows: List[Dict[str, Any]], limit: Optional[int]
+) -> JSONResponse:
+    """
+    Response of the sparse rows, which bypasses the `response_model` of the endpoint
+    """
+    response = JSONResponse(jsonable_encoder(rows))
+    set_next_cursor(response, rows, limit)
+    return response
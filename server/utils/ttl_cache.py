@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """A thread-safe in-process LRU cache whose entries expire after a TTL
+
+    Example:
+    ```
+    cache = TTLCache(max_size=1024, ttl=60)
+    cache.set("key", "value")
+    cache.get("key")  # "value", or None after 60 seconds
+    ```
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.timer = timer
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get the value of a key. Return None if the key is missing or expired
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+
+            expire_at, value = item
+            if expire_at <= self.timer():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Set the value of a key. The least recently used key is evicted if the cache is full
+        """
+        with self._lock:
+            self._data[key] = (self.timer() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,99 @@
+"""
+Wire format of the real-time matching result between the backend and real-time pods
+
+JSON is the default for external clients. A client can ask for msgpack by the
+`Accept` header, which is much cheaper to encode/decode for large multi-query results
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+import msgpack
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+# in the order of preference when the client accepts several equally
+SUPPORTED_MEDIA_TYPES = [JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE]
+
+
+def parse_accept(accept: str) -> List[Tuple[str, float]]:
+    """
+    Parse the `Accept` header into (media range, q-value). A malformed q-value
+    makes the range not acceptable
+    """
+    media_ranges = []
+    for entry in accept.split(","):
+        media_range, *params = [p.strip() for p in entry.split(";")]
+        if not media_range:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media_ranges.append((media_range.lower(), q))
+    return media_ranges
+
+
+def get_quality(
+    media_type: str, media_ranges: List[Tuple[str, float]]
+) -> Tuple[float, int]:
+    """
+    The q-value of the most specific range matching the media type, and the
+    specificity, 2 for the type itself, 1 for `type/*` and 0 for `*/*`
+    """
+    main_type = media_type.split("/")[0]
+    best = (0.0, -1)
+    for media_range, q in media_ranges:
+        if media_range == media_type:
+            specificity = 2
+        elif media_range == f"{main_type}/*":
+            specificity = 1
+        elif media_range == "*/*":
+            specificity = 0
+        else:
+            continue
+        if specificity > best[1]:
+            best = (q, specificity)
+    return best
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """
+    Pick the response media type from the `Accept` header by the q-values. A type
+    with q=0 is never picked. Fall back to JSON
+    """
+    if not accept:
+        return JSON_MEDIA_TYPE
+
+    media_ranges = parse_accept(accept)
+    best_media_type, best_quality = JSON_MEDIA_TYPE, (0.0, -1)
+    for media_type in SUPPORTED_MEDIA_TYPES:
+        quality = get_quality(media_type, media_ranges)
+        if quality[0] > 0 and quality > best_quality:
+            best_media_type, best_quality = media_type, quality
+    return best_media_type
+
+
+def encode(content: Any, media_type: str) -> bytes:
+    """
+    Serialize the content in the given media type
+    """
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(content, use_bin_type=True)
+    return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+
+def decode(data: bytes, media_type: str) -> Any:
+    """
+    Deserialize the content in the given media type
+    """
+    if media_type.startswith(MSGPACK_MEDIA_TYPE):
+        return msgpack.unpackb(data, raw=False)
+    return json.loads(data)